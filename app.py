@@ -1,4 +1,3 @@
-import io
 import os
 import uuid
 from typing import List, Dict, Any
@@ -7,10 +6,13 @@ import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
 
-from parsing.cv_parser import extract_cv_structured
-from matching.matcher import compute_matches, candidate_text
-from services.jobs import fetch_arbeitnow
-from services.db import get_supabase, ensure_candidate, log_interest
+from parsing.cv_parser import PARSER_VERSION
+from parsing.cache import parse_cached
+from parsing.extract import extract_pdf_text
+from matching.matcher import candidate_text, match_cache_parts, rank_matches
+from services.corpus import get_corpus, get_match_cache, warm_up
+from services import metrics
+from services.writer import get_writer
 
 # --- Page Config & Theme ---
 st.set_page_config(
@@ -91,6 +93,10 @@ st.markdown(
 
 load_dotenv()
 
+# load the persisted job snapshot + index in the background so the first match is warm
+if os.getenv("APP_WARMUP", "1") != "0":
+    warm_up()
+
 # --- Session State ---
 def _init_state():
     ss = st.session_state
@@ -98,10 +104,8 @@ def _init_state():
     ss.setdefault("raw_text", "")
     ss.setdefault("candidate", None)
     ss.setdefault("candidate_id", str(uuid.uuid4()))
-    ss.setdefault("jobs_df", None)
-    ss.setdefault("matches_df", None)
+    ss.setdefault("match_result", None)
     ss.setdefault("interests", [])
-    ss.setdefault("sb", get_supabase())
 
 _init_state()
 
@@ -129,29 +133,20 @@ def step_upload():
     if file is not None:
         size = file.size
         text = ""
+        normalized = False  # PDF text comes back already normalized
 
         if file.name.lower().endswith(".pdf"):
-            from pypdf import PdfReader
-            try:
-                reader = PdfReader(file)
-                pages = [p.extract_text() or "" for p in reader.pages]
-                text = "\n".join(pages)
+            res = extract_pdf_text(file.getvalue())
+            if res.method == "failed":
+                st.error(f"PDF parsing failed: {res.error}")
+                return
+            text, normalized = res.text, True
+            if res.method == "pypdf":
                 st.toast("PDF parsed with pypdf", icon="✅")
-            except Exception:
-                st.toast("Switched to pdfminer (better for this file)", icon="🛠️")
-                try:
-                    text = _pdfminer_extract(file)
-                except Exception as e:
-                    st.error(f"PDF parsing failed: {e}")
-                    return
-            if len(text.strip()) < 500:
-                try:
-                    alt = _pdfminer_extract(file)
-                    if len(alt.strip()) > len(text.strip()):
-                        text = alt
-                        st.toast("Used pdfminer for richer text", icon="🔁")
-                except Exception:
-                    pass
+            else:
+                st.toast("Used pdfminer for richer text", icon="🔁")
+            if res.truncated:
+                st.info(f"Large PDF: only the first {res.pages} pages were read.")
             if len(text.strip()) < 200 and size > 200_000:
                 st.warning("This PDF looks scanned; please upload .txt or a PDF with selectable text.")
 
@@ -187,24 +182,15 @@ def step_upload():
 
         if st.button("Extract structured data", type="primary"):
             with st.spinner("Parsing your CV…"):
-                candidate = extract_cv_structured(text)
+                candidate = parse_cached(text, normalized)
             candidate["raw_text"] = text
             st.session_state.candidate = candidate
-            if st.session_state.sb:
-                try:
-                    ensure_candidate(st.session_state.sb, st.session_state.candidate_id, text)
-                except Exception as e:
-                    st.warning(f"Supabase upsert skipped: {e}")
+            writer = get_writer()
+            if writer:
+                writer.ensure_candidate(st.session_state.candidate_id, text)
             st.session_state.step = 2
             st.toast("Parsed! Review & fix next.", icon="📝")
 
-def _pdfminer_extract(file) -> str:
-    file.seek(0)
-    data = file.read()
-    fh = io.BytesIO(data)
-    from pdfminer.high_level import extract_text
-    return extract_text(fh)
-
 # --- Step 2: Review & Fix ---
 def step_review():
     st.subheader("2) Review & Fix")
@@ -301,7 +287,7 @@ def _edit_structured(cand: Dict[str, Any]):
         certs_str = "\n".join(cand.get("certifications", []))
         cand["certifications"] = st.text_area("Certifications (one per line)", certs_str, height=80).splitlines()
 
-        meta = cand.get("meta", {"parser_version": "v1", "confidence_notes": []})
+        meta = cand.get("meta", {"parser_version": PARSER_VERSION, "confidence_notes": []})
         if meta.get("confidence_notes"):
             st.markdown("**Confidence notes:**")
             for n in meta["confidence_notes"]:
@@ -311,11 +297,9 @@ def _edit_structured(cand: Dict[str, Any]):
         submitted = st.form_submit_button("Save & Continue →", type="primary")
         if submitted:
             st.session_state.candidate = cand
-            if st.session_state.sb:
-                try:
-                    ensure_candidate(st.session_state.sb, st.session_state.candidate_id, cand.get("raw_text", ""))
-                except Exception as e:
-                    st.warning(f"Supabase upsert skipped: {e}")
+            writer = get_writer()
+            if writer:
+                writer.ensure_candidate(st.session_state.candidate_id, cand.get("raw_text", ""))
             st.session_state.step = 3
             st.toast("Saved. Let’s find matches.", icon="✨")
 
@@ -335,30 +319,29 @@ def step_matches():
         loc_contains = st.text_input("Location contains", "")
         kw_contains = st.text_input("Keyword in title/desc", "")
         if st.button("Refresh matches"):
-            st.session_state.matches_df = None
+            st.session_state.match_result = None
 
     with right:
-        if st.session_state.jobs_df is None:
-            with st.spinner("Fetching jobs from Arbeitnow…"):
-                st.session_state.jobs_df = fetch_arbeitnow()
-        jobs_df = st.session_state.jobs_df
+        with st.spinner("Loading jobs…"):
+            jobs_df, version = get_corpus().get()
         if jobs_df is None or jobs_df.empty:
             st.warning("No jobs available right now. Try again later.")
             return
 
-        if st.session_state.matches_df is None:
+        if st.session_state.match_result is None:
+            cache = get_match_cache()
+            text, location, blend = match_cache_parts(cand)
+            key = cache.key(text, version, 100, location, blend)
             with st.spinner("Computing scores…"):
-                matches = compute_matches(cand, jobs_df, top_n=100)
-            st.session_state.matches_df = matches
-        matches = st.session_state.matches_df.copy()
-
-        if loc_contains:
-            matches = matches[matches["location"].str.contains(loc_contains, case=False, na=False)]
-        if kw_contains:
-            mask = matches["job_title"].str.contains(kw_contains, case=False, na=False) | matches["job_description"].str.contains(kw_contains, case=False, na=False)
-            matches = matches[mask]
-        matches = matches[matches["match_score"] * 100 >= min_pct]
-        matches = matches.head(top_n)
+                matches = cache.get_or_compute(key, lambda: rank_matches(cand, jobs_df, top_n=100, key=version))
+            st.session_state.match_result = matches
+        # a MatchResult: row positions + scores; only the shown cards get materialized
+        matches = (
+            st.session_state.match_result
+            .filter(location=loc_contains, keyword=kw_contains, min_score=min_pct / 100)
+            .head(top_n)
+            .to_frame()
+        )
 
         if matches.empty:
             st.info("Nothing hit your minimum match yet. Try lowering the threshold or clearing filters.")
@@ -381,6 +364,11 @@ def step_matches():
                     unsafe_allow_html=True,
                 )
                 st.write((row.job_description or "").strip()[:320] + ("…" if len((row.job_description or "")) > 320 else ""))
+                if "skill_score" in matches.columns:
+                    breakdown = f"Skills {int(row.skill_score * 100)}% • Profile text {int(row.text_score * 100)}% • Location {int(row.location_score * 100)}%"
+                    if row.matched_skills:
+                        breakdown += " — shared skills: " + ", ".join(row.matched_skills)
+                    st.caption(breakdown)
                 c1, c2, _ = st.columns([1, 1, 6])
                 with c1:
                     st.link_button("View job", url=row.url, use_container_width=True)
@@ -394,18 +382,16 @@ def step_matches():
                             "source": row.source,
                             "match_score": float(row.match_score),
                         })
-                        if st.session_state.sb:
-                            try:
-                                log_interest(st.session_state.sb, st.session_state.candidate_id, row)
-                            except Exception as e:
-                                st.warning(f"Supabase insert skipped: {e}")
+                        writer = get_writer()
+                        if writer:
+                            writer.log_interest(st.session_state.candidate_id, row)
                         st.toast("Interest logged", icon="📬")
                 st.divider()
 
-        st.caption("Source: Arbeitnow API")
+        st.caption("Sources: " + ", ".join(sorted(str(s).title() for s in matches["source"].unique())))
 
         st.markdown("### Why these matches?")
-        st.write("We compute a TF-IDF cosine similarity between your consolidated profile text and each job’s title+description. In Phase-2 this will expand to an explainable breakdown by skills, experience, education, and location.")
+        st.write("Each match blends three signals: the share of the job’s skills (from our skills taxonomy, rarer skills weigh more) that your profile covers, a TF-IDF cosine similarity between your consolidated profile text and the job’s title+description, and whether the job is in your city (remote roles count half). Experience and education will join the breakdown next.")
 
         with st.expander("Show my profile text used for matching"):
             st.text_area("Profile text", candidate_text(cand), height=200)
@@ -420,17 +406,40 @@ def step_interests():
     df = pd.DataFrame(items)
     st.dataframe(df, use_container_width=True, hide_index=True)
 
+def debug_panel():
+    # Stage timings and cProfile captures; shown when APP_METRICS is on
+    with st.sidebar.expander("Debug: timings", expanded=False):
+        st.session_state.profile = st.checkbox("Profile next runs (cProfile)", value=st.session_state.get("profile", metrics.PROFILE_ENABLED))
+        rows = metrics.stage_rows()
+        if rows:
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No timings recorded yet.")
+        for label, text in reversed(metrics.REGISTRY.profiles):
+            st.text(f"— {label} —")
+            st.code(text[:6000])
+        if st.button("Reset timings"):
+            metrics.REGISTRY.reset()
+
+if metrics.METRICS_PORT:
+    metrics.serve()
+
 # --- Router ---
 stepper()
 
-if st.session_state.step == 1:
-    step_upload()
-elif st.session_state.step == 2:
-    step_review()
-elif st.session_state.step == 3:
-    step_matches()
-else:
-    step_interests()
+with metrics.profiled(f"step {st.session_state.step}", enabled=st.session_state.get("profile", metrics.PROFILE_ENABLED)):
+    with metrics.span(f"app.step{st.session_state.step}"):
+        if st.session_state.step == 1:
+            step_upload()
+        elif st.session_state.step == 2:
+            step_review()
+        elif st.session_state.step == 3:
+            step_matches()
+        else:
+            step_interests()
+
+if metrics.REGISTRY.enabled:
+    debug_panel()
 
 # Footer
 st.markdown(
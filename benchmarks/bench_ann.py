@@ -0,0 +1,58 @@
+"""Recall@k and latency of the IVF retriever against the exact JobIndex scorer.
+
+    python -m benchmarks.bench_ann --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from matching.ann import IVFIndex
+from matching.index import JobIndex
+from matching.matcher import candidate_text
+
+from .synthetic import synthetic_candidates, synthetic_jobs
+
+
+def run(size: int, queries: int, k: int, probes, shortlist: int) -> dict:
+    jobs = synthetic_jobs(size)
+    t0 = time.perf_counter()
+    idx = JobIndex.build(jobs)
+    t_fit = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ann = IVFIndex.build(idx)
+    t_ann = time.perf_counter() - t0
+
+    texts = [candidate_text(c) for c in synthetic_candidates(queries)]
+    exact, t0 = [], time.perf_counter()
+    for t in texts:
+        s = idx.query(t)
+        exact.append(set(np.argpartition(-s, k - 1)[:k].tolist()))
+    exact_ms = (time.perf_counter() - t0) * 1000 / queries
+
+    result = {"jobs": size, "fit_s": t_fit, "ann_build_s": t_ann, "n_lists": ann.n_lists, "exact_ms": exact_ms, "probes": []}
+    for n_probe in probes:
+        hits, t0 = 0, time.perf_counter()
+        for t, truth in zip(texts, exact):
+            rows, _ = ann.search(t, top_n=k, n_probe=n_probe, shortlist=shortlist)
+            hits += len(truth & set(rows.tolist()))
+        ms = (time.perf_counter() - t0) * 1000 / queries
+        result["probes"].append({"n_probe": n_probe, f"recall@{k}": hits / (k * queries), "ms": ms})
+    return result
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--queries", type=int, default=100)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--probes", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    ap.add_argument("--shortlist", type=int, default=200)
+    args = ap.parse_args()
+    for size in args.sizes:
+        print(json.dumps(run(size, args.queries, args.k, args.probes, args.shortlist)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
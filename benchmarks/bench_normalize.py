@@ -0,0 +1,51 @@
+"""Throughput of normalize_text vs the previous multi-pass implementation.
+
+    python -m benchmarks.bench_normalize --docs 2000
+"""
+import argparse
+import json
+import time
+
+from parsing import normalizers as N
+
+from .synthetic import synthetic_cv_text
+
+
+def legacy_normalize(txt: str) -> str:
+    for k, v in N.SMART_QUOTES.items():
+        txt = txt.replace(k, v)
+    txt = N.HYPHEN_RE.sub(r"\1\2", txt)
+    txt = N.BULLET_RE.sub("- ", txt)
+    txt = N.MULTISPACES_RE.sub(" ", txt)
+    txt = N.NEWLINES_RE.sub("\n\n", txt)
+    return txt.strip()
+
+
+def _rate(fn, docs, repeat: int) -> float:
+    nbytes = sum(len(d.encode("utf-8")) for d in docs) * repeat
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for d in docs:
+            fn(d)
+    return nbytes / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=2000)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--roles", type=int, default=6)
+    args = ap.parse_args()
+    docs = [synthetic_cv_text(i, roles=args.roles) for i in range(args.docs)]
+    assert all(N.normalize_text(d) == legacy_normalize(d) for d in docs[:50])
+    pages = lambda d: "".join(N.normalize_pages(d.split("\n\n")))  # noqa: E731
+    print(json.dumps({
+        "docs": len(docs),
+        "legacy_bytes_per_s": _rate(legacy_normalize, docs, args.repeat),
+        "normalize_text_bytes_per_s": _rate(N.normalize_text, docs, args.repeat),
+        "normalize_pages_bytes_per_s": _rate(pages, docs, args.repeat),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
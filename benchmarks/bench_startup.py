@@ -0,0 +1,80 @@
+"""Cold-start cost of the app's modules, from `python -X importtime`, plus how long
+the background warm-up takes to have a persisted snapshot ready to match.
+
+    python -m benchmarks.bench_startup --jobs 20000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+# what app.py imports at module level (streamlit itself excluded)
+APP_MODULES = ["parsing.cv_parser", "parsing.cache", "parsing.extract", "matching.matcher", "services.corpus", "services.metrics", "services.writer"]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def importtime(modules: List[str], env: Dict[str, str] = None) -> Tuple[float, List[Tuple[str, float]]]:
+    # (wall seconds of a fresh interpreter importing `modules`, top packages by cumulative us)
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+                          capture_output=True, text=True, cwd=ROOT, env=env, check=True)
+    wall = time.perf_counter() - t0
+    top: Dict[str, float] = {}
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        if "." not in name:
+            top[name] = int(parts[1]) / 1e6
+    return wall, sorted(top.items(), key=lambda kv: -kv[1])[:10]
+
+
+def warmup_seconds(jobs: int) -> Dict[str, float]:
+    # snapshot + index persisted by a previous process, then timed in a fresh one
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, JOBS_SNAPSHOT_DIR=os.path.join(tmp, "jobs"), JOB_INDEX_DIR=os.path.join(tmp, "index"))
+        prep = (
+            "from benchmarks.synthetic import synthetic_jobs\n"
+            "from services.jobs import compact_jobs, load_published, publish_snapshot\n"
+            "from services.ingest import build_indexes\n"
+            f"df = synthetic_jobs({jobs}); df['content_hash'] = ''; df['fetched_at'] = None\n"
+            "publish_snapshot(compact_jobs(df), 'bench'); build_indexes(load_published())\n"
+        )
+        subprocess.run([sys.executable, "-c", prep], cwd=ROOT, env=env, check=True)
+        probe = (
+            "import time; t0 = time.perf_counter()\n"
+            "from services.corpus import get_corpus, warm_up\n"
+            "t1 = time.perf_counter(); warm_up().join(); t2 = time.perf_counter()\n"
+            "from benchmarks.synthetic import synthetic_candidates\n"
+            "from matching.matcher import rank_matches\n"
+            "df, _ = get_corpus().get(); t3 = time.perf_counter()\n"
+            "rank_matches(synthetic_candidates(1)[0], df, top_n=100); t4 = time.perf_counter()\n"
+            "print(t1 - t0, t2 - t1, t4 - t3)\n"
+        )
+        out = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout.split()
+        return {"import_s": float(out[0]), "warmup_s": float(out[1]), "first_match_s": float(out[2])}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--jobs", type=int, default=20_000)
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+    walls = []
+    for _ in range(args.runs):
+        wall, top = importtime(APP_MODULES)
+        walls.append(wall)
+    print(json.dumps({
+        "app_modules_import_s": min(walls),
+        "top_packages_s": dict(top),
+        "warmup": warmup_seconds(args.jobs),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
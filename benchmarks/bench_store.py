@@ -0,0 +1,65 @@
+"""Load time and heap footprint of the job snapshot: Parquet into object columns
+(the old layout) vs the memory-mapped Arrow store.
+
+    python -m benchmarks.bench_store --jobs 100000
+"""
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from services.jobs import load_snapshot, save_snapshot
+
+from .synthetic import synthetic_jobs
+
+
+def _heap_mb(df: pd.DataFrame) -> float:
+    import pyarrow as pa
+
+    # object/categorical columns live on the heap; Arrow-backed ones only count
+    # what Arrow allocated (mapped pages belong to the page cache)
+    heap = sum(df[c].memory_usage(deep=True, index=False) for c in df.columns if not isinstance(df[c].dtype, pd.ArrowDtype))
+    return (heap + pa.total_allocated_bytes()) / 1e6
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--jobs", type=int, default=100_000)
+    ap.add_argument("--words", type=int, default=300, help="words per description")
+    args = ap.parse_args()
+    jobs = synthetic_jobs(args.jobs, words_per_job=args.words)
+    jobs["content_hash"] = ""
+    jobs["fetched_at"] = pd.Timestamp.now(tz="UTC")
+    with tempfile.TemporaryDirectory() as tmp:
+        pq, arrow = os.path.join(tmp, "jobs.parquet"), os.path.join(tmp, "jobs.arrow")
+        jobs.to_parquet(pq, index=False)
+        save_snapshot(jobs, arrow)
+        del jobs
+        gc.collect()
+
+        t0 = time.perf_counter()
+        legacy = pd.read_parquet(pq)
+        legacy_s = time.perf_counter() - t0
+        legacy_mb = legacy.memory_usage(deep=True).sum() / 1e6
+        del legacy
+        gc.collect()
+
+        t0 = time.perf_counter()
+        store = load_snapshot(arrow)
+        store_s = time.perf_counter() - t0
+        print(json.dumps({
+            "jobs": args.jobs,
+            "parquet_object_load_s": legacy_s,
+            "parquet_object_heap_mb": legacy_mb,
+            "arrow_mmap_load_s": store_s,
+            "arrow_mmap_heap_mb": _heap_mb(store),
+            "arrow_mmap_file_mb": os.path.getsize(arrow) / 1e6,
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
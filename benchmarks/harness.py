@@ -0,0 +1,279 @@
+"""End-to-end benchmark harness over the parsing, matching and ingestion hot paths.
+
+Runs fully offline (job pages come from tests/fixtures/arbeitnow, sockets are
+blocked) and writes JSON that can be diffed against a run from another commit:
+
+    python -m benchmarks.harness --scale small medium --out bench.json
+    python -m benchmarks.harness --scale small --compare bench.json --threshold 0.2
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import pandas as pd
+
+from .recorded import RecordedSession, recorded_pages
+from .synthetic import synthetic_candidates, synthetic_cv_text, synthetic_jobs
+
+SCALES: Dict[str, Dict[str, int]] = {
+    "smoke": {"jobs": 200, "cvs": 5, "pages": 3, "repeat": 2},
+    "small": {"jobs": 2_000, "cvs": 50, "pages": 10, "repeat": 5},
+    "medium": {"jobs": 20_000, "cvs": 200, "pages": 40, "repeat": 5},
+    "large": {"jobs": 100_000, "cvs": 500, "pages": 200, "repeat": 3},
+}
+TOP_N = 10
+
+
+@contextlib.contextmanager
+def no_network() -> Iterator[None]:
+    def blocked(*args, **kwargs):
+        raise RuntimeError("network access during benchmark")
+
+    orig = socket.socket.connect
+    socket.socket.connect = blocked  # type: ignore[assignment]
+    try:
+        yield
+    finally:
+        socket.socket.connect = orig  # type: ignore[assignment]
+
+
+@contextlib.contextmanager
+def index_dir(path: str) -> Iterator[None]:
+    # persisted indexes go to the run's temp dir instead of .cache/job_index
+    from matching import index as job_index
+
+    orig = job_index.INDEX_DIR
+    job_index.INDEX_DIR = path
+    try:
+        yield
+    finally:
+        job_index.INDEX_DIR = orig
+
+
+Case = Tuple[str, Callable[[], Tuple[int, Callable[[], Any]]]]
+
+
+def _cases(scale: Dict[str, int], tmp: str) -> List[Case]:
+    # (name, setup). setup() builds what the case needs, which is not measured, and
+    # returns (items processed per call, fn). Fixtures are built on first use and
+    # shared, so `--only` pays just for the selected cases.
+    from matching.index import JobIndex
+    from matching.matcher import _fallback_matches, candidate_text, compute_matches
+    from parsing.cv_parser import extract_cv_structured
+    from parsing.normalizers import normalize_text
+    from services.dedupe import NearDupIndex
+    from services.jobs import ArbeitnowFetcher
+
+    built: Dict[str, Any] = {}
+
+    def fixture(build: Callable[[], Any]) -> Callable[[], Any]:
+        def get():
+            if build.__name__ not in built:
+                built[build.__name__] = build()
+            return built[build.__name__]
+
+        return get
+
+    @fixture
+    def cvs():
+        return [synthetic_cv_text(i) for i in range(scale["cvs"])]
+
+    @fixture
+    def parsed():
+        return [extract_cv_structured(t) for t in cvs()]
+
+    @fixture
+    def candidates():
+        return synthetic_candidates(scale["cvs"])
+
+    @fixture
+    def jobs():
+        return synthetic_jobs(scale["jobs"])
+
+    @fixture
+    def index():
+        return JobIndex.build(jobs())
+
+    @fixture
+    def later():
+        # the next crawl: a few hundred postings replace as many expired ones
+        n_delta = min(300, len(jobs()) // 4)
+        fresh = jobs().head(n_delta).assign(url=lambda d: d["url"] + "-next", job_description=lambda d: d["job_description"] + " kubernetes")
+        return n_delta, pd.concat([fresh, jobs().iloc[n_delta:]], ignore_index=True)
+
+    @fixture
+    def pages():
+        return recorded_pages(scale["pages"])
+
+    @fixture
+    def near_dup():
+        urls = jobs()["url"].tolist()
+        descriptions = jobs()["job_description"].tolist()
+        nd = NearDupIndex()
+        nd.add(urls, descriptions)
+        return urls, descriptions, nd
+
+    def normalize():
+        return len(cvs()), lambda: [normalize_text(t) for t in cvs()]
+
+    def parse():
+        return len(cvs()), lambda: [extract_cv_structured(t) for t in cvs()]
+
+    def cand_text():
+        return len(parsed()), lambda: [candidate_text(c) for c in parsed()]
+
+    def index_build():
+        return len(jobs()), lambda: JobIndex.build(jobs())
+
+    def index_update():
+        n_delta, frame = later()
+        idx = index()
+        return n_delta, lambda: idx.update(frame, key="next")
+
+    def matches():
+        idx, frame = index(), jobs()
+        return len(candidates()), lambda: [compute_matches(c, frame, top_n=TOP_N, index=idx) for c in candidates()]
+
+    def fallback():
+        frame = jobs()
+        texts = [candidate_text(c) for c in candidates()]
+        return len(texts), lambda: [_fallback_matches(t, frame, TOP_N) for t in texts]
+
+    def near_dup_build():
+        frame = jobs()
+        urls, descriptions = frame["url"].tolist(), frame["job_description"].tolist()
+        return len(urls), lambda: NearDupIndex().add(urls, descriptions)
+
+    def near_dup_delta():
+        urls, descriptions, nd = near_dup()
+        delta = min(500, len(urls))
+        runs = iter(range(1_000_000))
+
+        def fn():
+            # fresh urls each call, half of them reposts of indexed descriptions
+            n = next(runs)
+            return nd.add([f"{u}#{n}" for u in urls[:delta]], [d if i % 2 else d + " x" for i, d in enumerate(descriptions[-delta:])])
+
+        return delta, fn
+
+    def n_items():
+        return sum(len(p.get("data", [])) for p in pages())
+
+    def ingest_full():
+        recorded = pages()
+        return n_items(), lambda: ArbeitnowFetcher(snapshot_path=None, max_pages=len(recorded), rate=0, session=RecordedSession(recorded)).refresh()
+
+    def ingest_delta():
+        recorded = pages()
+        # second refresh against a snapshot that already has everything
+        path = os.path.join(tmp, "snapshots", "delta.parquet")
+        ArbeitnowFetcher(snapshot_path=path, max_pages=len(recorded), rate=0, session=RecordedSession(recorded)).refresh()
+        return n_items(), lambda: ArbeitnowFetcher(snapshot_path=path, max_pages=len(recorded), rate=0, session=RecordedSession(recorded)).refresh()
+
+    return [
+        ("normalize_text", normalize),
+        ("extract_cv_structured", parse),
+        ("candidate_text", cand_text),
+        ("index_build", index_build),
+        ("index_update", index_update),
+        ("compute_matches", matches),
+        ("fallback_matches", fallback),
+        ("near_dup_build", near_dup_build),
+        ("near_dup_delta", near_dup_delta),
+        ("ingest_full", ingest_full),
+        ("ingest_delta", ingest_delta),
+    ]
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> List[float]:
+    fn()  # warm-up: lazy imports, per-snapshot caches
+    out = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - t0)
+    return out
+
+
+def run(scale_name: str, only: List[str] = ()) -> Dict[str, Any]:
+    scale = SCALES[scale_name]
+    results: Dict[str, Any] = {}
+    with no_network(), tempfile.TemporaryDirectory() as tmp, index_dir(os.path.join(tmp, "job_index")):
+        for name, setup in _cases(scale, tmp):
+            if only and name not in only:
+                continue
+            items, fn = setup()
+            samples = _time(fn, scale["repeat"])
+            med = statistics.median(samples)
+            results[name] = {
+                "items": items,
+                "median_s": med,
+                "min_s": min(samples),
+                "max_s": max(samples),
+                "items_per_s": items / med if med else None,
+            }
+    return {"scale": scale_name, "params": scale, "results": results}
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return ""
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    # cases whose median got slower than baseline by more than `threshold` (a fraction)
+    base = {r["scale"]: r["results"] for r in baseline.get("runs", [])}
+    regressions = []
+    for run_ in current["runs"]:
+        for name, res in run_["results"].items():
+            old = base.get(run_["scale"], {}).get(name)
+            if old and old["median_s"] > 0:
+                ratio = res["median_s"] / old["median_s"]
+                if ratio > 1 + threshold:
+                    regressions.append(f"{run_['scale']}/{name}: {old['median_s'] * 1000:.1f}ms -> {res['median_s'] * 1000:.1f}ms ({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scale", nargs="+", default=["small"], choices=list(SCALES))
+    ap.add_argument("--only", nargs="*", default=[], help="run only these cases")
+    ap.add_argument("--out", help="write results JSON here (default: stdout)")
+    ap.add_argument("--compare", help="baseline JSON from a previous run")
+    ap.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before a case counts as a regression")
+    args = ap.parse_args(argv)
+
+    report = {
+        "commit": _git_rev(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "runs": [run(s, args.only) for s in args.scale],
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for r in regressions:
+            print("REGRESSION", r, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
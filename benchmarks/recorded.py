@@ -0,0 +1,51 @@
+import copy
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "arbeitnow"
+
+
+def recorded_pages(n_pages: Optional[int] = None, fixtures: Path = FIXTURES) -> List[Dict[str, Any]]:
+    # Recorded Arbeitnow pages, cycled with rewritten slugs/urls to reach n_pages so
+    # every replica is a distinct posting. The last page has no `next` link.
+    base = [json.loads(p.read_text(encoding="utf-8")) for p in sorted(fixtures.glob("page_*.json"), key=lambda p: int(p.stem.split("_")[1]))]
+    n_pages = n_pages or len(base)
+    pages = []
+    for i in range(n_pages):
+        doc = copy.deepcopy(base[i % len(base)])
+        rep = i // len(base)
+        if rep:
+            for it in doc.get("data", []):
+                it["slug"] = f"{it.get('slug', '')}-r{rep}"
+                it["url"] = f"{it.get('url', '')}-r{rep}"
+        doc["links"] = dict(doc.get("links") or {}, next=f"?page={i + 2}" if i + 1 < n_pages else None)
+        pages.append(doc)
+    return pages
+
+
+class _Response:
+    def __init__(self, doc: Dict[str, Any]):
+        self._body = json.dumps(doc)
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> Dict[str, Any]:
+        # decode per call, like requests does
+        return json.loads(self._body)
+
+
+class RecordedSession:
+    # Stands in for requests.Session in ArbeitnowFetcher: serves recorded pages by
+    # the `page` query param, an empty page past the end, and never opens a socket.
+    def __init__(self, pages: List[Dict[str, Any]]):
+        self.pages = pages
+        self.requests = 0
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, timeout: Any = None) -> _Response:
+        self.requests += 1
+        page = int((params or {}).get("page", 1))
+        if 1 <= page <= len(self.pages):
+            return _Response(self.pages[page - 1])
+        return _Response({"data": [], "links": {"next": None}})
@@ -0,0 +1,85 @@
+import random
+from typing import Any, Dict, List
+
+import pandas as pd
+
+TOPICS = {
+    "sales": "b2b sales lead generation cold emailing crm salesforce pipeline quota prospecting account executive negotiation hubspot outbound",
+    "data": "python sql statistics pandas dashboards analytics tableau excel forecasting regression data analysis reporting bigquery",
+    "backend": "python java kubernetes docker microservices postgresql api rest backend development aws terraform golang redis",
+    "frontend": "javascript typescript react vue css html frontend development figma accessibility webpack nextjs design systems",
+    "ml": "machine learning pytorch tensorflow nlp deep learning scikit-learn mlops transformers computer vision model training",
+    "marketing": "digital marketing seo sem content social media campaigns branding google ads copywriting analytics growth",
+    "finance": "accounting controlling ifrs audit budgeting excel sap financial reporting treasury payroll tax compliance",
+    "ops": "logistics supply chain procurement warehouse operations planning erp inventory lean six sigma scheduling",
+}
+FILLER = "team growth role join company remote hybrid experience fast paced english german benefits office responsible communication".split()
+CITIES = ["Berlin", "Munich", "Hamburg", "Paris", "Amsterdam", "Remote", "Vienna", "Zurich", "Cologne", "Frankfurt"]
+SENIORITY = ["Junior", "Senior", "Lead", "Working Student", "Intern", ""]
+
+
+def synthetic_jobs(n: int, seed: int = 0, words_per_job: int = 80) -> pd.DataFrame:
+    rng = random.Random(seed)
+    topics = list(TOPICS)
+    vocab = {t: w.split() for t, w in TOPICS.items()}
+    rows: List[Dict[str, Any]] = []
+    for i in range(n):
+        t = rng.choice(topics)
+        words = rng.choices(vocab[t], k=words_per_job // 2) + rng.choices(vocab[rng.choice(topics)], k=words_per_job // 8) + rng.choices(FILLER, k=words_per_job // 4)
+        rng.shuffle(words)
+        title = " ".join(x for x in [rng.choice(SENIORITY), " ".join(rng.sample(vocab[t], 2)).title(), "Manager" if t in ("sales", "marketing", "ops") else "Engineer"] if x)
+        rows.append({
+            "job_title": title,
+            "company_name": f"Company {rng.randrange(max(1, n // 20))}",
+            "location": rng.choice(CITIES),
+            "url": f"https://jobs.example/{seed}/{i}",
+            "job_description": " ".join(words),
+            "source": "synthetic",
+        })
+    return pd.DataFrame(rows)
+
+
+def synthetic_candidates(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed + 10_000)
+    topics = list(TOPICS)
+    out = []
+    for i in range(n):
+        vocab = TOPICS[rng.choice(topics)].split()
+        out.append({
+            "id": f"cand-{i}",
+            "summary": " ".join(rng.choices(vocab, k=25)),
+            "skills": {"hard": rng.sample(vocab, 4), "tools": rng.sample(vocab, 3), "soft": ["communication"], "languages": ["English"]},
+            "experience": [{"title": " ".join(rng.sample(vocab, 2)).title(), "company": f"Company {rng.randrange(100)}", "location": rng.choice(CITIES), "bullets": [" ".join(rng.choices(vocab, k=10)) for _ in range(3)]}],
+            "education": [{"degree": "BSc", "institution": "Technical University", "location": rng.choice(CITIES)}],
+        })
+    return out
+
+
+def synthetic_cv_text(seed: int = 0, roles: int = 4, bullets: int = 5) -> str:
+    rng = random.Random(seed + 20_000)
+    vocab = TOPICS[rng.choice(list(TOPICS))].split()
+    months = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+    lines = [
+        f"CANDIDATE{seed} PERSON",
+        f"{rng.choice(CITIES)}, Germany",
+        f"Email: cand{seed}@example.com  |  Phone: +49 151 {rng.randrange(1000000, 9999999)}",
+        "",
+        "SUMMARY",
+        "“Motivated” professional — " + " ".join(rng.choices(vocab, k=20)) + ".",
+        "",
+        "PROFESSIONAL EXPERIENCE",
+    ]
+    year = 2024
+    for _ in range(roles):
+        start = year - rng.randrange(1, 3)
+        lines.append(f"{' '.join(rng.sample(vocab, 2)).title()} – Company {rng.randrange(500)} – {rng.choice(CITIES)}")
+        lines.append(f"{rng.choice(months)} {start} – {rng.choice(months)} {year}")
+        for _ in range(bullets):
+            words = rng.choices(vocab + FILLER, k=14)
+            cut = rng.randrange(3, 10)
+            lines.append("•   " + " ".join(words[:cut]) + "-\n" + "  ".join(words[cut:]))
+        lines.append("")
+        year = start
+    lines += ["", "", "", "EDUCATION", f"Technical University – BSc – {rng.choice(CITIES)}", f"{year - 4} – {year}", "",
+              "SKILLS", ", ".join(rng.sample(vocab, 6)), "", "LANGUAGES", "English (fluent), German (B2)"]
+    return "\n".join(lines)
@@ -0,0 +1,131 @@
+import json
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .index import JobIndex
+
+ASSIGN_BATCH = 65536
+
+
+def _normalize(Z: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(Z, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return Z / norms
+
+
+def _assign(Z: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    out = np.empty(Z.shape[0], dtype=np.int32)
+    for s in range(0, Z.shape[0], ASSIGN_BATCH):
+        out[s:s + ASSIGN_BATCH] = np.argmax(Z[s:s + ASSIGN_BATCH] @ centroids.T, axis=1)
+    return out
+
+
+def _spherical_kmeans(Z: np.ndarray, k: int, n_iter: int, rng: np.random.Generator, sample: int) -> np.ndarray:
+    X = Z[rng.choice(Z.shape[0], size=min(sample, Z.shape[0]), replace=False)]
+    centroids = X[rng.choice(X.shape[0], size=k, replace=False)].copy()
+    for _ in range(n_iter):
+        labels = _assign(X, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, X)
+        empty = np.bincount(labels, minlength=k) == 0
+        sums[empty] = X[rng.choice(X.shape[0], size=int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+# Two-stage retriever: an IVF index over SVD-reduced TF-IDF vectors proposes a
+# shortlist, which is re-ranked with the exact sparse cosine from the JobIndex.
+# n_probe (lists scanned) and shortlist (exact re-rank size) trade recall for latency.
+class IVFIndex:
+    def __init__(self, job_index: JobIndex, svd, vectors: np.ndarray, centroids: np.ndarray, labels: np.ndarray):
+        self.job_index = job_index
+        self.svd = svd
+        self.vectors = vectors
+        self.centroids = centroids
+        self.labels = labels
+        self.order = np.argsort(labels, kind="stable").astype(np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=centroids.shape[0]))])
+
+    @property
+    def n_lists(self) -> int:
+        return self.centroids.shape[0]
+
+    @classmethod
+    def build(
+        cls,
+        job_index: JobIndex,
+        n_components: int = 128,
+        n_lists: Optional[int] = None,
+        n_iter: int = 10,
+        train_sample: int = 50000,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        from sklearn.decomposition import TruncatedSVD
+
+        X = job_index.matrix
+        n = X.shape[0]
+        n_components = max(1, min(n_components, X.shape[1] - 1, n - 1))
+        svd = TruncatedSVD(n_components=n_components, random_state=seed)
+        svd.fit(X[np.random.default_rng(seed).choice(n, size=min(train_sample, n), replace=False)])
+        Z = _normalize(svd.transform(X).astype(np.float32))
+        k = max(1, min(n_lists or int(np.sqrt(n)), n))
+        centroids = _spherical_kmeans(Z, k, n_iter, np.random.default_rng(seed), train_sample)
+        return cls(job_index, svd, Z, centroids, _assign(Z, centroids))
+
+    def save(self, path: str) -> None:
+        # the JobIndex is saved separately; its key guards against a mismatched load
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "ann_vectors.npy"), self.vectors)
+        np.save(os.path.join(path, "ann_centroids.npy"), self.centroids)
+        np.save(os.path.join(path, "ann_labels.npy"), self.labels)
+        np.save(os.path.join(path, "ann_components.npy"), self.svd.components_)
+        with open(os.path.join(path, "ann.json"), "w", encoding="utf-8") as fh:
+            json.dump({"key": self.job_index.key}, fh)
+
+    @classmethod
+    def load(cls, path: str, job_index: JobIndex) -> "IVFIndex":
+        from sklearn.decomposition import TruncatedSVD
+
+        with open(os.path.join(path, "ann.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta["key"] != job_index.key:
+            raise ValueError(f"ANN index at {path} was built for job index {meta['key']}, not {job_index.key}")
+        components = np.load(os.path.join(path, "ann_components.npy"))
+        svd = TruncatedSVD(n_components=components.shape[0])
+        svd.components_ = components
+        svd.n_features_in_ = components.shape[1]
+        return cls(
+            job_index,
+            svd,
+            np.load(os.path.join(path, "ann_vectors.npy")),
+            np.load(os.path.join(path, "ann_centroids.npy")),
+            np.load(os.path.join(path, "ann_labels.npy")),
+        )
+
+    def search(self, text: str, top_n: int = 10, n_probe: int = 8, shortlist: int = 200) -> Tuple[np.ndarray, np.ndarray]:
+        # n_probe above n_lists scans every list
+        if n_probe < 1:
+            raise ValueError(f"n_probe must be at least 1, got {n_probe}")
+        if shortlist < 1:
+            raise ValueError(f"shortlist must be at least 1, got {shortlist}")
+        if top_n <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        q_sparse = self.job_index.transform([text])
+        q = _normalize(self.svd.transform(q_sparse).astype(np.float32))[0]
+
+        n_probe = min(n_probe, self.n_lists)
+        lists = np.argpartition(-(self.centroids @ q), n_probe - 1)[:n_probe]
+        cand = np.concatenate([self.order[self.offsets[l]:self.offsets[l + 1]] for l in lists])
+        if cand.size == 0:
+            return cand, np.zeros(0)
+        if cand.size > shortlist:
+            approx = self.vectors[cand] @ q
+            cand = cand[np.argpartition(-approx, shortlist - 1)[:shortlist]]
+
+        exact = np.asarray((self.job_index.matrix[cand] @ q_sparse.T).todense()).ravel()
+        k = min(top_n, cand.size)
+        top = np.argpartition(-exact, k - 1)[:k]
+        top = top[np.argsort(-exact[top], kind="stable")]
+        return cand[top], exact[top]
@@ -0,0 +1,276 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.metrics import span
+
+INDEX_DIR = os.getenv("JOB_INDEX_DIR", os.path.join(".cache", "job_index"))
+# share of rows appended/deleted since the last fit after which the frozen
+# vocabulary and IDF are refitted in the background
+INDEX_DRIFT = float(os.getenv("JOB_INDEX_DRIFT", "0.2"))
+VECTORIZER_PARAMS: Dict[str, Any] = {"max_features": 30000, "ngram_range": (1, 2), "stop_words": "english"}
+
+log = logging.getLogger("index")
+
+
+def job_texts(jobs_df: pd.DataFrame) -> List[str]:
+    return (jobs_df["job_title"].fillna("") + "\n" + jobs_df["job_description"].fillna("")).tolist()
+
+
+def snapshot_key(jobs_df: pd.DataFrame) -> str:
+    # Hashing url/title/description costs ~0.8s at 100k jobs: callers that hold
+    # the key already (the corpus version) pass it as key= instead.
+    h = hashlib.sha1()
+    for col in ["url", "job_title", "job_description"]:
+        if col in jobs_df.columns:
+            h.update(pd.util.hash_pandas_object(jobs_df[col].fillna(""), index=False).values.tobytes())
+    h.update(str(len(jobs_df)).encode())
+    return h.hexdigest()[:16]
+
+
+def write_files(path: str, manifest: str, meta: Dict[str, Any], writers: Dict[str, Callable[[str], None]]) -> None:
+    # Apps load index files while the worker (or a compaction) rewrites them, so a
+    # save never touches the files in use. Each file gets a fresh generation suffix
+    # and is written to a temp dir, moved in with os.replace, and only then is the
+    # `manifest` json naming them swapped in: a reader sees the old set or the new
+    # one, never a mix. The previous generation stays for readers that opened the
+    # old manifest just before the swap.
+    os.makedirs(path, exist_ok=True)
+    gen = uuid.uuid4().hex[:12]
+    files = {name: f"{os.path.splitext(name)[0]}-{gen}{os.path.splitext(name)[1]}" for name in writers}
+    previous = manifest_files(path, manifest)
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=path)
+    try:
+        for name, write in writers.items():
+            write(os.path.join(tmp, files[name]))
+        with open(os.path.join(tmp, manifest), "w", encoding="utf-8") as fh:
+            json.dump(dict(meta, files=files), fh)
+        for name in files.values():
+            os.replace(os.path.join(tmp, name), os.path.join(path, name))
+        os.replace(os.path.join(tmp, manifest), os.path.join(path, manifest))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    keep = set(files.values()) | set(previous.values())
+    stems = tuple(os.path.splitext(name)[0] + "-" for name in writers)
+    for name in os.listdir(path):
+        if name.startswith(stems) and name not in keep:
+            try:
+                os.remove(os.path.join(path, name))
+            except OSError:
+                pass
+
+
+def manifest_files(path: str, manifest: str) -> Dict[str, str]:
+    # file name -> generation file of the saved set; {} before the first save
+    try:
+        with open(os.path.join(path, manifest), encoding="utf-8") as fh:
+            return json.load(fh).get("files", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def row_hashes(jobs_df: pd.DataFrame) -> np.ndarray:
+    # one uint64 per posting; url + content_hash when the crawler set it, which is
+    # much cheaper than hashing the description
+    cols = ["url", "content_hash"] if "content_hash" in jobs_df.columns else ["url", "job_title", "job_description"]
+    cols = [c for c in cols if c in jobs_df.columns]
+    return pd.util.hash_pandas_object(jobs_df[cols].fillna(""), index=False).to_numpy()
+
+
+def align_rows(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    # row in `old` of each `new` row hash, -1 for postings not indexed yet
+    first = np.flatnonzero(~pd.Index(old).duplicated())
+    pos = pd.Index(old[first]).get_indexer(new)
+    return np.where(pos >= 0, first[pos], -1)
+
+
+# TF-IDF model + job matrix fitted once per job snapshot. Rows are L2-normalised,
+# so a query is one transform of the candidate text plus a sparse dot product.
+# Later snapshots are applied with update(): the vocabulary and IDF stay frozen
+# until the share of appended/deleted rows since the fit (drift) calls for a refit.
+class JobIndex:
+    def __init__(self, vectorizer, matrix, key: str, rows: Optional[np.ndarray] = None, fitted: Optional[int] = None, appended: int = 0, deleted: int = 0):
+        self.vectorizer = vectorizer
+        self.matrix = matrix.tocsr()
+        self.key = key
+        self.rows = rows
+        self.fitted = self.matrix.shape[0] if fitted is None else fitted
+        self.appended = appended
+        self.deleted = deleted
+
+    @property
+    def n_jobs(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def drift(self) -> float:
+        return (self.appended + self.deleted) / max(1, self.fitted)
+
+    @classmethod
+    def build(cls, jobs_df: pd.DataFrame, key: Optional[str] = None) -> "JobIndex":
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+        with span("index.fit"):
+            X = vectorizer.fit_transform(job_texts(jobs_df))
+        return cls(vectorizer, X, key or snapshot_key(jobs_df), row_hashes(jobs_df))
+
+    def update(self, jobs_df: pd.DataFrame, key: Optional[str] = None) -> "JobIndex":
+        # Index of a later snapshot: unchanged postings keep their rows, new or
+        # changed ones are transformed with the frozen vectorizer, and rows of
+        # postings that are gone are tombstoned (dropped, counted as drift).
+        from scipy import sparse
+
+        if self.rows is None:
+            return JobIndex.build(jobs_df, key)
+        with span("index.update"):
+            rows = row_hashes(jobs_df)
+            src = align_rows(self.rows, rows)
+            fresh = np.flatnonzero(src < 0)
+            if len(fresh) > len(rows) // 2:
+                # mostly another corpus: a fit costs about the same as the transform
+                return JobIndex.build(jobs_df, key)
+            stacked = self.matrix
+            if len(fresh):
+                stacked = sparse.vstack([self.matrix, self.transform(job_texts(jobs_df.iloc[fresh]))], format="csr")
+                src[fresh] = self.n_jobs + np.arange(len(fresh))
+            live = np.zeros(self.n_jobs, dtype=bool)
+            live[src[src < self.n_jobs]] = True
+            matrix = stacked[src]
+        return JobIndex(
+            self.vectorizer,
+            matrix,
+            key or snapshot_key(jobs_df),
+            rows,
+            self.fitted,
+            self.appended + len(fresh),
+            self.deleted + int(self.n_jobs - live.sum()),
+        )
+
+    def transform(self, texts: List[str]):
+        return self.vectorizer.transform(texts)
+
+    def query(self, text: str) -> np.ndarray:
+        q = self.transform([text])
+        return np.asarray((self.matrix @ q.T).todense()).ravel()
+
+    def save(self, path: str) -> None:
+        from scipy import sparse
+
+        writers: Dict[str, Callable[[str], None]] = {
+            # uncompressed: zlib costs ~100x the write for a 100k-job matrix
+            "matrix.npz": lambda p: sparse.save_npz(p, self.matrix, compressed=False),
+            "idf.npy": lambda p: np.save(p, self.vectorizer.idf_),
+        }
+        if self.rows is not None:
+            writers["rows.npy"] = lambda p: np.save(p, self.rows)
+        vocab = {t: int(i) for t, i in self.vectorizer.vocabulary_.items()}
+        drift = {"fitted": self.fitted, "appended": self.appended, "deleted": self.deleted}
+        write_files(path, "vocabulary.json", {"key": self.key, "params": VECTORIZER_PARAMS, "drift": drift, "vocabulary": vocab}, writers)
+
+    @classmethod
+    def load(cls, path: str) -> "JobIndex":
+        from scipy import sparse
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        with open(os.path.join(path, "vocabulary.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        files = meta.get("files", {"matrix.npz": "matrix.npz", "idf.npy": "idf.npy", "rows.npy": "rows.npy"})
+        params = dict(meta["params"])
+        params["ngram_range"] = tuple(params["ngram_range"])
+        vectorizer = TfidfVectorizer(**params)
+        vectorizer.vocabulary_ = meta["vocabulary"]
+        vectorizer.idf_ = np.load(os.path.join(path, files["idf.npy"]))
+        matrix = sparse.load_npz(os.path.join(path, files["matrix.npz"]))
+        rows_path = os.path.join(path, files.get("rows.npy", "rows.npy"))
+        rows = np.load(rows_path) if os.path.exists(rows_path) else None
+        return cls(vectorizer, matrix, meta["key"], rows, **meta.get("drift", {}))
+
+
+_INDEXES: Dict[str, JobIndex] = {}
+_LOCK = threading.Lock()
+_COMPACTIONS: Dict[str, threading.Thread] = {}
+
+
+def index_path(key: str, index_dir: Optional[str] = None) -> Optional[str]:
+    # index_dir None: INDEX_DIR, read per call so it can be redirected (tests,
+    # benchmarks); "": keep the index in memory only
+    index_dir = INDEX_DIR if index_dir is None else index_dir
+    return os.path.join(index_dir, key) if index_dir else None
+
+
+def get_index(jobs_df: pd.DataFrame, index_dir: Optional[str] = None, key: Optional[str] = None) -> JobIndex:
+    key = key or snapshot_key(jobs_df)
+    idx = _INDEXES.get(key)
+    if idx is not None:
+        return idx
+    with _LOCK:
+        idx = _INDEXES.get(key)
+        if idx is not None:
+            return idx
+        path = index_path(key, index_dir)
+        if path and os.path.exists(os.path.join(path, "vocabulary.json")):
+            try:
+                idx = JobIndex.load(path)
+            except Exception:
+                idx = None
+        if idx is None:
+            # the previous snapshot's index, if any, absorbs the delta
+            prev = next(iter(_INDEXES.values()), None)
+            idx = prev.update(jobs_df, key) if prev is not None else JobIndex.build(jobs_df, key)
+            if path:
+                try:
+                    idx.save(path)
+                except OSError:
+                    pass
+        _INDEXES.clear()
+        _INDEXES[key] = idx
+    if idx.drift > INDEX_DRIFT:
+        compact(jobs_df, key, index_dir)
+    return idx
+
+
+def compact(jobs_df: pd.DataFrame, key: Optional[str] = None, index_dir: Optional[str] = None) -> threading.Thread:
+    # Refit vocabulary and IDF in a background thread; the drifted index keeps
+    # serving until the fresh one is swapped in (if `key` is still current).
+    key = key or snapshot_key(jobs_df)
+    path = index_path(key, index_dir)
+
+    def run():
+        try:
+            idx = JobIndex.build(jobs_df, key)
+            if path:
+                try:
+                    idx.save(path)
+                except OSError:
+                    pass
+            with _LOCK:
+                if key in _INDEXES:
+                    _INDEXES[key] = idx
+        except Exception:
+            # e.g. an empty corpus: the drifted index keeps serving
+            log.exception("compaction of job index %s failed", key)
+        finally:
+            with _LOCK:
+                _COMPACTIONS.pop(key, None)
+
+    with _LOCK:
+        t = _COMPACTIONS.get(key)
+        if t is None:
+            t = _COMPACTIONS[key] = threading.Thread(target=run, name="index-compact", daemon=True)
+            t.start()
+    return t
+
+
+def wait_for_compactions(timeout: Optional[float] = None) -> None:
+    for t in list(_COMPACTIONS.values()):
+        t.join(timeout)
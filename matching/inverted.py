@@ -0,0 +1,74 @@
+import re
+import threading
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from .index import snapshot_key
+
+TOKEN_RE = re.compile(r"[a-zA-Z0-9_]+")
+
+
+def tokens(s: str) -> Set[str]:
+    return set(TOKEN_RE.findall((s or "").lower()))
+
+
+# Token -> sorted job ids, built once per job snapshot. Jaccard against a query only
+# touches the postings of the query's own tokens.
+class InvertedIndex:
+    def __init__(self, postings: Dict[str, np.ndarray], sizes: np.ndarray, key: str):
+        self.postings = postings
+        self.sizes = sizes
+        self.key = key
+
+    @property
+    def n_jobs(self) -> int:
+        return self.sizes.shape[0]
+
+    @classmethod
+    def build(cls, jobs_df: pd.DataFrame, key: Optional[str] = None) -> "InvertedIndex":
+        texts = (jobs_df["job_title"].fillna("").astype(str) + " " + jobs_df["job_description"].fillna("").astype(str)).tolist()
+        lists: Dict[str, List[int]] = {}
+        sizes = np.zeros(len(texts), dtype=np.int32)
+        for i, t in enumerate(texts):
+            toks = tokens(t)
+            sizes[i] = len(toks)
+            for tok in toks:
+                lists.setdefault(tok, []).append(i)
+        postings = {tok: np.asarray(ids, dtype=np.int32) for tok, ids in lists.items()}
+        return cls(postings, sizes, key or snapshot_key(jobs_df))
+
+    def overlap(self, query: Set[str]) -> np.ndarray:
+        hits = [self.postings[t] for t in query if t in self.postings]
+        if not hits:
+            return np.zeros(self.n_jobs, dtype=np.int64)
+        return np.bincount(np.concatenate(hits), minlength=self.n_jobs)
+
+    def jaccard(self, text: str) -> np.ndarray:
+        a = tokens(text)
+        if not a:
+            return np.zeros(self.n_jobs)
+        inter = self.overlap(a)
+        union = len(a) + self.sizes - inter
+        sims = inter / np.maximum(union, 1)
+        sims[self.sizes == 0] = 0.0
+        return sims
+
+
+_INDEXES: Dict[str, InvertedIndex] = {}
+_LOCK = threading.Lock()
+
+
+def get_inverted_index(jobs_df: pd.DataFrame, key: Optional[str] = None) -> InvertedIndex:
+    key = key or snapshot_key(jobs_df)
+    idx = _INDEXES.get(key)
+    if idx is not None:
+        return idx
+    with _LOCK:
+        idx = _INDEXES.get(key)
+        if idx is None:
+            idx = InvertedIndex.build(jobs_df, key)
+            _INDEXES.clear()
+            _INDEXES[key] = idx
+        return idx
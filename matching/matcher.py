@@ -1,6 +1,18 @@
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 
+from services.metrics import span, timed
+
+from .ann import IVFIndex
+from .index import JobIndex, get_index, snapshot_key
+from .results import MatchResult, get_job_filters, top_rows
+from .scoring import SCORE_WEIGHTS, blend_scores, blend_weights, candidate_location, get_skill_index, score_components
+
+# ANN text candidates per requested match that the full score blend re-ranks
+ANN_RERANK = 5
+
 def candidate_text(candidate: Dict[str, Any]) -> str:
     parts = []
     parts.append(candidate.get("summary", ""))
@@ -16,37 +28,210 @@ def candidate_text(candidate: Dict[str, Any]) -> str:
     for e in candidate.get("education", []):
         parts.append(" ".join([e.get("degree", ""), e.get("institution", ""), e.get("location", "")]))
 
+    # canonical names let aliases ("sklearn", "ms excel") meet the wording used in job ads
+    parts.append(" ".join(candidate_skills(candidate)))
+
     return "\n".join([p for p in parts if p])
 
-def compute_matches(candidate: Dict[str, Any], jobs_df: pd.DataFrame, top_n: int = 10) -> pd.DataFrame:
-    text = candidate_text(candidate)
+def match_cache_parts(candidate: Dict[str, Any], weights: Optional[Dict[str, float]] = None) -> Tuple[str, str, Tuple[Tuple[str, float], ...]]:
+    # everything rank_matches scores depend on besides the corpus: the profile text,
+    # the location score_components blends in, and the blend weights
+    location = ((candidate.get("personal_info") or {}).get("location") or "").strip().lower()
+    return candidate_text(candidate), location, tuple(sorted((weights or SCORE_WEIGHTS).items()))
+
+def candidate_skills(candidate: Dict[str, Any]) -> List[str]:
+    from parsing.skills import find_skills
+
+    names = [m.get("skill", "") for m in candidate.get("skill_mentions", [])]
+    skills = candidate.get("skills", {})
+    for k in ["hard", "tools", "soft", "languages"]:
+        for item in skills.get(k, []):
+            names.extend(m.skill for m in find_skills(item))
+    return list(dict.fromkeys(n for n in names if n))
+
+@timed("matcher.compute_matches")
+def compute_matches(
+    candidate: Dict[str, Any],
+    jobs_df: pd.DataFrame,
+    top_n: int = 10,
+    index: Optional[JobIndex] = None,
+    ann: Optional[IVFIndex] = None,
+    weights: Optional[Dict[str, float]] = None,
+    key: Optional[str] = None,
+) -> pd.DataFrame:
+    return rank_matches(candidate, jobs_df, top_n, index, ann, weights, key).to_frame()
+
+def rank_matches(
+    candidate: Dict[str, Any],
+    jobs_df: pd.DataFrame,
+    top_n: int = 10,
+    index: Optional[JobIndex] = None,
+    ann: Optional[IVFIndex] = None,
+    weights: Optional[Dict[str, float]] = None,
+    key: Optional[str] = None,
+) -> MatchResult:
+    # Like compute_matches, but returns row positions + scores of the top_n jobs
+    # without copying the corpus; filter/head it, then to_frame() what gets shown.
+    # `key` is the snapshot key when the caller already has it (the corpus version).
+    key = key or (index.key if index is not None else snapshot_key(jobs_df))
+    with span("matcher.candidate_text"):
+        text = candidate_text(candidate)
     try:
-        from sklearn.feature_extraction.text import TfidfVectorizer
-        from sklearn.metrics.pairwise import cosine_similarity
+        import sklearn  # noqa: F401
     except Exception:
-        return _fallback_matches(text, jobs_df, top_n)
+        with span("matcher.fallback"):
+            return _fallback_rank(text, jobs_df, top_n, key)
 
-    docs = [text] + (jobs_df["job_title"].fillna("") + "\n" + jobs_df["job_description"].fillna("")).tolist()
-    vectorizer = TfidfVectorizer(max_features=30000, ngram_range=(1, 2), stop_words="english")
-    X = vectorizer.fit_transform(docs)
-    sims = cosine_similarity(X[0:1], X[1:]).flatten()
+    filters = get_job_filters(jobs_df, key)
+    skills = candidate_skills(candidate)
+    if ann is not None:
+        # a wider text shortlist, re-ranked with the same blend as the exact path
+        with span("matcher.ann_search"):
+            n = top_n * ANN_RERANK
+            shortlist, text_scores = ann.search(text, top_n=n, shortlist=max(200, n))
+        skill_index = get_skill_index(jobs_df, key=key)
+        with span("matcher.score"):
+            scores = blend_scores(candidate, skills, text_scores, skill_index, weights, shortlist)
+        with span("matcher.select"):
+            best = top_rows(scores["match_score"], top_n)
+            rows = shortlist[best]
+            columns = {col: vals[best] for col, vals in scores.items()}
+            matched = skill_index.matched_skills(skills, rows)
+        return MatchResult(jobs_df, rows, columns, matched, filters)
 
-    out = jobs_df.copy().reset_index(drop=True)
-    out["match_score"] = sims
-    out.sort_values("match_score", ascending=False, inplace=True)
-    return out.head(top_n)
+    with span("matcher.index"):
+        if index is None:
+            index = get_index(jobs_df, key=key)
+        skill_index = get_skill_index(jobs_df, key=key)
+    with span("matcher.score"):
+        scores = score_components(candidate, text, skills, index, skill_index, weights)
 
-def _fallback_matches(text: str, jobs_df: pd.DataFrame, top_n: int) -> pd.DataFrame:
-    import re
-    def toks(s: str):
-        return set(re.findall(r"[a-zA-Z0-9_]+", (s or "").lower()))
-    a = toks(text)
-    sims = []
-    for _, row in jobs_df.iterrows():
-        b = toks((row.get("job_title") or "") + " " + (row.get("job_description") or ""))
-        sims.append(0.0 if not a or not b else len(a & b) / len(a | b))
-    out = jobs_df.copy().reset_index(drop=True)
-    out["match_score"] = sims
-    out.sort_values("match_score", ascending=False, inplace=True)
-    return out.head(top_n)
+    with span("matcher.select"):
+        rows = top_rows(scores["match_score"], top_n)
+        columns = {col: vals[rows] for col, vals in scores.items()}
+        matched = skill_index.matched_skills(skills, rows)
+    return MatchResult(jobs_df, rows, columns, matched, filters)
 
+def compute_matches_batch(
+    candidates: List[Dict[str, Any]],
+    jobs_df: pd.DataFrame,
+    top_n: int = 10,
+    index: Optional[JobIndex] = None,
+    ram_budget_mb: float = 256.0,
+    weights: Optional[Dict[str, float]] = None,
+    key: Optional[str] = None,
+) -> pd.DataFrame:
+    t0 = time.perf_counter()
+    texts = [candidate_text(c) for c in candidates]
+    ids = [c.get("id", i) for i, c in enumerate(candidates)]
+    try:
+        import sklearn  # noqa: F401
+    except Exception:
+        frames = []
+        for i, text in enumerate(texts):
+            m = _fallback_matches(text, jobs_df, top_n)
+            m.insert(0, "candidate_id", ids[i])
+            frames.append(m)
+        out = pd.concat(frames, ignore_index=True) if frames else jobs_df.head(0).assign(candidate_id=[], match_score=[])
+        return _with_batch_stats(out, len(texts), t0)
+
+    key = key or (index.key if index is not None else snapshot_key(jobs_df))
+    if index is None:
+        index = get_index(jobs_df, key=key)
+    skill_index = get_skill_index(jobs_df, key=key)
+    n_jobs = index.n_jobs
+    k = min(top_n, n_jobs)
+    # Same blend as rank_matches: per candidate, the text, skill and location
+    # scores weighted by blend_weights.
+    skills = [candidate_skills(c) for c in candidates]
+    blends = [blend_weights(c, s, weights) for c, s in zip(candidates, skills)]
+    locations = [candidate_location(c) for c in candidates]
+    inv_total = np.divide(1.0, skill_index.totals, out=np.zeros_like(skill_index.totals), where=skill_index.totals > 0).astype(np.float32)
+    codes = skill_index.location_codes
+    location_cache: Dict[str, np.ndarray] = {}
+    # Scores are float32 throughout. Per candidate row a sparse product (text,
+    # then skills) holds n_jobs float32 values + int32 indices and the dense block
+    # another float32, 12 bytes per cell. Fixed costs: the float32 terms x jobs
+    # and skills x jobs copies of the job matrices (CSR, so the products neither
+    # convert them per chunk nor need a converting toarray) and one row of
+    # scratch: argpartition (int64), the location gather and the skill row.
+    MT = index.matrix.astype(np.float32, copy=False).T.tocsr()
+    ST = skill_index.matrix.astype(np.float32, copy=False).T.tocsr()
+    fixed = (MT.nnz + ST.nnz) * 8 + n_jobs * 28
+    chunk = max(1, int((ram_budget_mb * 1024 * 1024 - fixed) // max(1, n_jobs * 12)))
+    chunk = min(chunk, max(1, len(texts)))
+    block = np.empty((chunk, n_jobs), dtype=np.float32)
+
+    cand_rows, job_rows, scores = [], [], []
+    for start in range(0, len(texts), chunk):
+        Q = index.transform(texts[start:start + chunk]).astype(np.float32)
+        P = Q @ MT
+        S = P.toarray(out=block[:P.shape[0]])
+        m = S.shape[0]
+        del P
+        if k <= 0:
+            continue
+        P = _skill_queries(skills[start:start + m], skill_index) @ ST
+        top = np.empty((m, k), dtype=np.int64)
+        for r in range(m):
+            c = start + r
+            row = S[r]
+            row *= blends[c].get("text", 0.0)
+            w = blends[c].get("skills", 0.0)
+            if w:
+                idx = P.indices[P.indptr[r]:P.indptr[r + 1]]
+                row[idx] += w * P.data[P.indptr[r]:P.indptr[r + 1]] * inv_total[idx]
+            w = blends[c].get("location", 0.0)
+            if w:
+                loc = locations[c]
+                if loc not in location_cache:
+                    location_cache[loc] = skill_index.location_category_scores(loc).astype(np.float32)
+                row += w * location_cache[loc][codes]
+            # negate in place so partitioning keeps the highest scores first
+            np.negative(row, out=row)
+            top[r] = np.argpartition(row, k - 1)[:k] if k < n_jobs else np.arange(n_jobs)
+        del P
+        top_scores = -np.take_along_axis(S, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        cand_rows.append(np.repeat(np.arange(start, start + m), k))
+        job_rows.append(top.ravel())
+        scores.append(top_scores.ravel())
+
+    base = jobs_df.reset_index(drop=True)
+    if not job_rows:
+        out = base.head(0).assign(candidate_id=[], match_score=[])
+        return _with_batch_stats(out, len(texts), t0)
+    cand_idx = np.concatenate(cand_rows)
+    out = base.iloc[np.concatenate(job_rows)].reset_index(drop=True)
+    out.insert(0, "candidate_id", [ids[i] for i in cand_idx])
+    out["match_score"] = np.concatenate(scores)
+    return _with_batch_stats(out, len(texts), t0)
+
+def _skill_queries(skills: List[List[str]], skill_index):
+    # one row per candidate: its known skills, each weighted by rarity
+    from scipy import sparse
+
+    rows: List[int] = []
+    cols: List[int] = []
+    for i, names in enumerate(skills):
+        ids = {skill_index.skill_ids[s] for s in names if s in skill_index.skill_ids}
+        rows.extend([i] * len(ids))
+        cols.extend(ids)
+    data = skill_index.weights[cols].astype(np.float32)
+    return sparse.csr_matrix((data, (rows, cols)), shape=(len(skills), skill_index.matrix.shape[1]))
+
+def _with_batch_stats(out: pd.DataFrame, n: int, t0: float) -> pd.DataFrame:
+    dt = time.perf_counter() - t0
+    out.attrs["stats"] = {"candidates": n, "seconds": dt, "candidates_per_sec": n / dt if dt > 0 else float("inf")}
+    return out
+
+def _fallback_rank(text: str, jobs_df: pd.DataFrame, top_n: int, key: Optional[str] = None) -> MatchResult:
+    filters = get_job_filters(jobs_df, key)
+    sims = filters.inverted.jaccard(text)
+    rows = top_rows(sims, top_n)
+    return MatchResult(jobs_df, rows, {"match_score": sims[rows]}, filters=filters)
+
+def _fallback_matches(text: str, jobs_df: pd.DataFrame, top_n: int) -> pd.DataFrame:
+    return _fallback_rank(text, jobs_df, top_n).to_frame()
@@ -0,0 +1,136 @@
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .index import snapshot_key
+from .inverted import TOKEN_RE, InvertedIndex, get_inverted_index
+
+
+def top_rows(scores: np.ndarray, n: int) -> np.ndarray:
+    # Positions of the n best scores, best first (ties by position). argpartition
+    # keeps this O(len(scores)) with only the n winners sorted.
+    n = min(n, scores.shape[0])
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64)
+    rows = np.argpartition(-scores, n - 1)[:n] if n < scores.shape[0] else np.arange(scores.shape[0])
+    return rows[np.lexsort((rows, -scores[rows]))]
+
+
+# Lower-cased title/location columns plus the token index, built once per job
+# snapshot, so match filters never touch the full corpus strings.
+class JobFilters:
+    def __init__(self, titles: np.ndarray, locations: np.ndarray, jobs_df: pd.DataFrame, key: str):
+        self.titles = titles
+        self.locations = locations
+        self.key = key
+        self._jobs_df = jobs_df
+        self._inverted: Optional[InvertedIndex] = None
+
+    @classmethod
+    def build(cls, jobs_df: pd.DataFrame, key: Optional[str] = None) -> "JobFilters":
+        lower = lambda col: jobs_df[col].fillna("").astype(str).str.lower().to_numpy()  # noqa: E731
+        return cls(lower("job_title"), lower("location"), jobs_df, key or snapshot_key(jobs_df))
+
+    @property
+    def inverted(self) -> InvertedIndex:
+        # resolved once, on the first keyword filter
+        if self._inverted is None:
+            self._inverted = get_inverted_index(self._jobs_df, self.key)
+        return self._inverted
+
+    def location_mask(self, rows: np.ndarray, needle: str) -> np.ndarray:
+        needle = needle.strip().lower()
+        return np.fromiter((needle in self.locations[r] for r in rows), dtype=bool, count=len(rows))
+
+    def keyword_mask(self, rows: np.ndarray, keyword: str) -> np.ndarray:
+        # substring of the title, or every keyword token in the title+description tokens
+        kw = keyword.strip().lower()
+        mask = np.fromiter((kw in self.titles[r] for r in rows), dtype=bool, count=len(rows))
+        toks = TOKEN_RE.findall(kw)
+        if toks:
+            postings = self.inverted.postings
+            in_desc = np.ones(len(rows), dtype=bool)
+            for tok in toks:
+                p = postings.get(tok)
+                if p is None:
+                    in_desc[:] = False
+                    break
+                pos = np.searchsorted(p, rows)
+                in_desc &= p[np.minimum(pos, len(p) - 1)] == rows
+            mask |= in_desc
+        return mask
+
+
+_FILTERS: Dict[str, JobFilters] = {}
+_LOCK = threading.Lock()
+
+
+def get_job_filters(jobs_df: pd.DataFrame, key: Optional[str] = None) -> JobFilters:
+    key = key or snapshot_key(jobs_df)
+    f = _FILTERS.get(key)
+    if f is not None:
+        return f
+    with _LOCK:
+        f = _FILTERS.get(key)
+        if f is None:
+            f = JobFilters.build(jobs_df, key)
+            _FILTERS.clear()
+            _FILTERS[key] = f
+        return f
+
+
+# Top-N matches as row positions into the corpus plus per-row score columns. The
+# corpus itself is only referenced; rows are copied out in to_frame(). `filters`
+# are the snapshot's JobFilters, carried along so filtering never re-keys the corpus.
+class MatchResult:
+    def __init__(
+        self,
+        jobs_df: pd.DataFrame,
+        rows: np.ndarray,
+        columns: Dict[str, np.ndarray],
+        matched_skills: Optional[List[List[str]]] = None,
+        filters: Optional[JobFilters] = None,
+    ):
+        self.jobs_df = jobs_df
+        self.rows = rows
+        self.columns = columns
+        self.matched_skills = matched_skills
+        self.filters = filters
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self.columns["match_score"]
+
+    def _take(self, sel: np.ndarray) -> "MatchResult":
+        if sel.dtype == bool:
+            sel = np.flatnonzero(sel)
+        skills = None if self.matched_skills is None else [self.matched_skills[i] for i in sel]
+        return MatchResult(self.jobs_df, self.rows[sel], {k: v[sel] for k, v in self.columns.items()}, skills, self.filters)
+
+    def filter(self, location: str = "", keyword: str = "", min_score: float = 0.0, filters: Optional[JobFilters] = None) -> "MatchResult":
+        mask = self.scores >= min_score
+        if (location or keyword) and len(self.rows):
+            filters = filters or self.filters or get_job_filters(self.jobs_df)
+            if location:
+                mask &= filters.location_mask(self.rows, location)
+            if keyword:
+                mask &= filters.keyword_mask(self.rows, keyword)
+        return self._take(mask)
+
+    def head(self, n: int) -> "MatchResult":
+        return self._take(np.arange(min(n, len(self.rows))))
+
+    def to_frame(self) -> pd.DataFrame:
+        # indexed by corpus position, like the frames compute_matches used to sort
+        out = self.jobs_df.iloc[self.rows].copy()
+        out.index = self.rows
+        for col, vals in self.columns.items():
+            out[col] = vals
+        if self.matched_skills is not None:
+            out["matched_skills"] = self.matched_skills
+        return out
@@ -0,0 +1,239 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .index import JobIndex, align_rows, index_path, job_texts, row_hashes, snapshot_key, write_files
+
+SCORE_WEIGHTS = {"text": 0.5, "skills": 0.4, "location": 0.1}
+REMOTE_LOCATION_SCORE = 0.5
+
+
+# Canonical skills of every job as a sparse binary job x skill matrix, plus the
+# location categories, extracted once per job snapshot; update() only scans the
+# postings a later snapshot adds or changes.
+class JobSkillIndex:
+    def __init__(self, matrix, skills: List[str], locations: pd.Series, key: str, rows: Optional[np.ndarray] = None):
+        self.matrix = matrix.tocsr()
+        self.skills = skills
+        self.skill_ids = {s: i for i, s in enumerate(skills)}
+        self.locations = locations
+        # a query scores each distinct location once; code -1 (missing) picks the
+        # trailing 0 of location_category_scores
+        self.location_codes = locations.cat.codes.to_numpy()
+        self.location_names = locations.cat.categories.astype(str).str.lower()
+        self.key = key
+        self.rows = rows
+        df = np.asarray(self.matrix.sum(axis=0)).ravel()
+        # rarer skills carry more weight in the overlap
+        self.weights = np.log((1 + self.matrix.shape[0]) / (1 + df)) + 1.0
+        self.totals = self.matrix @ self.weights
+
+    @staticmethod
+    def _extract(texts: List[str], skill_ids: Dict[str, int]):
+        from scipy import sparse
+        from parsing.skills import find_skills
+
+        rows: List[int] = []
+        cols: List[int] = []
+        for i, text in enumerate(texts):
+            for sid in {skill_ids.setdefault(m.skill, len(skill_ids)) for m in find_skills(text)}:
+                rows.append(i)
+                cols.append(sid)
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(texts), max(1, len(skill_ids))),
+        )
+
+    @classmethod
+    def build(cls, jobs_df: pd.DataFrame, key: Optional[str] = None) -> "JobSkillIndex":
+        skill_ids: Dict[str, int] = {}
+        matrix = cls._extract(job_texts(jobs_df), skill_ids)
+        return cls(matrix, list(skill_ids), _locations(jobs_df), key or snapshot_key(jobs_df), row_hashes(jobs_df))
+
+    def update(self, jobs_df: pd.DataFrame, key: Optional[str] = None) -> "JobSkillIndex":
+        # rows of unchanged postings are reused; new skills append columns
+        from scipy import sparse
+
+        if self.rows is None:
+            return JobSkillIndex.build(jobs_df, key)
+        rows = row_hashes(jobs_df)
+        src = align_rows(self.rows, rows)
+        fresh = np.flatnonzero(src < 0)
+        matrix = self.matrix
+        skill_ids = dict(self.skill_ids)
+        if len(fresh):
+            delta = self._extract(job_texts(jobs_df.iloc[fresh]), skill_ids)
+            width = max(matrix.shape[1], delta.shape[1])
+            matrix = sparse.vstack([_widen(matrix, width), _widen(delta, width)], format="csr")
+            src[fresh] = self.matrix.shape[0] + np.arange(len(fresh))
+        return JobSkillIndex(matrix[src], list(skill_ids), _locations(jobs_df), key or snapshot_key(jobs_df), rows)
+
+    def save(self, path: str) -> None:
+        from scipy import sparse
+
+        # same dir as the TF-IDF files, swapped in the same way (write_files)
+        writers: Dict[str, Callable[[str], None]] = {"skills.npz": lambda p: sparse.save_npz(p, self.matrix, compressed=False)}
+        if self.rows is not None:
+            writers["skill_rows.npy"] = lambda p: np.save(p, self.rows)
+        write_files(path, "skills.json", {"key": self.key, "taxonomy": taxonomy_version(), "skills": self.skills}, writers)
+
+    @classmethod
+    def load(cls, path: str, jobs_df: pd.DataFrame) -> Optional["JobSkillIndex"]:
+        # None when the file was built from another taxonomy
+        from scipy import sparse
+
+        with open(os.path.join(path, "skills.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta.get("taxonomy") != taxonomy_version():
+            return None
+        files = meta.get("files", {"skills.npz": "skills.npz", "skill_rows.npy": "rows.npy"})
+        rows_path = os.path.join(path, files.get("skill_rows.npy", "rows.npy"))
+        rows = np.load(rows_path) if os.path.exists(rows_path) else None
+        return cls(sparse.load_npz(os.path.join(path, files["skills.npz"])), meta["skills"], _locations(jobs_df), meta["key"], rows)
+
+    def candidate_vector(self, skills: List[str]) -> np.ndarray:
+        v = np.zeros(self.matrix.shape[1], dtype=np.float32)
+        ids = [self.skill_ids[s] for s in skills if s in self.skill_ids]
+        v[ids] = 1.0
+        return v
+
+    def skill_scores(self, skills: List[str], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        # weighted share of each job's skills the candidate covers (only `rows`, if given)
+        c = self.candidate_vector(skills)
+        matrix, total = (self.matrix, self.totals) if rows is None else (self.matrix[rows], self.totals[rows])
+        covered = matrix @ (c * self.weights)
+        return np.divide(covered, total, out=np.zeros_like(total), where=total > 0)
+
+    def location_category_scores(self, location: str) -> np.ndarray:
+        # score per location category, plus a trailing 0 for jobs without one
+        toks = re.findall(r"[^\W\d_]{3,}", (location or "").lower())
+        out = np.zeros(len(self.location_names) + 1)
+        out[:-1][self.location_names.str.contains("remote", regex=False)] = REMOTE_LOCATION_SCORE
+        if toks:
+            pattern = r"\b(?:" + "|".join(map(re.escape, toks)) + r")\b"
+            out[:-1][self.location_names.str.contains(pattern, regex=True)] = 1.0
+        return out
+
+    def location_scores(self, location: str, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        codes = self.location_codes if rows is None else self.location_codes[rows]
+        return self.location_category_scores(location)[codes]
+
+    def matched_skills(self, skills: List[str], rows: np.ndarray) -> List[List[str]]:
+        from scipy import sparse
+
+        sub = self.matrix[rows].multiply(sparse.csr_matrix(self.candidate_vector(skills))).tocsr()
+        sub.eliminate_zeros()
+        return [[self.skills[j] for j in sub.indices[sub.indptr[r]:sub.indptr[r + 1]]] for r in range(sub.shape[0])]
+
+
+def _locations(jobs_df: pd.DataFrame) -> pd.Series:
+    # snapshots already store location as a category; live frames are converted
+    if "location" not in jobs_df.columns:
+        return pd.Series(pd.Categorical([None] * len(jobs_df)))
+    loc = jobs_df["location"].reset_index(drop=True)
+    return loc if isinstance(loc.dtype, pd.CategoricalDtype) else loc.astype("category")
+
+
+def _widen(matrix, width: int):
+    # same rows with trailing empty columns, sharing the CSR buffers
+    from scipy import sparse
+
+    if matrix.shape[1] == width:
+        return matrix
+    return sparse.csr_matrix((matrix.data, matrix.indices, matrix.indptr), shape=(matrix.shape[0], width))
+
+
+_INDEXES: Dict[str, JobSkillIndex] = {}
+_LOCK = threading.Lock()
+
+
+def taxonomy_version() -> str:
+    from parsing.skills import TAXONOMY_PATH
+
+    with open(TAXONOMY_PATH, "rb") as fh:
+        return hashlib.sha1(fh.read()).hexdigest()[:12]
+
+
+def get_skill_index(jobs_df: pd.DataFrame, index_dir: Optional[str] = None, key: Optional[str] = None) -> JobSkillIndex:
+    # same layout as get_index: persisted next to the TF-IDF files for the snapshot
+    key = key or snapshot_key(jobs_df)
+    idx = _INDEXES.get(key)
+    if idx is not None:
+        return idx
+    with _LOCK:
+        idx = _INDEXES.get(key)
+        if idx is not None:
+            return idx
+        path = index_path(key, index_dir)
+        if path and os.path.exists(os.path.join(path, "skills.json")):
+            try:
+                idx = JobSkillIndex.load(path, jobs_df)
+            except Exception:
+                idx = None
+        if idx is None:
+            prev = next(iter(_INDEXES.values()), None)
+            idx = prev.update(jobs_df, key) if prev is not None else JobSkillIndex.build(jobs_df, key)
+            if path:
+                try:
+                    idx.save(path)
+                except OSError:
+                    pass
+        _INDEXES.clear()
+        _INDEXES[key] = idx
+        return idx
+
+
+def candidate_location(candidate: Dict[str, Any]) -> str:
+    return (candidate.get("personal_info") or {}).get("location", "") or ""
+
+
+def blend_weights(candidate: Dict[str, Any], skills: List[str], weights: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    # components the candidate gives us nothing for don't drag the total down
+    weights = dict(weights or SCORE_WEIGHTS)
+    if not skills:
+        weights.pop("skills", None)
+    if not candidate_location(candidate):
+        weights.pop("location", None)
+    total = sum(weights.values()) or 1.0
+    return {k: w / total for k, w in weights.items()}
+
+
+def blend_scores(
+    candidate: Dict[str, Any],
+    skills: List[str],
+    text_scores: np.ndarray,
+    skill_index: JobSkillIndex,
+    weights: Optional[Dict[str, float]] = None,
+    rows: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    # text scores of all jobs, or of `rows` only (e.g. an ANN shortlist)
+    location = candidate_location(candidate)
+    scores = {
+        "text": text_scores,
+        "skills": skill_index.skill_scores(skills, rows),
+        "location": skill_index.location_scores(location, rows),
+    }
+    combined = sum((w * scores[k] for k, w in blend_weights(candidate, skills, weights).items()), np.zeros(len(text_scores)))
+    return {
+        "match_score": combined,
+        "text_score": scores["text"],
+        "skill_score": scores["skills"],
+        "location_score": scores["location"],
+    }
+
+
+def score_components(
+    candidate: Dict[str, Any],
+    text: str,
+    skills: List[str],
+    index: JobIndex,
+    skill_index: JobSkillIndex,
+    weights: Optional[Dict[str, float]] = None,
+) -> Dict[str, np.ndarray]:
+    return blend_scores(candidate, skills, index.query(text), skill_index, weights)
@@ -0,0 +1,154 @@
+"""Bulk CV parsing across a process pool, streamed to JSONL.
+
+    python -m parsing.bulk --input cvs/ --output parsed.jsonl --workers 8
+    python -m parsing.bulk --input raw.jsonl --output parsed.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cv_parser import extract_cv_structured
+from .extract import extract_pdf_text
+
+SUPPORTED_EXTS = {".txt", ".pdf"}
+
+# (doc_id, path or None, inline text or None)
+Item = Tuple[str, Optional[str], Optional[str]]
+
+
+def iter_inputs(src: str, text_field: str = "text", id_field: str = "id") -> Iterator[Item]:
+    if os.path.isdir(src):
+        for root, _, files in os.walk(src):
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in SUPPORTED_EXTS:
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, src), path, None
+        return
+    with open(src, encoding="utf-8") as fh:
+        for n, line in enumerate(fh):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                rec = None
+            if not isinstance(rec, dict):
+                # not JSON, or JSON that is not a record: an error result for this line
+                yield f"line-{n}", None, None
+                continue
+            yield str(rec.get(id_field, f"line-{n}")), rec.get("path"), rec.get(text_field)
+
+
+def _read_text(path: str) -> Tuple[str, bool]:
+    # (text, already normalized): extracted PDF text comes back normalized
+    with open(path, "rb") as fh:
+        data = fh.read()
+    if path.lower().endswith(".pdf"):
+        res = extract_pdf_text(data)
+        if res.method == "failed":
+            raise ValueError(f"PDF extraction failed: {res.error}")
+        return res.text, True
+    try:
+        return data.decode("utf-8"), False
+    except UnicodeDecodeError:
+        return data.decode("latin-1", errors="ignore"), False
+
+
+def _parse_one(item: Item) -> Dict[str, Any]:
+    doc_id, path, text = item
+    t0 = time.perf_counter()
+    try:
+        normalized = False
+        if text is None:
+            if not path:
+                raise ValueError("record has neither text nor path")
+            text, normalized = _read_text(path)
+        result = extract_cv_structured(text, normalized)
+        return {"id": doc_id, "ok": True, "seconds": time.perf_counter() - t0, "result": result}
+    except Exception as e:
+        return {
+            "id": doc_id,
+            "ok": False,
+            "seconds": time.perf_counter() - t0,
+            "error": f"{type(e).__name__}: {e}",
+            "traceback": traceback.format_exc(limit=3),
+        }
+
+
+def _parse_chunk(items: List[Item]) -> List[Dict[str, Any]]:
+    return [_parse_one(it) for it in items]
+
+
+def _chunks(items: Iterable[Item], size: int) -> Iterator[List[Item]]:
+    buf: List[Item] = []
+    for it in items:
+        buf.append(it)
+        if len(buf) >= size:
+            yield buf
+            buf = []
+    if buf:
+        yield buf
+
+
+def parse_many(items: Iterable[Item], workers: Optional[int] = None, chunk_size: int = 16, max_pending: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        for it in items:
+            yield _parse_one(it)
+        return
+    # at most max_pending chunks are in flight, so memory stays bounded on huge inputs
+    max_pending = max_pending or workers * 2
+    chunks = _chunks(items, chunk_size)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for chunk in chunks:
+            pending.add(pool.submit(_parse_chunk, chunk))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield from fut.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield from fut.result()
+
+
+def write_jsonl(records: Iterable[Dict[str, Any]], out) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    n = failed = 0
+    for rec in records:
+        out.write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+        n += 1
+        failed += 0 if rec["ok"] else 1
+    dt = time.perf_counter() - t0
+    return {"docs": n, "failed": failed, "seconds": dt, "docs_per_sec": n / dt if dt > 0 else 0.0}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Parse many CVs into structured JSONL.")
+    ap.add_argument("--input", required=True, help="directory of .txt/.pdf files or JSONL with id/text (or path) fields")
+    ap.add_argument("--output", default="-", help="JSONL output path ('-' for stdout)")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--chunk-size", type=int, default=16)
+    ap.add_argument("--text-field", default="text")
+    ap.add_argument("--id-field", default="id")
+    args = ap.parse_args(argv)
+
+    records = parse_many(iter_inputs(args.input, args.text_field, args.id_field), workers=args.workers, chunk_size=args.chunk_size)
+    if args.output == "-":
+        summary = write_jsonl(records, sys.stdout)
+    else:
+        with open(args.output, "w", encoding="utf-8") as out:
+            summary = write_jsonl(records, out)
+    print(json.dumps(summary), file=sys.stderr)
+    return 1 if summary["docs"] and summary["failed"] == summary["docs"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .cv_parser import PARSER_VERSION, extract_cv_structured
+from .normalizers import normalize_text
+
+PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", "256"))
+PARSE_CACHE_DB = os.getenv("PARSE_CACHE_DB", "")
+
+
+# Parsed CVs keyed by hash(normalized text) + parser version. Entries are kept as
+# JSON so every hit hands back a fresh dict the UI can edit freely. The optional
+# SQLite tier survives restarts and is purged when PARSER_VERSION changes.
+class ParseCache:
+    def __init__(self, maxsize: int = PARSE_CACHE_SIZE, db_path: Optional[str] = None, version: str = PARSER_VERSION):
+        self.maxsize = maxsize
+        self.version = version
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "invalidated": 0}
+        self._mem: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("create table if not exists parses (key text primary key, version text, result text, created_at real)")
+            cur = self._db.execute("delete from parses where version != ?", (version,))
+            self.stats["invalidated"] = cur.rowcount
+            self._db.commit()
+
+    def key(self, raw_text: str, normalized: bool = False) -> str:
+        text = (raw_text or "") if normalized else normalize_text(raw_text or "")
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.version}:{digest}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            blob = self._mem.get(key)
+            if blob is not None:
+                self._mem.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return json.loads(blob)
+            if self._db is not None:
+                row = self._db.execute("select result from parses where key = ?", (key,)).fetchone()
+                if row:
+                    self.stats["disk_hits"] += 1
+                    self._remember(key, row[0])
+                    return json.loads(row[0])
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        blob = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, blob)
+            if self._db is not None:
+                self._db.execute(
+                    "insert or replace into parses (key, version, result, created_at) values (?, ?, ?, ?)",
+                    (key, self.version, blob, time.time()),
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, blob: str) -> None:
+        self._mem[key] = blob
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.maxsize:
+            self._mem.popitem(last=False)
+
+    def parse(self, raw_text: str, normalized: bool = False) -> Dict[str, Any]:
+        # the text is normalized once, for the key, and a miss parses that same text
+        text = (raw_text or "") if normalized else normalize_text(raw_text or "")
+        key = self.key(text, normalized=True)
+        result = self.get(key)
+        if result is None:
+            result = extract_cv_structured(text, normalized=True)
+            self.put(key, result)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            if self._db is not None:
+                self._db.execute("delete from parses")
+                self._db.commit()
+
+
+_CACHE: Optional[ParseCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_parse_cache() -> ParseCache:
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = ParseCache(db_path=PARSE_CACHE_DB or None)
+    return _CACHE
+
+
+def parse_cached(raw_text: str, normalized: bool = False) -> Dict[str, Any]:
+    return get_parse_cache().parse(raw_text, normalized)
@@ -1,7 +1,13 @@
 import re
-from typing import Dict, Any, List
+from bisect import bisect_right
+from typing import Dict, Any, Iterable, Iterator, List, Tuple
+
+from services.metrics import span, timed
 
 from .normalizers import normalize_text, normalize_date_range
+from .skills import find_skills
+
+PARSER_VERSION = "v2"
 
 SECTION_HEADERS = {
     "experience": re.compile(r"^(experience|professional experience|work|employment|expérience|stages|internships)$", re.IGNORECASE),
@@ -12,6 +18,17 @@ SECTION_HEADERS = {
     "languages": re.compile(r"^(languages?|langues?)$", re.IGNORECASE),
 }
 
+# All headers as one alternation, tried in SECTION_HEADERS order on whole lines.
+SECTION_RE = re.compile(
+    r"^[^\S\n]*(?:" + "|".join(f"(?P<{k}>{rx.pattern[2:-2]})" for k, rx in SECTION_HEADERS.items()) + r")[^\S\n]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+BLANK_LINE_RE = re.compile(r"\n\s*\n")
+# list separators in skills/languages blocks; a dash only counts when spaced or bulleted
+SKILL_ITEM_RE = re.compile(r"(?:[^,\n•—;/\\|\s-]|(?<=\S)-(?=\S)|[^\S\n])+")
+
+Span = Tuple[int, int]
+
 EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
 PHONE_RE = re.compile(r"(?:(?:\+\d{1,3}[\s-]?)?(?:\(\d{1,4}\)[\s-]?)?\d[\d\s-]{7,}\d)")
 URL_RE = re.compile(r"https?://[^\s)]+|(?:www\.)?linkedin\.com/[^\s)]+|(?:www\.)?github\.com/[^\s)]+", re.IGNORECASE)
@@ -24,17 +41,28 @@ TITLE_PATTERNS = [
 ]
 
 
-def extract_cv_structured(raw_text: str) -> Dict[str, Any]:
-    text = normalize_text(raw_text or "")
+@timed("cv_parser.extract")
+def extract_cv_structured(raw_text: str, normalized: bool = False) -> Dict[str, Any]:
+    # normalized=True: raw_text already went through normalize_text (parse cache, PDF extraction)
+    if normalized:
+        text = raw_text or ""
+    else:
+        with span("cv_parser.normalize"):
+            text = normalize_text(raw_text or "")
 
-    sections = split_sections(text)
+    with span("cv_parser.sections"):
+        spans = section_spans(text)
 
     personal_info = parse_personal_info(text)
-    summary = sections.get("summary", "") or infer_summary(text)
-    experience = parse_experience(sections.get("experience", ""))
-    education = parse_education(sections.get("education", ""))
-    skills = parse_skills(sections.get("skills", ""), sections.get("languages", ""))
-    certifications = parse_certifications(sections.get("certifications", ""))
+    summary = section_text(text, spans.get("summary", [])) or infer_summary(text)
+    with span("cv_parser.experience"):
+        experience = _parse_roles(iter_blocks(text, spans.get("experience", [])))
+    with span("cv_parser.education"):
+        education = _parse_education_blocks(iter_blocks(text, spans.get("education", [])))
+    with span("cv_parser.skills"):
+        skills = parse_skills(section_text(text, spans.get("skills", [])), section_text(text, spans.get("languages", [])))
+        certifications = parse_certifications(section_text(text, spans.get("certifications", [])))
+        skill_mentions = [m._asdict() for m in find_skills(text)]
 
     confidence_notes = []
     if not experience and not education:
@@ -54,29 +82,48 @@ def extract_cv_structured(raw_text: str) -> Dict[str, Any]:
         "education": education,
         "skills": skills,
         "certifications": certifications,
+        "skill_mentions": skill_mentions,
         "raw_text": text,
-        "meta": {"parser_version": "v1", "confidence_notes": confidence_notes},
+        "meta": {"parser_version": PARSER_VERSION, "confidence_notes": confidence_notes},
     }
 
 
+def section_spans(text: str) -> Dict[str, List[Span]]:
+    # One scan for all headers; each section runs from the end of its header line
+    # to the start of the next header. Content before the first header is ignored.
+    spans: Dict[str, List[Span]] = {}
+    prev_key, prev_end = None, 0
+    for m in SECTION_RE.finditer(text):
+        if prev_key:
+            spans.setdefault(prev_key, []).append((prev_end, m.start()))
+        prev_key, prev_end = m.lastgroup, m.end()
+    if prev_key:
+        spans.setdefault(prev_key, []).append((prev_end, len(text)))
+    return spans
+
+
+def section_text(text: str, spans: Iterable[Span]) -> str:
+    lines = [l.strip() for a, b in spans for l in text[a:b].splitlines()]
+    return "\n".join(l for l in lines if l)
+
+
+def iter_blocks(text: str, spans: Iterable[Span]) -> Iterator[str]:
+    # blank-line separated chunks of the given spans, sliced straight out of text
+    for a, b in spans:
+        pos = a
+        for m in BLANK_LINE_RE.finditer(text, a, b):
+            chunk = text[pos:m.start()].strip()
+            if chunk:
+                yield chunk
+            pos = m.end()
+        chunk = text[pos:b].strip()
+        if chunk:
+            yield chunk
+
+
 def split_sections(text: str) -> Dict[str, str]:
-    lines = [l.strip() for l in text.splitlines()]
-    buckets: Dict[str, List[str]] = {k: [] for k in SECTION_HEADERS}
-    current = None
-    for line in lines:
-        if not line:
-            continue
-        found = False
-        for key, rx in SECTION_HEADERS.items():
-            if rx.match(line):
-                current = key
-                found = True
-                break
-        if found:
-            continue
-        if current:
-            buckets[current].append(line)
-    return {k: "\n".join(v).strip() for k, v in buckets.items() if v}
+    out = {k: section_text(text, v) for k, v in section_spans(text).items()}
+    return {k: v for k, v in out.items() if v}
 
 
 def infer_summary(text: str) -> str:
@@ -107,8 +154,11 @@ def parse_personal_info(text: str) -> Dict[str, Any]:
 def parse_experience(block: str) -> List[Dict[str, Any]]:
     if not block:
         return []
+    return _parse_roles(iter_blocks(block, [(0, len(block))]))
+
+
+def _parse_roles(chunks: Iterable[str]) -> List[Dict[str, Any]]:
     roles: List[Dict[str, Any]] = []
-    chunks = [c.strip() for c in re.split(r"\n\n+", block) if c.strip()]
     for ch in chunks:
         lines = ch.splitlines()
         header = lines[0]
@@ -127,7 +177,8 @@ def parse_experience(block: str) -> List[Dict[str, Any]]:
                 company = lines[1]
         sd, ed = normalize_date_range(ch)
         current = (ed is None and ("present" in ch.lower() or "current" in ch.lower()))
-        bullets = [l[2:].strip() if l.strip().startswith("- ") else l.strip() for l in lines[1:]]
+        bullets = [l.strip() for l in lines[1:]]
+        bullets = [b[2:].strip() if b.startswith("- ") else b for b in bullets]
         bullets = [b for b in bullets if b]
         roles.append({
             "title": (title or "").strip(),
@@ -144,8 +195,11 @@ def parse_experience(block: str) -> List[Dict[str, Any]]:
 def parse_education(block: str) -> List[Dict[str, Any]]:
     if not block:
         return []
+    return _parse_education_blocks(iter_blocks(block, [(0, len(block))]))
+
+
+def _parse_education_blocks(chunks: Iterable[str]) -> List[Dict[str, Any]]:
     entries: List[Dict[str, Any]] = []
-    chunks = [c.strip() for c in re.split(r"\n\n+", block) if c.strip()]
     for ch in chunks:
         lines = [l.strip() for l in ch.splitlines() if l.strip()]
         text = " ".join(lines)
@@ -173,23 +227,32 @@ def parse_education(block: str) -> List[Dict[str, Any]]:
 
 def parse_skills(sk_block: str, lang_block: str) -> Dict[str, List[str]]:
     hard, tools, soft, langs = [], [], [], []
+    buckets = {"hard": hard, "tools": tools, "soft": soft, "languages": langs}
 
-    def _split(text: str) -> List[str]:
-        items = re.split(r",|\n|•|-|—|;|/|\\|", text)
-        return [i.strip() for i in items if i and len(i.strip()) < 64]
+    def _items(text: str) -> List[Tuple[int, int]]:
+        out = []
+        for m in SKILL_ITEM_RE.finditer(text):
+            item = m.group(0).strip()
+            if item and len(item) < 64:
+                out.append((m.start(), m.end()))
+        return out
 
     if sk_block:
-        items = _split(sk_block)
-        for it in items:
-            low = it.lower()
-            if any(k in low for k in ["excel", "salesforce", "python", "sql", "powerpoint", "word", "notion", "figma", "tensorflow", "pytorch", "streamlit", "sklearn", "lemlist"]):
-                tools.append(it)
-            elif any(k in low for k in ["communication", "leadership", "team", "problem", "organized", "creative"]):
-                soft.append(it)
-            else:
-                hard.append(it)
+        # one taxonomy pass over the block, then each item takes the category of the
+        # skills mentioned inside it (tools > soft > languages > hard)
+        cats: Dict[int, set] = {}
+        items = _items(sk_block)
+        starts = [a for a, _ in items]
+        for m in find_skills(sk_block):
+            i = bisect_right(starts, m.start) - 1
+            if i >= 0 and m.end <= items[i][1]:
+                cats.setdefault(i, set()).add(m.category)
+        for i, (a, b) in enumerate(items):
+            found = cats.get(i, set())
+            cat = next((c for c in ["tools", "soft", "languages"] if c in found), "hard")
+            buckets[cat].append(sk_block[a:b].strip())
     if lang_block:
-        langs.extend(_split(lang_block))
+        langs.extend(lang_block[a:b].strip() for a, b in _items(lang_block))
     return {"hard": dedupe(hard), "tools": dedupe(tools), "soft": dedupe(soft), "languages": dedupe(langs)}
 
 
@@ -0,0 +1,147 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from services.metrics import timed
+
+from .normalizers import normalize_pages, normalize_text
+
+MIN_PAGE_CHARS = 40
+MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "40"))
+TIME_BUDGET = float(os.getenv("PDF_TIME_BUDGET", "15"))
+EXTRACT_CACHE_SIZE = 32
+
+
+class ExtractResult(NamedTuple):
+    text: str  # already normalized (parsing.normalizers.normalize_text)
+    method: str  # "pypdf", "pdfminer", "mixed" or "failed"
+    pages: int
+    truncated: bool
+    error: str = ""
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(memoryview(data)).hexdigest()
+
+
+def _pdfminer_text(data: bytes) -> str:
+    from pdfminer.high_level import extract_text
+
+    # BytesIO over an immutable bytes object shares the buffer instead of copying it
+    return extract_text(io.BytesIO(data)) or ""
+
+
+def _pdfminer_pages(data: bytes, page_nos: List[int]) -> Dict[int, str]:
+    # one pdfminer pass over all the requested pages (the document is parsed once)
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+
+    layouts = extract_pages(io.BytesIO(data), page_numbers=page_nos)
+    return {i: "".join(el.get_text() for el in layout if isinstance(el, LTTextContainer)) for i, layout in zip(sorted(page_nos), layouts)}
+
+
+def _iter_pages(reader, data: bytes, max_pages: int, deadline: float) -> Iterator[Tuple[int, str, str]]:
+    texts: List[str] = []
+    error: Optional[Exception] = None
+    try:
+        for i, page in enumerate(reader.pages):
+            if i >= max_pages or time.monotonic() > deadline:
+                break
+            try:
+                texts.append(page.extract_text() or "")
+            except Exception:
+                texts.append("")
+    except Exception as e:
+        # unreadable page tree: keep the pages read so far, then report
+        error = e
+    sparse = [i for i, text in enumerate(texts) if len(text.strip()) < MIN_PAGE_CHARS]
+    alt: Dict[int, str] = {}
+    if sparse and time.monotonic() <= deadline:
+        try:
+            alt = _pdfminer_pages(data, sparse)
+        except Exception:
+            alt = {}
+    for i, text in enumerate(texts):
+        other = alt.get(i, "")
+        if len(other.strip()) > len(text.strip()):
+            yield i, other, "pdfminer"
+        else:
+            yield i, text, "pypdf"
+    if error is not None:
+        raise error
+
+
+def iter_pdf_pages(data: bytes, max_pages: int = MAX_PAGES, time_budget: float = TIME_BUDGET, reader=None) -> Iterator[Tuple[int, str, str]]:
+    # Yields (page number, text, method). pypdf reads the pages first, then pages it
+    # left (nearly) empty get a single pdfminer pass. Stops at max_pages or when
+    # time_budget is spent.
+    if reader is None:
+        from pypdf import PdfReader
+
+        reader = PdfReader(io.BytesIO(data))
+    yield from _iter_pages(reader, data, max_pages, time.monotonic() + time_budget)
+
+
+def _whole_document(data: bytes, error: Exception) -> ExtractResult:
+    # pypdf can't read the file at all: one whole-document pdfminer pass
+    try:
+        return ExtractResult(normalize_text(_pdfminer_text(data)), "pdfminer", 0, False)
+    except Exception as e:
+        return ExtractResult("", "failed", 0, False, f"{error}; {e}")
+
+
+@timed("extract.pdf")
+def _extract(data: bytes, max_pages: int, time_budget: float) -> ExtractResult:
+    # Pages stream from iter_pdf_pages into normalize_pages, so the raw document
+    # is never joined and normalized as a whole.
+    from pypdf import PdfReader
+
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        total = len(reader.pages)
+    except Exception as e:
+        return _whole_document(data, e)
+    methods = set()
+    errors: List[Exception] = []
+    read = 0
+
+    def texts() -> Iterator[str]:
+        nonlocal read
+        try:
+            for _, text, method in iter_pdf_pages(data, max_pages, time_budget, reader):
+                read += 1
+                methods.add(method)
+                yield text
+        except Exception as e:
+            errors.append(e)
+
+    text = "".join(normalize_pages(texts()))
+    if errors:
+        if not read:
+            return _whole_document(data, errors[0])
+        total = max(total, read + 1)
+    method = "mixed" if len(methods) > 1 else (next(iter(methods)) if methods else "pypdf")
+    return ExtractResult(text, method, read, read < total)
+
+
+_CACHE: "OrderedDict[Tuple[str, int, float], ExtractResult]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def extract_pdf_text(data: bytes, max_pages: int = MAX_PAGES, time_budget: float = TIME_BUDGET) -> ExtractResult:
+    key = (content_hash(data), max_pages, time_budget)
+    with _CACHE_LOCK:
+        if key in _CACHE:
+            _CACHE.move_to_end(key)
+            return _CACHE[key]
+    res = _extract(data, max_pages, time_budget)
+    if res.method != "failed":
+        with _CACHE_LOCK:
+            _CACHE[key] = res
+            while len(_CACHE) > EXTRACT_CACHE_SIZE:
+                _CACHE.popitem(last=False)
+    return res
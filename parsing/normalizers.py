@@ -1,15 +1,25 @@
 import re
-from typing import Tuple, Optional
-import dateparser
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, Tuple, Optional
+
+from services.metrics import timed
 
 HYPHEN_RE = re.compile(r"(\w)-\n(\w)")
 BULLET_VARIANTS = ["•", "-", "—", "–", "*", "·"]
 BULLET_RE = re.compile(r"^[\s]*[" + "".join(re.escape(b) for b in BULLET_VARIANTS) + r"]\s+", re.MULTILINE)
 MULTISPACES_RE = re.compile(r"[ \t]+")
+# Same results as HYPHEN_RE / MULTISPACES_RE, but they start on a literal or skip
+# lone spaces, so sre doesn't attempt a match at every word character or blank.
+HYPHEN_BREAK_RE = re.compile(r"-\n(?=\w)")
+WORD_CHAR_RE = re.compile(r"\w")
+SPACE_RUNS_RE = re.compile(r" [ \t]+|\t[ \t]*")
 NEWLINES_RE = re.compile(r"\n{3,}")
 SMART_QUOTES = {
     "\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"', "\u2013": "-", "\u2014": "-"
 }
+# A page boundary is safe to cut after a newline whose neighbours cannot take part
+# in a hyphenation, bullet or whitespace match spanning it.
+UNSAFE_BEFORE_CUT = set(" \t\r\n\f\v") | set(BULLET_VARIANTS)
 
 MONTHS = "jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec|janvier|février|mars|avril|mai|juin|juil|août|septembre|octobre|novembre|décembre"
 DATE_RANGE_RE = re.compile(
@@ -17,34 +27,131 @@ DATE_RANGE_RE = re.compile(
     re.IGNORECASE,
 )
 DATE_SINGLE_RE = re.compile(rf"(?:{MONTHS})\s\d{{4}}|\d{{4}}", re.IGNORECASE)
+# "[month] YYYY" as captured by the regexes above; anything else goes to dateparser.
+YM_FAST_RE = re.compile(r"^\s*(?:([^\W\d_]+)\.?\s*)?(\d{4})\s*$")
+MONTH_NUMBERS = {
+    "jan": 1, "january": 1, "janvier": 1, "feb": 2, "february": 2, "février": 2, "fevrier": 2,
+    "mar": 3, "march": 3, "mars": 3, "apr": 4, "april": 4, "avril": 4, "may": 5, "mai": 5,
+    "jun": 6, "june": 6, "juin": 6, "jul": 7, "july": 7, "juil": 7, "juillet": 7,
+    "aug": 8, "august": 8, "août": 8, "aout": 8, "sep": 9, "sept": 9, "september": 9, "septembre": 9,
+    "oct": 10, "october": 10, "octobre": 10, "nov": 11, "november": 11, "novembre": 11,
+    "dec": 12, "december": 12, "décembre": 12, "decembre": 12,
+}
+PARSE_YM_CACHE_SIZE = 4096
+_YM_STATS = {"calls": 0, "fast": 0, "dateparser": 0}
 
 def normalize_quotes_dashes(txt: str) -> str:
+    if txt.isascii():
+        return txt
     for k, v in SMART_QUOTES.items():
         txt = txt.replace(k, v)
     return txt
 
 def fix_hyphenation(txt: str) -> str:
-    return HYPHEN_RE.sub(r"\1\2", txt)
+    if "-\n" not in txt:
+        return txt
+    last = -1
+
+    def join(m: "re.Match") -> str:
+        nonlocal last
+        s = m.start()
+        # HYPHEN_RE consumes the letters on both sides, so matches can't share one
+        if s - 1 > last and WORD_CHAR_RE.match(txt, s - 1):
+            last = s + 2
+            return ""
+        return m.group(0)
+
+    return HYPHEN_BREAK_RE.sub(join, txt)
 
 def unify_bullets(txt: str) -> str:
     return BULLET_RE.sub("- ", txt)
 
+def _collapse(txt: str) -> str:
+    txt = SPACE_RUNS_RE.sub(" ", txt)
+    if "\n\n\n" in txt:
+        txt = NEWLINES_RE.sub("\n\n", txt)
+    return txt
+
 def collapse_whitespace(txt: str) -> str:
-    txt = MULTISPACES_RE.sub(" ", txt)
-    txt = NEWLINES_RE.sub("\n\n", txt)
-    return txt.strip()
+    return _collapse(txt).strip()
+
+def _normalize_body(txt: str) -> str:
+    return _collapse(unify_bullets(fix_hyphenation(txt)))
 
 def normalize_text(txt: str) -> str:
     return collapse_whitespace(unify_bullets(fix_hyphenation(normalize_quotes_dashes(txt))))
 
-def parse_ym(s: str) -> Optional[str]:
-    if not s:
-        return None
+def _safe_cut(buf: str, lo: int) -> int:
+    i = len(buf)
+    while True:
+        i = buf.rfind("\n", lo, i)
+        if i <= 0:
+            return -1
+        prev, nxt = buf[i - 1], buf[i + 1:i + 2]
+        if prev not in UNSAFE_BEFORE_CUT and not prev.isspace() and nxt and not nxt.isspace():
+            return i + 1
+
+def normalize_pages(pages: Iterable[str]) -> Iterator[str]:
+    # Streaming normalize_text("\n".join(pages)): only the tail after the last safe
+    # cut is carried over to the next page, so the document is never held twice.
+    carry = ""
+    started = emitted = False
+    for page in pages:
+        page = normalize_quotes_dashes(page or "")
+        buf = carry + "\n" + page if started else page
+        cut = _safe_cut(buf, max(0, len(carry) - 1))
+        started = True
+        if cut <= 0:
+            carry = buf
+            continue
+        out = _normalize_body(buf[:cut])
+        carry = buf[cut:]
+        if not emitted:
+            out = out.lstrip()
+        if out:
+            emitted = True
+            yield out
+    tail = _normalize_body(carry).rstrip()
+    if not emitted:
+        tail = tail.lstrip()
+    if tail:
+        yield tail
+
+@timed("normalizers.dateparser")
+def _dateparser_ym(s: str) -> Optional[str]:
+    import dateparser
+
     dt = dateparser.parse(s, settings={"PREFER_DAY_OF_MONTH": "first"})
     if not dt:
         return None
     return f"{dt.year:04d}-{dt.month:02d}"
 
+@lru_cache(maxsize=PARSE_YM_CACHE_SIZE)
+def _parse_ym_cached(s: str) -> Optional[str]:
+    m = YM_FAST_RE.match(s)
+    if m:
+        month = MONTH_NUMBERS.get(m.group(1).lower()) if m.group(1) else 1
+        if month:
+            _YM_STATS["fast"] += 1
+            return f"{m.group(2)}-{month:02d}"
+    _YM_STATS["dateparser"] += 1
+    return _dateparser_ym(s)
+
+def parse_ym(s: str) -> Optional[str]:
+    if not s:
+        return None
+    _YM_STATS["calls"] += 1
+    return _parse_ym_cached(s)
+
+def parse_ym_stats() -> Dict[str, Any]:
+    calls = _YM_STATS["calls"]
+    info = _parse_ym_cached.cache_info()
+    return {
+        **_YM_STATS,
+        "cache_hits": info.hits,
+        "fast_fraction": (calls - _YM_STATS["dateparser"]) / calls if calls else 0.0,
+    }
+
 def normalize_date_range(text: str) -> Tuple[Optional[str], Optional[str]]:
     m = DATE_RANGE_RE.search(text)
     if not m:
@@ -0,0 +1,125 @@
+import json
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "skills_taxonomy.json")
+CATEGORIES = ["hard", "tools", "soft", "languages"]
+
+
+class SkillMatch(NamedTuple):
+    skill: str
+    category: str
+    start: int
+    end: int
+
+
+def _key(s: str) -> str:
+    return " ".join(s.lower().split())
+
+
+def load_taxonomy(path: str = TAXONOMY_PATH) -> Tuple[Dict[str, List[str]], Dict[str, str]]:
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    aliases = data.pop("aliases", {})
+    return data, aliases
+
+
+# Aho-Corasick automaton over lower-cased taxonomy terms and aliases. One pass over
+# the text finds every whole-word mention, whatever the size of the taxonomy.
+class SkillMatcher:
+    def __init__(self, taxonomy: Dict[str, List[str]], aliases: Optional[Dict[str, str]] = None):
+        self.skills: Dict[str, Tuple[str, str]] = {}  # term key -> (canonical, category)
+        for category, names in taxonomy.items():
+            for name in names:
+                self.skills.setdefault(_key(name), (name, category))
+        for alias, target in (aliases or {}).items():
+            if _key(target) in self.skills:
+                self.skills.setdefault(_key(alias), self.skills[_key(target)])
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str]]] = [[]]  # (term length, term key)
+        for term in self.skills:
+            state = 0
+            for ch in term:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((len(term), term))
+
+        queue = list(self._goto[0].values())
+        while queue:
+            nxt_queue = []
+            for state in queue:
+                for ch, child in self._goto[state].items():
+                    f = self._fail[state]
+                    while f and ch not in self._goto[f]:
+                        f = self._fail[f]
+                    target = self._goto[f].get(ch, 0)
+                    self._fail[child] = target if target != child else 0
+                    self._out[child] = self._out[child] + self._out[self._fail[child]]
+                    nxt_queue.append(child)
+            queue = nxt_queue
+
+    @classmethod
+    def from_file(cls, path: str = TAXONOMY_PATH) -> "SkillMatcher":
+        return cls(*load_taxonomy(path))
+
+    def find(self, text: str) -> List[SkillMatch]:
+        goto, fail, out = self._goto, self._fail, self._out
+        found: List[Tuple[int, int, str]] = []
+        state = 0
+        n = len(text)
+        consumed: List[int] = []  # original offset of each char fed to the automaton
+        prev_space = True
+        for i, ch in enumerate(text):
+            if ch.isspace():
+                if prev_space:
+                    continue  # whitespace runs count as a single space
+                ch, prev_space = " ", True
+            else:
+                ch, prev_space = ch.lower(), False
+            consumed.append(i)
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                end = i + 1
+                if end < n and text[end].isalnum():
+                    continue
+                for length, term in out[state]:
+                    start = consumed[-length]
+                    if start == 0 or not text[start - 1].isalnum():
+                        found.append((start, end, term))
+
+        # longest mention wins where mentions overlap ("linkedin sales navigator" over "sales")
+        found.sort(key=lambda m: (m[0], m[0] - m[1]))
+        matches: List[SkillMatch] = []
+        last_end = -1
+        for start, end, term in found:
+            if start >= last_end:
+                name, category = self.skills[term]
+                matches.append(SkillMatch(name, category, start, end))
+                last_end = end
+        return matches
+
+    def canonical(self, text: str) -> Dict[str, List[str]]:
+        out: Dict[str, List[str]] = {c: [] for c in CATEGORIES}
+        seen = set()
+        for m in self.find(text):
+            if m.skill not in seen:
+                seen.add(m.skill)
+                out.setdefault(m.category, []).append(m.skill)
+        return out
+
+
+SKILL_MATCHER = SkillMatcher.from_file()
+
+
+def find_skills(text: str) -> List[SkillMatch]:
+    return SKILL_MATCHER.find(text or "")
@@ -0,0 +1,224 @@
+import hashlib
+import json
+from abc import ABC, abstractmethod
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from .metrics import span, timed
+
+ARBEITNOW_URL = "https://arbeitnow.com/api/job-board-api"
+ARBEITNOW_RATE = float(os.getenv("ARBEITNOW_RATE", "5"))
+
+
+class RateLimiter:
+    # Token bucket shared by a connector's page workers: `rate` requests per
+    # second with bursts of up to `burst`. rate <= 0 means unlimited.
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# A job board. Subclasses say how to request a page, where its items are, whether
+# there is a next page, and how an item maps to the job schema; the base class
+# does rate-limited, retried page fetches in concurrent waves and the delta
+# against already known postings.
+class Connector(ABC):
+    name = "base"
+    # listing is newest-first, so a page with nothing new ends the crawl
+    newest_first = True
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_pages: int = 20,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 10,
+        rate: float = 0.0,
+        session: Optional[Any] = None,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_pages = max_pages
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate, burst=self.max_workers)
+        self._session = session
+        self.stats: Dict[str, Any] = {}
+        # every url listed by the last collect(); with stats["complete"] it is the board's whole listing
+        self.seen: Set[str] = set()
+
+    @property
+    def session(self):
+        if self._session is None:
+            from .jobs import pooled_session
+
+            self._session = pooled_session(self.max_workers, name=self.name)
+        return self._session
+
+    @abstractmethod
+    def request(self, page: int) -> Tuple[str, Dict[str, Any]]:
+        # (url, query params) of listing page `page` (1-based)
+        ...
+
+    @abstractmethod
+    def items(self, doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # the raw job items of a fetched page
+        ...
+
+    def has_next(self, doc: Dict[str, Any], page: int) -> bool:
+        return bool(self.items(doc))
+
+    @abstractmethod
+    def map_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        # one raw item as a row of the job schema (without source/content_hash)
+        ...
+
+    def row(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        row = self.map_item(item)
+        row["source"] = self.name
+        row["content_hash"] = hashlib.sha1(json.dumps(item, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        return row
+
+    @timed("jobs.fetch_page")
+    def fetch_page(self, page: int) -> Optional[Dict[str, Any]]:
+        url, params = self.request(page)
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            try:
+                r = self.session.get(url, params=params, timeout=self.timeout)
+                r.raise_for_status()
+                return r.json()
+            except Exception:
+                if attempt < self.retries:
+                    time.sleep(self.backoff * (2 ** attempt))
+        return None
+
+    def collect(self, known: Dict[str, str], full: bool = False) -> Dict[str, Dict[str, Any]]:
+        # New or changed rows keyed by url; `known` maps url -> content_hash. A full
+        # crawl skips the newest-first early stop so it can see every listing.
+        fresh: Dict[str, Dict[str, Any]] = {}
+        seen: Set[str] = set()
+        pages, failures, new, changed = 0, [], 0, 0
+        page, done, ended = 1, False, False
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while not done and page <= self.max_pages:
+                wave = list(range(page, min(page + self.max_workers, self.max_pages + 1)))
+                page = wave[-1] + 1
+                for p, doc in zip(wave, pool.map(self.fetch_page, wave)):
+                    if doc is None:
+                        failures.append(p)
+                        continue
+                    pages += 1
+                    items = self.items(doc)
+                    delta = 0
+                    for it in items:
+                        row = self.row(it)
+                        url = row["url"]
+                        if not url or url in fresh:
+                            continue
+                        seen.add(url)
+                        if url not in known:
+                            new += 1
+                            delta += 1
+                        elif known[url] != row["content_hash"]:
+                            changed += 1
+                            delta += 1
+                        else:
+                            continue
+                        fresh[url] = row
+                    if not items or not self.has_next(doc, p):
+                        done = ended = True
+                    elif self.newest_first and not full and known and delta == 0:
+                        done = True
+
+        self.seen = seen
+        # an empty listing is far more likely a broken response than a board
+        # without jobs, so it never counts as the board's whole listing
+        complete = ended and not failures and bool(seen)
+        self.stats = {"pages": pages, "failed_pages": failures, "new": new, "changed": changed, "complete": complete}
+        return fresh
+
+
+class ArbeitnowConnector(Connector):
+    name = "arbeitnow"
+
+    def __init__(self, api_url: str = ARBEITNOW_URL, rate: float = ARBEITNOW_RATE, **kwargs):
+        super().__init__(rate=rate, **kwargs)
+        self.api_url = api_url
+
+    def request(self, page: int) -> Tuple[str, Dict[str, Any]]:
+        return self.api_url, {"page": page}
+
+    def items(self, doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return doc.get("data", [])
+
+    def has_next(self, doc: Dict[str, Any], page: int) -> bool:
+        return bool(doc.get("links", {}).get("next"))
+
+    def map_item(self, it: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "job_title": it.get("title"),
+            "company_name": it.get("company_name"),
+            "location": it.get("location"),
+            "url": it.get("url"),
+            "job_description": it.get("description"),
+        }
+
+
+CONNECTORS = {"arbeitnow": ArbeitnowConnector}
+
+
+def default_connectors() -> List[Connector]:
+    # JOB_SOURCES="arbeitnow,..." picks registered connectors; all of them by default
+    names = [n.strip() for n in os.getenv("JOB_SOURCES", ",".join(CONNECTORS)).split(",") if n.strip()]
+    return [CONNECTORS[n]() for n in names if n in CONNECTORS]
+
+
+def run_connectors(connectors: Iterable[Connector], base: pd.DataFrame, full: bool = False) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    # Every source crawls concurrently with its own page workers, session pool and
+    # rate limit, diffed against its own rows in `base`. The first source listed
+    # wins a url claimed by two.
+    connectors = list(connectors)
+    if not connectors:
+        return [], {}
+    known: Dict[str, Dict[str, str]] = {c.name: {} for c in connectors}
+    if len(base):
+        for source, urls, hashes in ((s, g["url"], g["content_hash"]) for s, g in base.groupby("source", observed=True)):
+            if source in known:
+                known[source] = dict(zip(urls, hashes))
+
+    def crawl(c: Connector) -> Dict[str, Dict[str, Any]]:
+        with span(f"connector.{c.name}"):
+            return c.collect(known[c.name], full=full)
+
+    with ThreadPoolExecutor(max_workers=len(connectors), thread_name_prefix="connector") as pool:
+        results = list(pool.map(crawl, connectors))
+    rows: Dict[str, Dict[str, Any]] = {}
+    for fresh in results:
+        for url, row in fresh.items():
+            rows.setdefault(url, row)
+    return list(rows.values()), {c.name: c.stats for c in connectors}
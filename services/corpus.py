@@ -0,0 +1,187 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+# how often sessions re-check for a newly published job snapshot
+JOBS_TTL = float(os.getenv("JOBS_TTL", "300"))
+MATCH_CACHE_SIZE = int(os.getenv("MATCH_CACHE_SIZE", "512"))
+
+
+# Process-wide job corpus shared by every Streamlit session. Concurrent callers that
+# find it stale wait on one lock, so each snapshot is fetched (and indexed) once.
+class SharedCorpus:
+    def __init__(self, loader: Callable[[], pd.DataFrame], ttl: float = JOBS_TTL, on_load: Optional[Callable[[pd.DataFrame, str], Any]] = None):
+        self.loader = loader
+        self.ttl = ttl
+        self.on_load = on_load
+        self.loads = 0
+        self._df: Optional[pd.DataFrame] = None
+        self._version = ""
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _fresh(self) -> bool:
+        return self._df is not None and (time.monotonic() - self._loaded_at) < self.ttl
+
+    def _set(self, df: pd.DataFrame, loaded_at: float) -> None:
+        from matching.index import snapshot_key
+
+        self._version = snapshot_key(df) if len(df) else ""
+        self._df = df
+        self._loaded_at = loaded_at
+        self.loads += 1
+        if self.on_load is not None and len(df):
+            try:
+                self.on_load(df, self._version)
+            except Exception:
+                pass
+
+    def get(self) -> Tuple[pd.DataFrame, str]:
+        if self._fresh():
+            return self._df, self._version
+        with self._lock:
+            if not self._fresh():
+                df = self.loader()
+                if df is self._df:
+                    # unchanged (e.g. the same published snapshot): just restart the clock
+                    self._loaded_at = time.monotonic()
+                else:
+                    self._set(df, time.monotonic())
+            return self._df, self._version
+
+    def prime(self, df: pd.DataFrame, age: float = 0.0) -> bool:
+        # Seed from a persisted snapshot that is `age` seconds old (it still ages out
+        # after ttl). Callers of get() wait on the lock instead of loading twice.
+        with self._lock:
+            if self._df is not None or not len(df):
+                return False
+            self._set(df, time.monotonic() - age)
+            return True
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = 0.0
+
+
+class MatchCache:
+    def __init__(self, maxsize: int = MATCH_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, threading.Lock] = {}
+
+    @staticmethod
+    def key(text: str, version: str, *extra: Hashable) -> Tuple[Hashable, ...]:
+        return (hashlib.sha1(text.encode("utf-8")).hexdigest(), version) + extra
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            gate = self._inflight.setdefault(key, threading.Lock())
+        with gate:
+            with self._lock:
+                if key in self._data:
+                    return self._data[key]
+            value = fn()
+            self.put(key, value)
+        with self._lock:
+            self._inflight.pop(key, None)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_CORPUS: Optional[SharedCorpus] = None
+_MATCHES: Optional[MatchCache] = None
+_SINGLETON_LOCK = threading.Lock()
+
+
+def _build_index(df: pd.DataFrame, key: str) -> None:
+    from matching.index import get_index
+    from matching.inverted import get_inverted_index
+    from matching.results import get_job_filters
+    from matching.scoring import get_skill_index
+
+    get_skill_index(df, key=key)
+    get_index(df, key=key)
+    get_job_filters(df, key)
+    get_inverted_index(df, key)
+
+
+def get_corpus() -> SharedCorpus:
+    global _CORPUS
+    if _CORPUS is None:
+        with _SINGLETON_LOCK:
+            if _CORPUS is None:
+                from services.jobs import load_jobs
+
+                _CORPUS = SharedCorpus(load_jobs, on_load=_build_index)
+    return _CORPUS
+
+
+def _warm_up() -> None:
+    from services.jobs import current_snapshot_path, load_published
+
+    # imports the match step needs; sklearn alone is ~1s cold
+    try:
+        import scipy.sparse  # noqa: F401
+        import sklearn.feature_extraction.text  # noqa: F401
+    except ImportError:
+        pass
+    path = current_snapshot_path()
+    if path is not None:
+        get_corpus().prime(load_published(), age=max(0.0, time.time() - os.path.getmtime(path)))
+
+
+_WARMUP: Optional[threading.Thread] = None
+
+
+def warm_up() -> threading.Thread:
+    # Once per process: load the last persisted job snapshot and its indexes (the
+    # TF-IDF index comes from disk when its key matches) on a daemon thread.
+    global _WARMUP
+    with _SINGLETON_LOCK:
+        if _WARMUP is None:
+            _WARMUP = threading.Thread(target=_warm_up, name="corpus-warmup", daemon=True)
+            _WARMUP.start()
+        return _WARMUP
+
+
+def get_match_cache() -> MatchCache:
+    global _MATCHES
+    if _MATCHES is None:
+        with _SINGLETON_LOCK:
+            if _MATCHES is None:
+                _MATCHES = MatchCache()
+    return _MATCHES
@@ -1,35 +1,204 @@
 import os
-from typing import Optional
-import pandas as pd  # noqa: F401  (used by type hints)
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
-try:
-    from supabase import create_client, Client
-except Exception:
-    create_client = None
-    Client = None  # type: ignore
+from .metrics import observe
 
-def get_supabase() -> Optional["Client"]:
+if TYPE_CHECKING:
+    from supabase import Client
+
+SUPABASE_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "2"))
+HEALTH_TABLE = "candidates"
+LATENCY_SAMPLES = 512
+
+
+def _default_factory() -> Optional["Client"]:
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_KEY")
-    if not url or not key or not create_client:
+    if not url or not key:
         return None
+    # the SDK (httpx, postgrest, ...) costs ~0.5s to import; only pay it when configured
     try:
-        return create_client(url, key)
+        from supabase import create_client
     except Exception:
         return None
+    return create_client(url, key)
+
+
+class _Timed:
+    # Proxies a supabase query builder; the first builder method called on a table
+    # (insert/upsert/select/...) names the operation, and execute() is timed.
+    def __init__(self, target: Any, manager: "SupabaseManager", slot: int, table: str, op: str = ""):
+        self._target = target
+        self._manager = manager
+        self._slot = slot
+        self._table = table
+        self._op = op
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            if name == "execute":
+                return self._manager._execute(self._slot, self._table, self._op or "execute", attr, args, kwargs)
+            return _Timed(attr(*args, **kwargs), self._manager, self._slot, self._table, self._op or name)
+
+        return call
+
+
+# Process-level Supabase clients shared by every session. Clients are created lazily
+# into a small bounded pool and handed out round-robin, so sessions reuse keep-alive
+# HTTP connections instead of paying connection/TLS setup each time. A slot whose
+# request fails with a connection error is dropped and recreated on next use.
+class SupabaseManager:
+    def __init__(
+        self,
+        factory: Callable[[], Any] = _default_factory,
+        pool_size: int = SUPABASE_POOL_SIZE,
+        health_table: str = HEALTH_TABLE,
+    ):
+        self.factory = factory
+        self.pool_size = max(1, pool_size)
+        self.health_table = health_table
+        self.stats = {"created": 0, "reconnects": 0, "errors": 0}
+        self._slots: List[Any] = [None] * self.pool_size
+        self._next = 0
+        self._latency: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _client(self, slot: int) -> Any:
+        client = self._slots[slot]
+        if client is None:
+            with self._lock:
+                client = self._slots[slot]
+                if client is None:
+                    client = self.factory()
+                    if client is None:
+                        raise RuntimeError("Supabase is not configured")
+                    self._slots[slot] = client
+                    self.stats["created"] += 1
+        return client
+
+    def available(self) -> bool:
+        try:
+            self._client(0)
+            return True
+        except Exception:
+            return False
+
+    def client(self) -> Any:
+        with self._lock:
+            slot = self._next
+            self._next = (self._next + 1) % self.pool_size
+        return self._client(slot)
+
+    def table(self, name: str) -> _Timed:
+        with self._lock:
+            slot = self._next
+            self._next = (self._next + 1) % self.pool_size
+        return _Timed(self._client(slot).table(name), self, slot, name)
+
+    def _execute(self, slot: int, table: str, op: str, fn: Callable, args, kwargs) -> Any:
+        t0 = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._record(table, op, time.perf_counter() - t0, error=True)
+            if _is_connection_error(e):
+                self.reconnect(slot)
+            raise
+        self._record(table, op, time.perf_counter() - t0)
+        return result
+
+    def _record(self, table: str, op: str, seconds: float, error: bool = False) -> None:
+        observe(f"db.{table}.{op}", seconds)
+        with self._lock:
+            m = self._latency.setdefault((table, op), {"count": 0, "errors": 0, "total": 0.0, "max": 0.0, "samples": deque(maxlen=LATENCY_SAMPLES)})
+            m["count"] += 1
+            m["errors"] += int(error)
+            self.stats["errors"] += int(error)
+            m["total"] += seconds
+            m["max"] = max(m["max"], seconds)
+            m["samples"].append(seconds)
+
+    def reconnect(self, slot: Optional[int] = None) -> None:
+        with self._lock:
+            for i in range(self.pool_size) if slot is None else [slot]:
+                if self._slots[i] is not None:
+                    self._slots[i] = None
+                    self.stats["reconnects"] += 1
+
+    def health_check(self) -> bool:
+        try:
+            self.table(self.health_table).select("id").limit(1).execute()
+            return True
+        except Exception:
+            return False
+
+    def latency(self) -> Dict[str, Dict[str, float]]:
+        # per "table.op": count, errors, mean/p50/p95/max latency in milliseconds
+        with self._lock:
+            items = [(k, dict(v, samples=sorted(v["samples"]))) for k, v in self._latency.items()]
+        out = {}
+        for (table, op), m in items:
+            s = m["samples"]
+            out[f"{table}.{op}"] = {
+                "count": m["count"],
+                "errors": m["errors"],
+                "mean_ms": 1000 * m["total"] / m["count"],
+                "p50_ms": 1000 * s[len(s) // 2],
+                "p95_ms": 1000 * s[min(len(s) - 1, int(len(s) * 0.95))],
+                "max_ms": 1000 * m["max"],
+            }
+        return out
+
+
+def _is_connection_error(e: BaseException) -> bool:
+    if isinstance(e, (ConnectionError, TimeoutError, OSError)):
+        return True
+    # httpx transport errors (ConnectError, ReadTimeout, RemoteProtocolError, ...)
+    return any(c.__name__ in ("TransportError", "NetworkError", "TimeoutException") for c in type(e).__mro__)
+
+
+_MANAGER: Optional[SupabaseManager] = None
+_MANAGER_LOCK = threading.Lock()
+
+
+def get_manager() -> Optional[SupabaseManager]:
+    # None when SUPABASE_URL/SUPABASE_KEY aren't set or the client can't be created
+    global _MANAGER
+    if _MANAGER is None:
+        with _MANAGER_LOCK:
+            if _MANAGER is None:
+                manager = SupabaseManager()
+                if not manager.available():
+                    return None
+                _MANAGER = manager
+    return _MANAGER
+
+
+def get_supabase() -> Optional["Client"]:
+    manager = get_manager()
+    return manager.client() if manager is not None else None
 
 def ensure_candidate(sb: "Client", candidate_id: str, cv_text: str) -> None:
     sb.table("candidates").upsert({"id": candidate_id, "cv_text": cv_text}).execute()
 
-def log_interest(sb: "Client", candidate_id: str, job_row) -> None:
-    payload = {
+def interest_payload(candidate_id: str, job_row) -> dict:
+    return {
         "candidate_id": candidate_id,
         "job_title": job_row.get("job_title"),
         "company": job_row.get("company_name"),
         "url": job_row.get("url"),
         "location": job_row.get("location"),
-        "source": job_row.get("source", "arbeitnow"),
+        "source": job_row.get("source") or None,
         "match_score": float(job_row.get("match_score", 0.0)),
     }
-    sb.table("interests").insert(payload).execute()
+
+def log_interest(sb: "Client", candidate_id: str, job_row) -> None:
+    sb.table("interests").insert(interest_payload(candidate_id, job_row)).execute()
 
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+import pandas as pd
+from pandas.util import hash_array
+
+GENDER_TAG_RE = re.compile(r"\((?:[mwfdxi]\s*/\s*)+[mwfdxi]\)|\(all genders?\)|\(gn\)|\(w/m/d\)|\*in\b", re.IGNORECASE)
+NON_WORD_RE = re.compile(r"[\W_]+")
+COMPANY_SUFFIXES = {"gmbh", "ag", "se", "kg", "co", "ug", "mbh", "inc", "ltd", "llc", "limited", "plc", "sa", "sas", "bv", "nv", "oy", "ab", "corp", "corporation", "company"}
+
+
+def _plain(s: str) -> str:
+    s = unicodedata.normalize("NFKD", s or "").encode("ascii", "ignore").decode("ascii").lower()
+    return NON_WORD_RE.sub(" ", s).strip()
+
+
+def fingerprint(title: str, company: str, location: str) -> str:
+    # Same posting across boards: title without gender tags, company without its
+    # legal form, city part of the location; accents, case and punctuation dropped.
+    t = _plain(GENDER_TAG_RE.sub(" ", title or ""))
+    c = " ".join(w for w in _plain(company).split() if w not in COMPANY_SUFFIXES)
+    loc = _plain((location or "").split(",")[0])
+    return hashlib.sha1(f"{t}\x1f{c}\x1f{loc}".encode("utf-8")).hexdigest()[:16]
+
+
+MINHASH_PERMS = 64
+LSH_BANDS = 8  # 8 bands x 8 rows: pairs above ~0.77 Jaccard almost always collide
+NEAR_DUP_THRESHOLD = 0.8
+SHINGLE = 3
+MAX_TOKENS = 400
+EMPTY = 0xFFFFFFFF
+
+
+def _perms(k: int, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**32, size=k, dtype=np.uint64).astype(np.uint32) | np.uint32(1)
+    b = rng.integers(0, 2**32, size=k, dtype=np.uint64).astype(np.uint32)
+    return a, b
+
+
+class MinHasher:
+    # Word-3-gram MinHash over whitespace tokens of the cleaned description,
+    # vectorized per chunk of documents: distinct tokens get a stable siphash
+    # (pandas hash_array), shingles are rolled over the flattened token array and
+    # the k universal hashes (a*x + b mod 2^32) are reduced to a per-document
+    # minimum in one reduceat. Signatures are stable across processes.
+    def __init__(self, num_perm: int = MINHASH_PERMS, shingle: int = SHINGLE, max_tokens: int = MAX_TOKENS, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle = shingle
+        self.max_tokens = max_tokens
+        self.a, self.b = _perms(num_perm, seed)
+
+    def signatures(self, texts: Sequence[str], chunk: int = 256) -> np.ndarray:
+        # (len(texts), num_perm) uint32; documents without tokens stay all EMPTY
+        sigs = np.full((len(texts), self.num_perm), EMPTY, dtype=np.uint32)
+        s = self.shingle
+        for start in range(0, len(texts), chunk):
+            toks = [(t or "").lower().split()[: self.max_tokens] for t in texts[start:start + chunk]]
+            lens = np.fromiter(map(len, toks), dtype=np.int64, count=len(toks))
+            total = int(lens.sum())
+            if not total:
+                continue
+            codes, uniq = pd.factorize(np.fromiter(chain.from_iterable(toks), dtype=object, count=total))
+            flat = hash_array(uniq)[codes]
+            owner = np.repeat(np.arange(len(toks)), lens)
+            m = max(total - s + 1, 0)
+            h = flat[:m].copy()
+            for k in range(1, s):
+                h = h * np.uint64(0x100000001B3) + flat[k:k + m]
+            keep = owner[:m] == owner[s - 1:s - 1 + m]
+            # documents shorter than one shingle fall back to their single tokens
+            h, who = h[keep], owner[:m][keep]
+            short = (lens < s)[owner]
+            if short.any():
+                h = np.concatenate([h, flat[short]])
+                who = np.concatenate([who, owner[short]])
+                order = np.argsort(who, kind="stable")
+                h, who = h[order], who[order]
+            if not len(h):
+                continue
+            x = (h ^ (h >> np.uint64(32))).astype(np.uint32)
+            bounds = np.flatnonzero(np.r_[True, who[1:] != who[:-1]])
+            perm = np.multiply.outer(self.a, x)
+            perm += self.b[:, None]
+            sigs[start + who[bounds]] = np.minimum.reduceat(perm, bounds, axis=1).T
+        return sigs
+
+
+# Incremental LSH over MinHash signatures. Every added posting is either a new
+# canonical one or an alias of the canonical posting it nearly duplicates
+# (estimated Jaccard >= threshold among its LSH candidates). Expired postings are
+# tombstoned with remove(): their rows stay but never match again.
+class NearDupIndex:
+    def __init__(self, bands: int = LSH_BANDS, threshold: float = NEAR_DUP_THRESHOLD, hasher: Optional[MinHasher] = None):
+        self.hasher = hasher or MinHasher()
+        if self.hasher.num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.bands = bands
+        self.rows = self.hasher.num_perm // bands
+        self.threshold = threshold
+        self.ids: List[str] = []
+        self.canonical: Dict[str, str] = {}
+        self.aliases: Dict[str, List[str]] = {}
+        self._row: Dict[str, int] = {}
+        self._dead: Set[int] = set()
+        self._sigs = np.zeros((0, self.hasher.num_perm), dtype=np.uint32)
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+        self._mix = np.random.default_rng(7).integers(1, 2**63, size=self.rows, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _band_keys(self, sigs: np.ndarray) -> np.ndarray:
+        # one uint64 per (doc, band); wraps on overflow, which is fine for bucketing
+        return (sigs.reshape(len(sigs), self.bands, self.rows).astype(np.uint64) * self._mix).sum(axis=2)
+
+    def _append(self, doc_id: str, sig: np.ndarray) -> int:
+        row = len(self.ids)
+        if row == len(self._sigs):
+            grown = np.empty((max(1024, 2 * row), self._sigs.shape[1]), dtype=np.uint32)
+            grown[:row] = self._sigs
+            self._sigs = grown
+        self._sigs[row] = sig
+        self.ids.append(doc_id)
+        self._row[doc_id] = row
+        self.canonical[doc_id] = doc_id
+        return row
+
+    def alias(self, doc_id: str, canonical: str) -> None:
+        if doc_id not in self.canonical:
+            self.canonical[doc_id] = canonical
+            self.aliases.setdefault(canonical, []).append(doc_id)
+
+    def remove(self, ids: Iterable[str]) -> int:
+        # Tombstone postings that left the corpus. A removed canonical posting
+        # takes its aliases with it, so they are matched afresh if they come back.
+        removed = 0
+        for doc_id in ids:
+            canon = self.canonical.pop(doc_id, None)
+            if canon is None:
+                continue
+            removed += 1
+            if canon == doc_id:
+                self._dead.add(self._row[doc_id])
+                for alias in self.aliases.pop(doc_id, []):
+                    self.canonical.pop(alias, None)
+            else:
+                self.aliases[canon].remove(doc_id)
+        return removed
+
+    def add(self, ids: Sequence[str], texts: Sequence[str]) -> List[str]:
+        # canonical id for each input; ids already indexed keep their canonical
+        todo = [i for i, x in enumerate(ids) if x not in self.canonical]
+        if todo:
+            sigs = self.hasher.signatures([texts[i] for i in todo])
+            keys = self._band_keys(sigs).tolist()
+            empty = (sigs == EMPTY).all(axis=1)
+            for n, i in enumerate(todo):
+                doc_id = ids[i]
+                if doc_id in self.canonical:
+                    continue
+                if empty[n]:
+                    # nothing to compare on; never collapsed
+                    self._append(doc_id, sigs[n])
+                    continue
+                cands = set()
+                for band in range(self.bands):
+                    cands.update(self._buckets[band].get(keys[n][band], ()))
+                cands -= self._dead
+                if cands:
+                    cand = np.fromiter(cands, dtype=np.int64, count=len(cands))
+                    sim = (self._sigs[cand] == sigs[n]).mean(axis=1)
+                    k = int(np.argmax(sim))
+                    if sim[k] >= self.threshold:
+                        self.alias(doc_id, self.ids[cand[k]])
+                        continue
+                row = self._append(doc_id, sigs[n])
+                for band in range(self.bands):
+                    self._buckets[band].setdefault(keys[n][band], []).append(row)
+        return [self.canonical[x] for x in ids]
+
+    def _index_rows(self, start: int) -> None:
+        keys = self._band_keys(self._sigs[start:len(self.ids)]).tolist()
+        empty = (self._sigs[start:len(self.ids)] == EMPTY).all(axis=1)
+        for n, row in enumerate(range(start, len(self.ids))):
+            if not empty[n]:
+                for band in range(self.bands):
+                    self._buckets[band].setdefault(keys[n][band], []).append(row)
+
+    def save(self, path: str, key: str = "") -> None:
+        # signatures + ids in one npz; `key` ties the file to the snapshot it describes
+        tmp = path + ".tmp.npz"
+        aliases = json.dumps(self.aliases)
+        dead = np.array(sorted(self._dead), dtype=np.int64)
+        np.savez(tmp, sigs=self._sigs[: len(self.ids)], ids=np.asarray(self.ids, dtype=str), dead=dead, aliases=np.array(aliases), key=np.array(key))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, key: Optional[str] = None, **kwargs) -> Optional["NearDupIndex"]:
+        # no pickles: ids are fixed-width unicode; an older object-array file
+        # fails to load and is rebuilt by the caller
+        nd = cls(**kwargs)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if key is not None and str(data["key"]) != key:
+                    return None
+                if data["sigs"].shape[1] != nd.hasher.num_perm:
+                    return None
+                nd._sigs = data["sigs"].copy()
+                nd.ids = data["ids"].tolist()
+                nd._dead = set(data["dead"].tolist()) if "dead" in data else set()
+                nd.aliases = json.loads(str(data["aliases"]))
+        except (OSError, ValueError, KeyError):
+            return None
+        nd._row = {i: row for row, i in enumerate(nd.ids)}
+        nd.canonical = {i: i for row, i in enumerate(nd.ids) if row not in nd._dead}
+        for canon, dupes in nd.aliases.items():
+            for d in dupes:
+                nd.canonical[d] = canon
+        nd._index_rows(0)
+        return nd
+
+    def stats(self) -> Dict[str, Any]:
+        total = len(self.canonical)
+        canonical = len(self.ids) - len(self._dead)
+        dupes = total - canonical
+        return {"postings": total, "canonical": canonical, "near_duplicates": dupes, "duplicate_ratio": dupes / total if total else 0.0}
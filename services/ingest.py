@@ -0,0 +1,389 @@
+"""Offline job ingestion: fetch, normalize, dedupe, index and publish a snapshot.
+
+    python -m services.ingest --once
+    python -m services.ingest --interval 900
+
+Each run crawls every job board connector (services/connectors.py) concurrently,
+diffs them against the current published snapshot, collapses near-duplicate
+descriptions into one canonical posting (MinHash/LSH, services/dedupe.py) whose
+`aliases` column lists the other urls, writes a new immutable version under
+JOBS_SNAPSHOT_DIR, builds the TF-IDF and skill indexes for it
+(persisted under JOB_INDEX_DIR), and only then swaps CURRENT, so app processes
+never see a snapshot without its index.
+"""
+import argparse
+import hashlib
+import html
+import json
+import logging
+import os
+import re
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .connectors import Connector, default_connectors, run_connectors
+from .dedupe import NearDupIndex, fingerprint
+from .jobs import SNAPSHOT_DIR, compact_jobs, current_snapshot_path, load_published, load_snapshot, merge_delta, publish_snapshot, save_snapshot
+from .metrics import span
+
+log = logging.getLogger("ingest")
+
+KEEP_VERSIONS = int(os.getenv("JOBS_KEEP_VERSIONS", "3"))
+NEAR_DUP_FILE = "neardup.npz"
+DROPPED_COLUMNS = ["url", "source", "content_hash", "fetched_at"]
+# hours between full crawls, which list every posting so vanished ones expire
+FULL_CRAWL_HOURS = float(os.getenv("JOBS_FULL_CRAWL_HOURS", "6"))
+FULL_CRAWL_STAMP = ".last_full_crawl"
+# days a posting may go unlisted by any crawl before it is retired (0: never)
+MAX_AGE_DAYS = float(os.getenv("JOBS_MAX_AGE_DAYS", "0"))
+# a version keeping less than this share of the current rows is not published
+MIN_KEEP_RATIO = float(os.getenv("JOBS_MIN_KEEP_RATIO", "0.5"))
+BLOCK_TAG_RE = re.compile(r"<(?:br|/p|/li|/h\d|/div)\s*/?>", re.IGNORECASE)
+TAG_RE = re.compile(r"<[^>]+>")
+INLINE_SPACE_RE = re.compile(r"[^\S\n]+")
+LINE_EDGE_RE = re.compile(r" ?\n ?")
+BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def clean_description(text: str) -> str:
+    # Arbeitnow sends HTML; keep paragraph breaks, drop markup and entities
+    if "<" in text or "&" in text:
+        text = html.unescape(TAG_RE.sub(" ", BLOCK_TAG_RE.sub("\n", text)))
+    text = LINE_EDGE_RE.sub("\n", INLINE_SPACE_RE.sub(" ", text))
+    return BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def normalize_postings(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy()
+    for col in ("job_title", "company_name", "location"):
+        out[col] = out[col].astype(object).fillna("").astype(str).map(lambda s: INLINE_SPACE_RE.sub(" ", html.unescape(s)).strip())
+    out["job_description"] = out["job_description"].astype(object).fillna("").astype(str).map(clean_description)
+    return out
+
+
+def dedupe_postings(df: pd.DataFrame) -> pd.DataFrame:
+    # One row per url, then per title/company/location fingerprint: the same ad
+    # reposted or syndicated to another board. The earliest-fetched copy wins so
+    # the published url is stable.
+    df = df.drop_duplicates(subset=["url"])
+    key = pd.Series(
+        [fingerprint(t, c, l) for t, c, l in zip(df["job_title"], df["company_name"], df["location"])],
+        index=df.index,
+    )
+    if "fetched_at" in df and len(df):
+        order = pd.to_datetime(df["fetched_at"], utc=True, errors="coerce").sort_values(kind="stable", na_position="last").index
+        dup = key.loc[order].duplicated().reindex(df.index)
+    else:
+        dup = key.duplicated()
+    return df[~dup].reset_index(drop=True)
+
+
+def _fetch_order(df: pd.DataFrame) -> np.ndarray:
+    if "fetched_at" not in df or not len(df):
+        return np.arange(len(df))
+    return np.argsort(pd.to_datetime(df["fetched_at"], utc=True, errors="coerce").to_numpy(), kind="stable")
+
+
+_NEAR_DUP: Dict[str, Tuple[str, NearDupIndex]] = {}
+
+
+def near_dup_index(snapshot_dir: str, base: pd.DataFrame, key: str) -> NearDupIndex:
+    # The LSH index of the published snapshot (snapshot_key `key`): kept in memory
+    # between runs of the worker, saved next to the snapshots, rebuilt from `base`
+    # if neither matches.
+    cached = _NEAR_DUP.get(snapshot_dir)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    nd = NearDupIndex.load(os.path.join(snapshot_dir, NEAR_DUP_FILE), key=key)
+    if nd is None:
+        nd = NearDupIndex()
+        order = _fetch_order(base)
+        nd.add(base["url"].astype(str).to_numpy()[order].tolist(), base["job_description"].astype(str).to_numpy()[order].tolist())
+        if "aliases" in base:
+            for url, aliases in zip(base["url"].astype(str), base["aliases"].fillna("").astype(str)):
+                for alias in aliases.split():
+                    nd.alias(alias, url)
+    _NEAR_DUP[snapshot_dir] = (key, nd)
+    return nd
+
+
+def collapse_near_duplicates(df: pd.DataFrame, index: NearDupIndex) -> Tuple[pd.DataFrame, int]:
+    # Rows not yet in `index` are added earliest-fetched first; rows that land on
+    # another canonical posting are dropped and listed in its `aliases`.
+    urls = df["url"].astype(str).to_numpy()
+    order = _fetch_order(df)
+    canonical = np.empty(len(df), dtype=object)
+    canonical[order] = index.add(urls[order].tolist(), df["job_description"].astype(str).to_numpy()[order].tolist())
+    keep = canonical == urls
+    out = df[keep].reset_index(drop=True)
+    out["aliases"] = [" ".join(index.aliases.get(u, ())) for u in urls[keep]]
+    return out, int((~keep).sum())
+
+
+def published_key(df: pd.DataFrame, key: Optional[str] = None) -> str:
+    # snapshot_key (`key`, if known) plus the alias lists, which it does not cover
+    from matching.index import snapshot_key
+
+    key = key or snapshot_key(df)
+    if "aliases" not in df:
+        return key
+    return hashlib.sha1((key + "\n".join(df["aliases"].fillna("").astype(str))).encode("utf-8")).hexdigest()
+
+
+def sidecar_path(snapshot_path: str, kind: str) -> str:
+    # jobs-<v>.arrow -> <kind>-<v>.arrow: worker-only state kept with version v
+    head, name = os.path.split(snapshot_path)
+    return os.path.join(head, f"{kind}-" + name[len("jobs-"):])
+
+
+def dropped_path(snapshot_path: str) -> str:
+    # the urls deduped away up to this version
+    return sidecar_path(snapshot_path, "dropped")
+
+
+def seen_path(snapshot_path: str) -> str:
+    # url -> last_seen, when a crawl last listed the posting
+    return sidecar_path(snapshot_path, "seen")
+
+
+def load_dropped(snapshot_dir: str = SNAPSHOT_DIR) -> pd.DataFrame:
+    # url/source/content_hash of every posting folded into another one, so the
+    # next crawl treats them as known instead of new
+    path = current_snapshot_path(snapshot_dir)
+    if path is None or not os.path.exists(dropped_path(path)):
+        return pd.DataFrame(columns=DROPPED_COLUMNS)
+    return load_snapshot(dropped_path(path))
+
+
+def load_last_seen(snapshot_dir: str, base: pd.DataFrame) -> pd.Series:
+    # last_seen per url of `base`; postings without a stamp count from fetched_at
+    stamps = pd.Series(pd.to_datetime(base["fetched_at"], utc=True).array, index=base["url"].astype(str).array)
+    path = current_snapshot_path(snapshot_dir)
+    if path is not None and os.path.exists(seen_path(path)):
+        seen = load_snapshot(seen_path(path))
+        known = pd.Series(pd.to_datetime(seen["last_seen"], utc=True).array, index=seen["url"].astype(str).array)
+        stamps.update(known[known.index.isin(stamps.index)])
+    return stamps
+
+
+def _save_last_seen(last_seen: pd.Series, df: pd.DataFrame, snapshot_path: str, now: pd.Timestamp) -> None:
+    urls = df["url"].astype(str)
+    stamps = last_seen.reindex(urls.array).fillna(now)
+    save_snapshot(pd.DataFrame({"url": urls.array, "last_seen": stamps.array}), seen_path(snapshot_path))
+
+
+def full_crawl_due(snapshot_dir: str, hours: float = FULL_CRAWL_HOURS) -> bool:
+    try:
+        return time.time() - os.path.getmtime(os.path.join(snapshot_dir, FULL_CRAWL_STAMP)) >= hours * 3600
+    except OSError:
+        return True
+
+
+def _mark_full_crawl(snapshot_dir: str) -> None:
+    os.makedirs(snapshot_dir, exist_ok=True)
+    with open(os.path.join(snapshot_dir, FULL_CRAWL_STAMP), "w", encoding="utf-8") as fh:
+        fh.write(time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+
+
+def build_indexes(df: pd.DataFrame, base: Optional[pd.DataFrame] = None, key: Optional[str] = None, base_key: Optional[str] = None) -> None:
+    # With `base`, the published version's indexes are loaded first so only the
+    # delta is applied to them (matching.index.JobIndex.update). `key`/`base_key`
+    # are the frames' snapshot keys, if the caller has them.
+    from matching.index import get_index
+    from matching.scoring import get_skill_index
+
+    with span("ingest.index"):
+        for frame, k in ([(base, base_key)] if base is not None and len(base) else []) + [(df, key)]:
+            get_skill_index(frame, key=k)
+            try:
+                get_index(frame, key=k)
+            except ImportError:
+                pass
+
+
+def prune_versions(snapshot_dir: str, keep: int = KEEP_VERSIONS) -> List[str]:
+    try:
+        with open(os.path.join(snapshot_dir, "CURRENT"), encoding="utf-8") as fh:
+            current = fh.read().strip()
+    except OSError:
+        return []
+    versions = sorted(
+        (f for f in os.listdir(snapshot_dir) if f.startswith("jobs-") and f.endswith(".arrow")),
+        key=lambda f: os.path.getmtime(os.path.join(snapshot_dir, f)),
+        reverse=True,
+    )
+    removed = []
+    for name in versions[keep:]:
+        if name != current:
+            path = os.path.join(snapshot_dir, name)
+            os.remove(path)
+            for kind in ("dropped", "seen"):
+                if os.path.exists(sidecar_path(path, kind)):
+                    os.remove(sidecar_path(path, kind))
+            removed.append(name)
+    return removed
+
+
+def ingest_once(
+    snapshot_dir: str = SNAPSHOT_DIR,
+    connectors: Optional[List[Connector]] = None,
+    full: Optional[bool] = None,
+    max_age_days: float = MAX_AGE_DAYS,
+) -> Dict[str, Any]:
+    # `full` crawls every page (default: when JOBS_FULL_CRAWL_HOURS have passed);
+    # postings a complete crawl no longer lists, or that no crawl has listed for
+    # max_age_days, expire.
+    from matching.index import snapshot_key
+
+    t0 = time.perf_counter()
+    base = load_published(snapshot_dir)
+    dropped = load_dropped(snapshot_dir)
+    full = full_crawl_due(snapshot_dir) if full is None else full
+    connectors = default_connectors() if connectors is None else connectors
+    with span("ingest.fetch"):
+        # a full crawl re-checks earlier duplicates, whose canonical posting may be gone
+        known = pd.concat([base[DROPPED_COLUMNS], dropped], ignore_index=True) if len(dropped) and not full else base
+        rows, sources = run_connectors(connectors, known, full=full)
+    if full:
+        _mark_full_crawl(snapshot_dir)
+    now = pd.Timestamp.now(tz="UTC")
+    listed = pd.concat([base[DROPPED_COLUMNS], dropped], ignore_index=True) if len(dropped) else base
+    expired = set()
+    for c in connectors:
+        if c.stats.get("complete"):
+            urls = listed.loc[listed["source"].astype(str) == c.name, "url"]
+            expired.update(urls[~urls.isin(c.seen)].tolist())
+    # every posting a crawl listed, changed or not, is still on its board
+    last_seen = load_last_seen(snapshot_dir, base)
+    last_seen[last_seen.index.isin(set().union(*(c.seen for c in connectors)))] = now
+    if max_age_days:
+        expired.update(last_seen.index[last_seen < now - pd.Timedelta(days=max_age_days)])
+    stats: Dict[str, Any] = {
+        "sources": sources,
+        "full": full,
+        "new": sum(s["new"] for s in sources.values()),
+        "changed": sum(s["changed"] for s in sources.values()),
+    }
+    current = current_snapshot_path(snapshot_dir)
+    if not rows and not expired:
+        # nothing new: the current version stays published
+        if current is not None:
+            _save_last_seen(last_seen, base, current, now)
+        stats.update(published=None, seconds=time.perf_counter() - t0)
+        return stats
+
+    raw = merge_delta(base, rows, expired)
+    retired = set(base["url"]) - set(raw["url"])
+    if expired:
+        dropped = dropped[~dropped["url"].isin(expired)]
+    stats["expired"] = len(retired)
+    with span("ingest.normalize"):
+        df = dedupe_postings(normalize_postings(raw))
+    with span("ingest.near_dup"):
+        base_key = snapshot_key(base) if len(base) else ""
+        index = near_dup_index(snapshot_dir, base, base_key)
+        # new or changed postings are hashed afresh, so an edited repost can leave
+        # its canonical posting and an edited canonical posting drops its aliases
+        gone = retired | expired | {r["url"] for r in rows}
+        orphans = {a for u in gone for a in index.aliases.get(u, ())} - gone
+        index.remove(gone)
+        if orphans:
+            # their rows are not kept: forget them so the next crawl fetches them as new
+            dropped = dropped[~dropped["url"].isin(orphans)]
+        df, near = collapse_near_duplicates(df, index)
+        df = compact_jobs(df)
+    if not len(df) or len(df) < len(base) * MIN_KEEP_RATIO:
+        # an outage or a broken listing looks like mass expiry: keep serving the
+        # current version and let the worker's in-memory LSH index reload from disk
+        log.warning("not publishing %d rows in place of %d", len(df), len(base))
+        _NEAR_DUP.pop(snapshot_dir, None)
+        stats.update(published=None, refused=len(df), seconds=time.perf_counter() - t0)
+        return stats
+    stats.update(near_duplicates=near, duplicate_ratio=index.stats()["duplicate_ratio"])
+    folded = raw.loc[~raw["url"].isin(df["url"]), DROPPED_COLUMNS]
+    if len(folded):
+        keep = dropped[~dropped["url"].isin(folded["url"]) & ~dropped["url"].isin(df["url"])]
+        dropped = pd.concat([keep, folded], ignore_index=True) if len(keep) else folded
+    index_key = snapshot_key(df)
+    key = published_key(df, index_key)
+    if len(base) and key == published_key(base, base_key):
+        # the delta was only reposts that dedupe away; remember them for the current version
+        if len(folded):
+            save_snapshot(dropped, dropped_path(current))
+        _save_last_seen(last_seen, base, current, now)
+        stats.update(published=None, seconds=time.perf_counter() - t0)
+        return stats
+    version = time.strftime("%Y%m%dT%H%M%S", time.gmtime()) + "-" + key[:8]
+    build_indexes(df, base, index_key, base_key)
+    save_snapshot(dropped, dropped_path(os.path.join(snapshot_dir, f"jobs-{version}.arrow")))
+    _save_last_seen(last_seen, df, os.path.join(snapshot_dir, f"jobs-{version}.arrow"), now)
+    path = publish_snapshot(df, version, snapshot_dir)
+    index.save(os.path.join(snapshot_dir, NEAR_DUP_FILE), index_key)
+    _NEAR_DUP[snapshot_dir] = (index_key, index)
+    stats.update(
+        published=os.path.basename(path),
+        rows=len(df),
+        duplicates=len(raw) - len(df),
+        pruned=prune_versions(snapshot_dir),
+        seconds=time.perf_counter() - t0,
+    )
+    return stats
+
+
+def _locked(snapshot_dir: str):
+    # one worker per snapshot dir; None if another holds the lock
+    os.makedirs(snapshot_dir, exist_ok=True)
+    fh = open(os.path.join(snapshot_dir, ".ingest.lock"), "w")
+    try:
+        import fcntl
+
+        fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except ImportError:
+        pass
+    except OSError:
+        fh.close()
+        return None
+    return fh
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+    ap.add_argument("--interval", type=float, default=float(os.getenv("JOBS_INGEST_INTERVAL", "900")), help="seconds between runs")
+    ap.add_argument("--once", action="store_true", help="run a single ingestion and exit")
+    ap.add_argument("--sources", default=None, help="comma-separated connector names (default: JOB_SOURCES or all)")
+    ap.add_argument("--full", action="store_const", const=True, default=None, help="crawl every page now (default: every JOBS_FULL_CRAWL_HOURS)")
+    args = ap.parse_args(argv)
+    if args.sources:
+        os.environ["JOB_SOURCES"] = args.sources
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+    lock = _locked(args.snapshot_dir)
+    if lock is None:
+        log.error("another ingestion worker holds %s", args.snapshot_dir)
+        return 1
+    try:
+        while True:
+            try:
+                log.info(json.dumps(ingest_once(args.snapshot_dir, full=args.full), default=str))
+            except Exception:
+                log.exception("ingestion run failed")
+                if args.once:
+                    return 1
+            if args.once:
+                # let a vocabulary refit started by this run land on disk
+                from matching.index import wait_for_compactions
+
+                wait_for_compactions()
+                return 0
+            time.sleep(args.interval)
+    finally:
+        lock.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,37 +1,225 @@
-from typing import List, Dict
-import time
-import requests
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+import os
+import threading
 import pandas as pd
 
-API_URL = "https://arbeitnow.com/api/job-board-api"
+from .connectors import ARBEITNOW_RATE, ARBEITNOW_URL, ArbeitnowConnector
+from .metrics import span, timed
 
-def fetch_arbeitnow() -> pd.DataFrame:
-    jobs: List[Dict] = []
-    url = API_URL
-    tries = 0
-    while url and tries < 5:
-        tries += 1
+if TYPE_CHECKING:
+    import requests
+
+API_URL = ARBEITNOW_URL
+SNAPSHOT_PATH = os.getenv("JOBS_SNAPSHOT", os.path.join(".cache", "jobs", "arbeitnow.arrow"))
+# versioned snapshots published by the ingestion worker (services/ingest.py)
+SNAPSHOT_DIR = os.getenv("JOBS_SNAPSHOT_DIR", os.path.join(".cache", "jobs", "published"))
+LIVE_FALLBACK = os.getenv("JOBS_LIVE_FALLBACK", "").lower() in ("1", "true", "yes")
+# drop postings not (re)fetched for this many days; 0 keeps them until a complete crawl misses them
+JOB_COLUMNS = ["job_title", "company_name", "location", "url", "job_description", "source"]
+SNAPSHOT_COLUMNS = JOB_COLUMNS + ["content_hash", "fetched_at"]
+CATEGORY_COLUMNS = ["company_name", "location", "source"]
+TEXT_COLUMNS = ["job_title", "url", "job_description", "content_hash", "aliases"]
+
+_SESSIONS: Dict[Any, "requests.Session"] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def pooled_session(pool_size: int = 8, name: str = "default") -> "requests.Session":
+    # one keep-alive pool per source, so a slow board can't starve the others
+    with _SESSIONS_LOCK:
+        s = _SESSIONS.get((name, pool_size))
+        if s is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _SESSIONS[(name, pool_size)] = s
+        return s
+
+
+def _categorical(s: pd.Series) -> pd.Series:
+    # "" stays a category so downstream .fillna("") keeps working
+    cat = s.astype(object).fillna("").astype(str).astype("category")
+    return cat if "" in cat.cat.categories else cat.cat.add_categories([""])
+
+
+def compact_jobs(df: pd.DataFrame) -> pd.DataFrame:
+    # Low-cardinality columns as categoricals, free text as Arrow strings: one
+    # contiguous buffer per column instead of a Python str object per cell.
+    import pyarrow as pa
+
+    text = pd.ArrowDtype(pa.string())
+    cols = {}
+    for col in df.columns:
+        s = df[col]
+        if col in CATEGORY_COLUMNS:
+            cols[col] = s if isinstance(s.dtype, pd.CategoricalDtype) and "" in s.cat.categories and not s.isna().any() else _categorical(s)
+        elif col in TEXT_COLUMNS:
+            cols[col] = s.fillna("") if s.dtype == text else s.astype(object).fillna("").astype(str).astype(text)
+        else:
+            cols[col] = s
+    return pd.DataFrame(cols, index=df.index)
+
+
+def _arrow_strings(t):
+    import pyarrow as pa
+
+    return pd.ArrowDtype(t) if pa.types.is_string(t) or pa.types.is_large_string(t) else None
+
+
+def load_snapshot(path: str = SNAPSHOT_PATH) -> pd.DataFrame:
+    # .arrow snapshots are memory-mapped: string columns stay in the page cache
+    # (shared between processes) until a row is actually read.
+    if path and os.path.exists(path):
         try:
-            r = requests.get(url, timeout=10)
-            r.raise_for_status()
-            data = r.json()
-            items = data.get("data", [])
-            for it in items:
-                jobs.append({
-                    "job_title": it.get("title"),
-                    "company_name": it.get("company_name"),
-                    "location": it.get("location"),
-                    "url": it.get("url"),
-                    "job_description": it.get("description"),
-                    "source": "arbeitnow",
-                })
-            url = data.get("links", {}).get("next")
-            time.sleep(0.2)
+            if path.endswith(".parquet"):
+                return compact_jobs(pd.read_parquet(path))
+            import pyarrow as pa
+
+            table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+            return table.to_pandas(types_mapper=_arrow_strings)
         except Exception:
-            break
-    if not jobs:
-        return pd.DataFrame(columns=["job_title", "company_name", "location", "url", "job_description", "source"])
-    df = pd.DataFrame(jobs)
-    df.drop_duplicates(subset=["url"], inplace=True)
+            pass
+    return pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+
+
+def save_snapshot(df: pd.DataFrame, path: str = SNAPSHOT_PATH) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    df = compact_jobs(df.reset_index(drop=True))
+    if path.endswith(".parquet"):
+        df.to_parquet(tmp, index=False)
+    else:
+        import pyarrow as pa
+        from pyarrow import feather
+
+        # uncompressed IPC so load_snapshot can map it without decoding
+        feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), tmp, compression="uncompressed")
+    os.replace(tmp, path)
+
+
+def merge_delta(snap: pd.DataFrame, rows: List[Dict[str, Any]], expired: Iterable[str] = ()) -> pd.DataFrame:
+    # New/changed rows first (stamped now), replacing their urls in `snap`. Rows
+    # of `snap` whose url is in `expired` are retired.
+    now = pd.Timestamp.now(tz="UTC")
+    delta_df = pd.DataFrame(rows) if rows else pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+    delta_df["fetched_at"] = now
+    keep = snap[~snap["url"].isin(delta_df["url"])]
+    expired = list(expired)
+    if expired:
+        keep = keep[~keep["url"].isin(expired)]
+    parts = [p for p in (delta_df[SNAPSHOT_COLUMNS], keep) if len(p)]
+    out = pd.concat(parts, ignore_index=True) if len(parts) > 1 else (parts[0] if parts else delta_df[SNAPSHOT_COLUMNS])
+    return compact_jobs(out.drop_duplicates(subset=["url"]).reset_index(drop=True))
+
+
+# Arbeitnow crawl merged into a local snapshot file; the crawl itself is
+# ArbeitnowConnector (services/connectors.py).
+class ArbeitnowFetcher:
+    def __init__(
+        self,
+        api_url: str = API_URL,
+        snapshot_path: Optional[str] = SNAPSHOT_PATH,
+        max_workers: int = 4,
+        max_pages: int = 20,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 10,
+        session: Optional["requests.Session"] = None,
+        rate: float = ARBEITNOW_RATE,
+    ):
+        self.snapshot_path = snapshot_path
+        self.max_workers = max(1, max_workers)
+        self.connector = ArbeitnowConnector(
+            api_url=api_url, max_workers=self.max_workers, max_pages=max_pages,
+            retries=retries, backoff=backoff, timeout=timeout, rate=rate, session=session,
+        )
+        self.stats: Dict[str, Any] = {}
+
+    def fetch_page(self, page: int) -> Optional[Dict[str, Any]]:
+        return self.connector.fetch_page(page)
+
+    @timed("jobs.refresh")
+    def refresh(self, base: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        # `base` replaces reading snapshot_path as the known postings to diff against
+        if base is not None:
+            snap = base
+        else:
+            snap = load_snapshot(self.snapshot_path) if self.snapshot_path else pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+        fresh = self.connector.collect(dict(zip(snap["url"], snap["content_hash"])))
+        self.stats = dict(self.connector.stats)
+        if fresh:
+            snap = merge_delta(snap, list(fresh.values()))
+            if self.snapshot_path:
+                try:
+                    with span("jobs.save_snapshot"):
+                        save_snapshot(snap, self.snapshot_path)
+                    # serve the mapped file rather than the freshly built frame
+                    snap = load_snapshot(self.snapshot_path)
+                except Exception:
+                    pass
+        if snap["url"].duplicated().any():
+            snap = snap.drop_duplicates(subset=["url"]).reset_index(drop=True)
+        self.stats["total"] = len(snap)
+        return snap
+
+
+def fetch_arbeitnow() -> pd.DataFrame:
+    df = ArbeitnowFetcher().refresh()
+    if df.empty:
+        return pd.DataFrame(columns=JOB_COLUMNS)
+    return df
+
+
+def current_snapshot_path(snapshot_dir: str = SNAPSHOT_DIR) -> Optional[str]:
+    # CURRENT names the latest published version; it is swapped with os.replace
+    try:
+        with open(os.path.join(snapshot_dir, "CURRENT"), encoding="utf-8") as fh:
+            name = fh.read().strip()
+    except OSError:
+        return None
+    path = os.path.join(snapshot_dir, name)
+    return path if name and os.path.exists(path) else None
+
+
+def publish_snapshot(df: pd.DataFrame, version: str, snapshot_dir: str = SNAPSHOT_DIR) -> str:
+    # Versions are immutable files; readers that mapped an older one keep it until
+    # they reload, even after it is pruned.
+    os.makedirs(snapshot_dir, exist_ok=True)
+    name = f"jobs-{version}.arrow"
+    path = os.path.join(snapshot_dir, name)
+    if not os.path.exists(path):
+        save_snapshot(df, path)
+    tmp = os.path.join(snapshot_dir, "CURRENT.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(name)
+    os.replace(tmp, os.path.join(snapshot_dir, "CURRENT"))
+    return path
+
+
+_PUBLISHED: Dict[str, pd.DataFrame] = {}
+
+
+def load_published(snapshot_dir: str = SNAPSHOT_DIR) -> pd.DataFrame:
+    # Mapped current version; the same frame is returned until CURRENT moves on.
+    path = current_snapshot_path(snapshot_dir)
+    if path is None:
+        return pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+    df = _PUBLISHED.get(path)
+    if df is None:
+        df = load_snapshot(path)
+        _PUBLISHED.clear()
+        _PUBLISHED[path] = df
     return df
 
+
+def load_jobs() -> pd.DataFrame:
+    # What the app serves: the published snapshot, never the network unless
+    # JOBS_LIVE_FALLBACK is set and nothing has been published yet.
+    df = load_published()
+    if df.empty and LIVE_FALLBACK:
+        return fetch_arbeitnow()
+    return df
@@ -0,0 +1,234 @@
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+METRICS_ENABLED = os.getenv("APP_METRICS", "").lower() in ("1", "true", "yes")
+PROFILE_ENABLED = os.getenv("APP_PROFILE", "").lower() in ("1", "true", "yes")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+# upper bounds in seconds, Prometheus-style cumulative buckets (+Inf is implicit)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROFILE_KEEP = 5
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        # upper bound of the bucket holding the q-th observation
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum_s": self.sum,
+            "mean_ms": 1000 * self.sum / self.count if self.count else 0.0,
+            "p50_ms": 1000 * self.quantile(0.5),
+            "p95_ms": 1000 * self.quantile(0.95),
+            "max_ms": 1000 * self.max,
+        }
+
+
+# Per-stage duration histograms keyed by dotted stage name ("cv_parser.normalize").
+class Registry:
+    def __init__(self):
+        self.enabled = METRICS_ENABLED
+        self.histograms: Dict[str, Histogram] = {}
+        self.profiles: Deque[Tuple[str, str]] = deque(maxlen=PROFILE_KEEP)
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            h = self.histograms.get(stage)
+            if h is None:
+                h = self.histograms[stage] = Histogram()
+            h.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {k: h.snapshot() for k, h in sorted(self.histograms.items())}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        lines = [
+            "# HELP stage_duration_seconds Time spent per pipeline stage.",
+            "# TYPE stage_duration_seconds histogram",
+        ]
+        with self._lock:
+            items = sorted((k, list(h.counts), h.count, h.sum, h.buckets) for k, h in self.histograms.items())
+        for stage, counts, count, total, buckets in items:
+            cum = 0
+            for le, c in zip(buckets, counts):
+                cum += c
+                lines.append(f'stage_duration_seconds_bucket{{stage="{stage}",le="{le}"}} {cum}')
+            lines.append(f'stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'stage_duration_seconds_sum{{stage="{stage}"}} {total}')
+            lines.append(f'stage_duration_seconds_count{{stage="{stage}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.profiles.clear()
+
+
+REGISTRY = Registry()
+
+
+class _Span:
+    __slots__ = ("stage", "t0")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self) -> "_Span":
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        REGISTRY.observe(self.stage, time.perf_counter() - self.t0)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def span(stage: str):
+    # `with span("matcher.score"): ...`; a shared no-op when metrics are disabled
+    return _Span(stage) if REGISTRY.enabled else _NOOP
+
+
+def timed(stage: Optional[str] = None) -> Callable[[Callable], Callable]:
+    def deco(fn: Callable) -> Callable:
+        name = stage or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not REGISTRY.enabled:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                REGISTRY.observe(name, time.perf_counter() - t0)
+
+        return wrapper
+
+    return deco
+
+
+def observe(stage: str, seconds: float) -> None:
+    if REGISTRY.enabled:
+        REGISTRY.observe(stage, seconds)
+
+
+def enable(flag: bool = True) -> None:
+    REGISTRY.enabled = flag
+
+
+class profiled:
+    # Opt-in cProfile capture of one request; keeps the top functions by cumulative
+    # time for the last PROFILE_KEEP captures in REGISTRY.profiles.
+    def __init__(self, label: str, enabled: Optional[bool] = None, top: int = 25):
+        self.label = label
+        self.enabled = PROFILE_ENABLED if enabled is None else enabled
+        self.top = top
+        self._prof: Optional[cProfile.Profile] = None
+
+    def __enter__(self) -> "profiled":
+        if self.enabled:
+            self._prof = cProfile.Profile()
+            try:
+                self._prof.enable()
+            except ValueError:
+                # another profiler is already active on this thread
+                self._prof = None
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._prof is None:
+            return
+        self._prof.disable()
+        out = io.StringIO()
+        pstats.Stats(self._prof, stream=out).sort_stats("cumulative").print_stats(self.top)
+        REGISTRY.profiles.append((self.label, out.getvalue()))
+        self._prof = None
+
+
+_SERVER = None
+_SERVER_LOCK = threading.Lock()
+
+
+def serve(port: int = METRICS_PORT, host: str = "127.0.0.1"):
+    # Local endpoint: /metrics (Prometheus text) and /metrics.json. Started once per process.
+    global _SERVER
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    with _SERVER_LOCK:
+        if _SERVER is not None:
+            return _SERVER
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    body, ctype = REGISTRY.to_json(), "application/json"
+                elif self.path.startswith("/metrics"):
+                    body, ctype = REGISTRY.to_prometheus(), "text/plain; version=0.0.4"
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        _SERVER = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=_SERVER.serve_forever, name="metrics-http", daemon=True).start()
+        return _SERVER
+
+
+def stage_rows() -> List[Dict[str, Any]]:
+    return [{"stage": k, **v} for k, v in REGISTRY.snapshot().items()]
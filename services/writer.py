@@ -0,0 +1,212 @@
+import atexit
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from .db import get_manager, interest_payload
+
+WRITE_BATCH = int(os.getenv("SUPABASE_WRITE_BATCH", "50"))
+WRITE_INTERVAL = float(os.getenv("SUPABASE_WRITE_INTERVAL", "2.0"))
+
+log = logging.getLogger("writer")
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+# Write-behind queue for Supabase. UI calls only enqueue; a daemon thread flushes
+# batched interest inserts and coalesced candidate upserts when the batch fills up
+# or the interval passes, retrying failed flushes with exponential backoff.
+# Batches that still fail are requeued for up to max_requeues later flushes, then
+# kept in the bounded dead_letters queue. Interests of a candidate whose upsert
+# failed wait for it (or follow it into dead_letters) instead of being inserted.
+class WriteBehind:
+    def __init__(
+        self,
+        client: Any,
+        max_batch: int = WRITE_BATCH,
+        flush_interval: float = WRITE_INTERVAL,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_queue: int = 10000,
+        max_requeues: int = 3,
+        max_dead_letters: int = 1000,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.client = client
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.max_queue = max_queue
+        self.max_requeues = max_requeues
+        self.stats = {
+            "interests_written": 0,
+            "candidates_written": 0,
+            "candidates_skipped": 0,
+            "batches": 0,
+            "retries": 0,
+            "failed": 0,
+            "dropped": 0,
+            "requeued": 0,
+            "dead_lettered": 0,
+        }
+        self._interests: Deque[Dict[str, Any]] = deque(maxlen=max_queue)
+        self._candidates: Dict[str, str] = {}
+        self._written: Dict[str, str] = {}  # candidate id -> hash of last uploaded cv_text
+        self._retry: Deque[Tuple[str, List[Dict[str, Any]], int]] = deque()  # (table, rows, failed flushes)
+        self._unwritten: Set[str] = set()  # candidates whose upsert is waiting in _retry
+        self._dead: Set[str] = set()  # candidates whose upsert was given up
+        self.dead_letters: Deque[Tuple[str, List[Dict[str, Any]]]] = deque(maxlen=max_dead_letters)
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="supabase-writer", daemon=True)
+        self._thread.start()
+
+    def log_interest(self, candidate_id: str, job_row) -> None:
+        payload = interest_payload(candidate_id, job_row)
+        with self._cond:
+            if len(self._interests) == self._interests.maxlen:
+                self.stats["dropped"] += 1
+            self._interests.append(payload)
+            if len(self._interests) >= self.max_batch:
+                self._cond.notify()
+
+    def ensure_candidate(self, candidate_id: str, cv_text: str) -> None:
+        with self._cond:
+            if self._written.get(candidate_id) == _text_hash(cv_text):
+                self.stats["candidates_skipped"] += 1
+                return
+            if candidate_id in self._candidates:
+                self.stats["candidates_skipped"] += 1
+            self._candidates[candidate_id] = cv_text
+            if len(self._candidates) >= self.max_batch:
+                self._cond.notify()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._interests) + len(self._candidates) + sum(len(rows) for _, rows, _ in self._retry)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._interests) < self.max_batch and len(self._candidates) < self.max_batch:
+                    self._cond.wait(self.flush_interval)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def _with_retries(self, fn: Callable[[], Any]) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                fn()
+                return True
+            except Exception:
+                if attempt < self.max_retries:
+                    self.stats["retries"] += 1
+                    self.sleep(self.backoff * (2 ** attempt))
+        return False
+
+    def _give_up(self, table: str, rows: List[Dict[str, Any]], failures: int) -> None:
+        # caller holds self._cond
+        self.dead_letters.append((table, rows))
+        self.stats["dead_lettered"] += len(rows)
+        if table == "candidates":
+            ids = {r["id"] for r in rows}
+            self._unwritten -= ids
+            self._dead |= ids
+        log.warning("supabase %s: gave up on %d rows after %d failed flushes", table, len(rows), failures)
+
+    def _requeue(self, table: str, rows: List[Dict[str, Any]], failures: int) -> None:
+        with self._cond:
+            queued = sum(len(r) for _, r, _ in self._retry)
+            if failures > self.max_requeues or queued + len(rows) > self.max_queue:
+                self._give_up(table, rows, failures)
+                return
+            self._retry.append((table, rows, failures))
+            self.stats["requeued"] += len(rows)
+            if table == "candidates":
+                self._unwritten |= {r["id"] for r in rows}
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._cond:
+                candidates, self._candidates = self._candidates, {}
+                interests: List[Dict[str, Any]] = list(self._interests)[: self.max_batch * 20]
+                for _ in interests:
+                    self._interests.popleft()
+                retry, self._retry = list(self._retry), deque()
+            # candidates first: interests reference them. A requeued upsert is
+            # superseded by a newer cv_text enqueued since.
+            rows = [{"id": cid, "cv_text": text} for cid, text in candidates.items()]
+            batches = [([r for r in chunk if r["id"] not in candidates], failures) for table, chunk, failures in retry if table == "candidates"]
+            batches += [(rows[i:i + self.max_batch], 0) for i in range(0, len(rows), self.max_batch)]
+            for chunk, failures in batches:
+                if not chunk:
+                    continue
+                if self._with_retries(lambda: self.client.table("candidates").upsert(chunk).execute()):
+                    self.stats["batches"] += 1
+                    self.stats["candidates_written"] += len(chunk)
+                    with self._cond:
+                        for r in chunk:
+                            self._written[r["id"]] = _text_hash(r["cv_text"])
+                            self._unwritten.discard(r["id"])
+                            self._dead.discard(r["id"])
+                else:
+                    self.stats["failed"] += len(chunk)
+                    self._requeue("candidates", chunk, failures + 1)
+
+            batches = [(chunk, failures) for table, chunk, failures in retry if table == "interests"]
+            batches += [(interests[i:i + self.max_batch], 0) for i in range(0, len(interests), self.max_batch)]
+            for chunk, failures in batches:
+                with self._cond:
+                    dead = [r for r in chunk if r["candidate_id"] in self._dead]
+                    held = [r for r in chunk if r["candidate_id"] in self._unwritten]
+                    if dead:
+                        self._give_up("interests", dead, failures)
+                if held:
+                    # not a failure of their own: wait for the candidate upsert
+                    self._requeue("interests", held, failures)
+                if dead or held:
+                    skip = {id(r) for r in dead + held}
+                    chunk = [r for r in chunk if id(r) not in skip]
+                if not chunk:
+                    continue
+                if self._with_retries(lambda: self.client.table("interests").insert(chunk).execute()):
+                    self.stats["batches"] += 1
+                    self.stats["interests_written"] += len(chunk)
+                else:
+                    self.stats["failed"] += len(chunk)
+                    self._requeue("interests", chunk, failures + 1)
+
+    def close(self, timeout: float = 10.0) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+
+_WRITER: Optional[WriteBehind] = None
+_WRITER_LOCK = threading.Lock()
+
+
+def get_writer() -> Optional[WriteBehind]:
+    global _WRITER
+    if _WRITER is None:
+        with _WRITER_LOCK:
+            if _WRITER is None:
+                # the manager quacks like a client: table(...) calls are pooled and timed
+                manager = get_manager()
+                if manager is None:
+                    return None
+                _WRITER = WriteBehind(manager)
+                atexit.register(_WRITER.close)
+    return _WRITER
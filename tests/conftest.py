@@ -0,0 +1,22 @@
+import pytest
+
+from matching import index as job_index
+from matching import inverted, results, scoring
+
+
+def _clear_indexes():
+    for cache in (job_index._INDEXES, scoring._INDEXES, inverted._INDEXES, results._FILTERS):
+        cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def isolated_indexes(tmp_path, monkeypatch):
+    # index files land in the test's tmp dir, not .cache/job_index in the CWD, and
+    # no test starts from (or updates) another test's in-memory indexes
+    index_dir = str(tmp_path / "job_index")
+    monkeypatch.setenv("JOB_INDEX_DIR", index_dir)
+    monkeypatch.setattr(job_index, "INDEX_DIR", index_dir)
+    _clear_indexes()
+    yield
+    job_index.wait_for_compactions()
+    _clear_indexes()
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from matching.ann import IVFIndex
+from matching.index import JobIndex
+from matching.results import top_rows
+
+TOPICS = [
+    "python backend sql kubernetes api",
+    "sales lead generation salesforce crm b2b",
+    "data analyst excel dashboards statistics",
+    "frontend react typescript css design",
+    "marketing seo content campaigns social",
+]
+
+
+def _jobs(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n):
+        words = TOPICS[i % len(TOPICS)].split() + TOPICS[rng.integers(len(TOPICS))].split()
+        rows.append({"job_title": f"role {i}", "job_description": " ".join(rng.choice(words, 12)), "url": f"https://x/{i}"})
+    return pd.DataFrame(rows)
+
+
+QUERIES = ["python sql api", "salesforce crm leads", "excel statistics", "react css", "seo campaigns"]
+
+
+def test_full_probe_recall_equals_exact_search():
+    idx = JobIndex.build(_jobs())
+    ann = IVFIndex.build(idx, n_components=8, n_lists=6)
+    for q in QUERIES:
+        exact = top_rows(idx.query(q), 10)
+        rows, scores = ann.search(q, top_n=10, n_probe=ann.n_lists, shortlist=idx.n_jobs)
+        assert set(rows.tolist()) == set(exact.tolist())
+        assert np.allclose(scores, idx.query(q)[rows])
+
+
+def test_n_probe_is_validated_and_clamped():
+    idx = JobIndex.build(_jobs())
+    ann = IVFIndex.build(idx, n_components=8, n_lists=6)
+    with pytest.raises(ValueError, match="n_probe"):
+        ann.search("python", n_probe=0)
+    wide = ann.search("python sql", n_probe=100, shortlist=idx.n_jobs)
+    full = ann.search("python sql", n_probe=ann.n_lists, shortlist=idx.n_jobs)
+    assert wide[0].tolist() == full[0].tolist()
+    assert ann.search("python", top_n=0)[0].size == 0
+
+
+def test_save_load_roundtrip(tmp_path):
+    jobs = _jobs()
+    idx = JobIndex.build(jobs)
+    ann = IVFIndex.build(idx, n_components=8, n_lists=6)
+    ann.save(str(tmp_path))
+    loaded = IVFIndex.load(str(tmp_path), idx)
+    for q in QUERIES:
+        a, b = ann.search(q, n_probe=2), loaded.search(q, n_probe=2)
+        assert a[0].tolist() == b[0].tolist() and np.allclose(a[1], b[1])
+    with pytest.raises(ValueError, match="built for job index"):
+        IVFIndex.load(str(tmp_path), JobIndex.build(jobs.iloc[:100]))
@@ -0,0 +1,36 @@
+import json
+
+from benchmarks.harness import compare, main
+from benchmarks.recorded import RecordedSession, recorded_pages
+from services.jobs import ArbeitnowFetcher
+
+
+def test_recorded_ingestion_scales_pages():
+    pages = recorded_pages(7)
+    df = ArbeitnowFetcher(snapshot_path=None, max_pages=20, session=RecordedSession(pages)).refresh()
+    assert len(df) == sum(len(p["data"]) for p in pages)
+    assert df["url"].is_unique
+
+
+def test_harness_writes_comparable_json(tmp_path):
+    out = tmp_path / "bench.json"
+    assert main(["--scale", "smoke", "--only", "normalize_text", "ingest_full", "--out", str(out)]) == 0
+    report = json.loads(out.read_text())
+    assert set(report["runs"][0]["results"]) == {"normalize_text", "ingest_full"}
+
+    slower = json.loads(out.read_text())
+    for res in slower["runs"][0]["results"].values():
+        res["median_s"] *= 2
+    assert len(compare(slower, report, threshold=0.5)) == 2
+    assert compare(report, slower, threshold=0.5) == []
+
+
+def test_only_builds_the_selected_cases_fixtures(monkeypatch):
+    from benchmarks import harness
+
+    def no_jobs(n):
+        raise AssertionError("job corpus built for a case that doesn't need it")
+
+    monkeypatch.setattr(harness, "synthetic_jobs", no_jobs)
+    report = harness.run("smoke", ["normalize_text", "candidate_text"])
+    assert set(report["results"]) == {"normalize_text", "candidate_text"}
@@ -0,0 +1,30 @@
+import io
+import json
+
+from parsing.bulk import iter_inputs, parse_many, write_jsonl
+
+
+def test_parse_many_streams_results_and_failures(tmp_path):
+    src = tmp_path / "raw.jsonl"
+    rows = [{"id": f"cv{i}", "text": f"JANE DOE\nEXPERIENCE\nAnalyst - Acme {i} - Paris\nJAN 2020 - MAR 2021"} for i in range(5)]
+    rows.append({"id": "broken", "path": str(tmp_path / "missing.txt")})
+    src.write_text("\n".join(json.dumps(r) for r in rows), encoding="utf-8")
+
+    out = io.StringIO()
+    summary = write_jsonl(parse_many(iter_inputs(str(src)), workers=2, chunk_size=2), out)
+    recs = {r["id"]: r for r in map(json.loads, out.getvalue().splitlines())}
+
+    assert summary["docs"] == 6 and summary["failed"] == 1
+    assert not recs["broken"]["ok"] and "FileNotFoundError" in recs["broken"]["error"]
+    assert recs["cv3"]["result"]["experience"][0]["company"] == "Acme 3"
+    assert all(r["seconds"] >= 0 for r in recs.values())
+
+
+def test_malformed_jsonl_lines_become_error_records(tmp_path):
+    src = tmp_path / "raw.jsonl"
+    src.write_text('{"id": "cv", "text": "JANE DOE"}\nnot json\n[1, 2]\n"text"\n', encoding="utf-8")
+
+    assert [doc_id for doc_id, _, _ in iter_inputs(str(src))] == ["cv", "line-1", "line-2", "line-3"]
+    out = io.StringIO()
+    summary = write_jsonl(parse_many(iter_inputs(str(src)), workers=1), out)
+    assert summary["docs"] == 4 and summary["failed"] == 3
@@ -0,0 +1,259 @@
+import threading
+import time
+
+import pandas as pd
+
+from services.connectors import Connector, RateLimiter, run_connectors
+from services import ingest
+from services.ingest import dedupe_postings, ingest_once
+from services.jobs import load_published
+
+
+class FakeBoard(Connector):
+    # in-memory board: pages of {"jobs": [...]} and no HTTP
+    def __init__(self, name, pages, fail=(), **kw):
+        super().__init__(backoff=0.001, **kw)
+        self.name = name
+        self.pages = pages
+        self.fail = set(fail)
+        self.calls = []
+        self.threads = set()
+
+    def fetch_page(self, page):
+        self.calls.append(page)
+        self.threads.add(threading.current_thread().name)
+        if page in self.fail:
+            return None
+        return {"jobs": self.pages[page - 1] if page <= len(self.pages) else []}
+
+    def request(self, page):
+        return "", {}
+
+    def items(self, doc):
+        return doc["jobs"]
+
+    def has_next(self, doc, page):
+        return page < len(self.pages)
+
+    def map_item(self, it):
+        return {"job_title": it["title"], "company_name": it["company"], "location": it["city"], "url": it["url"], "job_description": it["text"]}
+
+
+def _job(i, title="Data Analyst (m/w/d)", company="Acme GmbH", city="Berlin", prefix="a"):
+    return {"title": f"{title} {i}", "company": company, "city": city, "url": f"https://{prefix}/{i}", "text": f"posting {i}"}
+
+
+def test_sources_crawl_concurrently_and_diff_per_source():
+    a = FakeBoard("board_a", [[_job(i) for i in range(3)], [_job(i) for i in range(3, 6)]])
+    b = FakeBoard("board_b", [[_job(i, prefix="b") for i in range(10, 12)]])
+    rows, stats = run_connectors([a, b], pd.DataFrame())
+    assert len(rows) == 8 and {r["source"] for r in rows} == {"board_a", "board_b"}
+    assert stats["board_a"]["new"] == 6 and stats["board_b"]["new"] == 2
+
+    base = pd.DataFrame(rows)
+    a2 = FakeBoard("board_a", a.pages, max_workers=1)
+    rows2, _ = run_connectors([a2], base)
+    # newest-first listing: nothing new on page 1 ends the crawl
+    assert rows2 == [] and a2.calls == [1]
+
+
+def test_cross_source_fingerprint_dedupe(tmp_path):
+    a = FakeBoard("board_a", [[_job(1, title="Sales Manager (m/f/d)", company="Pipedrive Labs GmbH", city="Berlin, Germany")]])
+    b = FakeBoard("board_b", [[_job(1, title="Sales manager (w/m/d)", company="Pipedrive Labs", city="Berlin", prefix="b"), _job(2, prefix="b")]])
+    stats = ingest_once(str(tmp_path), [a, b])
+    df = load_published(str(tmp_path))
+    assert len(df) == 2 and stats["duplicates"] == 1
+    assert df.loc[df["job_title"].str.startswith("Sales"), "source"].tolist() == ["board_a"]
+
+
+def test_dedupe_keeps_earliest_fetched():
+    df = pd.DataFrame([
+        {"job_title": "X (m/w/d)", "company_name": "Acme AG", "location": "Köln", "url": "new", "fetched_at": pd.Timestamp("2024-02-01", tz="UTC")},
+        {"job_title": "x", "company_name": "acme", "location": "Koln, DE", "url": "old", "fetched_at": pd.Timestamp("2024-01-01", tz="UTC")},
+    ])
+    assert dedupe_postings(df)["url"].tolist() == ["old"]
+
+
+def _text(seed, n=60):
+    import random
+
+    rng = random.Random(seed)
+    return " ".join(rng.choice(["python", "sql", "team", "data", "cloud", "we", "offer", "remote", "senior", "growth", "api", "build"]) + str(rng.randrange(50)) for _ in range(n))
+
+
+def test_near_duplicate_descriptions_collapse_to_aliases(tmp_path):
+    text = _text(1)
+    edited = text.replace(text.split()[30], "kotlin", 1)
+    a = FakeBoard("board_a", [[dict(_job(1), text=text), dict(_job(2), text=_text(2))]])
+    b = FakeBoard("board_b", [[dict(_job(1, title="Python Developer", company="Other", prefix="b"), text=edited)]])
+    stats = ingest_once(str(tmp_path), [a, b])
+    df = load_published(str(tmp_path)).set_index("url")
+    assert len(df) == 2 and stats["near_duplicates"] == 1
+    assert df.loc["https://a/1", "aliases"] == "https://b/1" and df.loc["https://a/2", "aliases"] == ""
+    assert abs(stats["duplicate_ratio"] - 1 / 3) < 1e-9
+
+    # a restarted worker picks the LSH index up from disk and keeps collapsing
+    ingest._NEAR_DUP.clear()
+    c = FakeBoard("board_c", [[dict(_job(1, title="Backend Engineer", company="Third", prefix="c"), text=text + " apply now")]])
+    again = ingest_once(str(tmp_path), [a, c])
+    assert again["published"] and again["near_duplicates"] == 1
+    df = load_published(str(tmp_path)).set_index("url")
+    assert len(df) == 2 and df.loc["https://a/1", "aliases"] == "https://b/1 https://c/1"
+
+
+def test_changed_alias_is_rehashed(tmp_path):
+    text = _text(1)
+    a = FakeBoard("board_a", [[dict(_job(1), text=text), dict(_job(2), text=_text(2))]])
+    b = FakeBoard("board_b", [[dict(_job(1, title="Python Developer", company="Other", prefix="b"), text=text + " apply now")]])
+    ingest_once(str(tmp_path), [a, b])
+    assert "https://b/1" not in set(load_published(str(tmp_path))["url"])
+
+    # the repost is rewritten into an unrelated ad: it no longer collapses
+    b = FakeBoard("board_b", [[dict(_job(1, title="Python Developer", company="Other", prefix="b"), text=_text(3))]])
+    stats = ingest_once(str(tmp_path), [a, b])
+    df = load_published(str(tmp_path)).set_index("url")
+    assert stats["published"] and stats["near_duplicates"] == 0
+    assert "https://b/1" in df.index and df.loc["https://a/1", "aliases"] == ""
+
+
+def test_changed_canonical_releases_its_aliases(tmp_path):
+    text = _text(1)
+    a = FakeBoard("board_a", [[dict(_job(1), text=text), dict(_job(2), text=_text(2))]])
+    b = FakeBoard("board_b", [[dict(_job(1, title="Python Developer", company="Other", prefix="b"), text=text + " apply now")]])
+    ingest_once(str(tmp_path), [a, b])
+
+    a = FakeBoard("board_a", [[dict(_job(1), text=_text(3)), dict(_job(2), text=_text(2))]])
+    stats = ingest_once(str(tmp_path), [a, b])
+    df = load_published(str(tmp_path)).set_index("url")
+    assert stats["published"] and df.loc["https://a/1", "aliases"] == ""
+    assert "https://b/1" not in set(ingest.load_dropped(str(tmp_path))["url"])
+
+    # the released repost is new to the next crawl and published on its own
+    stats = ingest_once(str(tmp_path), [a, b])
+    df = load_published(str(tmp_path)).set_index("url")
+    assert stats["new"] == 1 and "https://b/1" in df.index and len(df) == 3
+
+
+def test_rate_limiter_spaces_requests():
+    rl = RateLimiter(rate=50, burst=1)
+    t0 = time.monotonic()
+    for _ in range(6):
+        rl.acquire()
+    assert time.monotonic() - t0 >= 0.09
+
+
+def test_dropped_duplicates_are_known_to_the_next_crawl(tmp_path):
+    text = _text(3)
+    pages = [
+        [dict(_job(1), text=text), dict(_job(1, prefix="repost"), text="posting 1"), dict(_job(1, title="Data Engineer", company="Other", prefix="b"), text=text + " now")],
+        [dict(_job(2), text=_text(4))],
+    ]
+    first = ingest_once(str(tmp_path), [FakeBoard("board_a", pages, max_workers=1)])
+    assert first["new"] == 4 and first["rows"] == 2
+
+    for _ in range(2):
+        board = FakeBoard("board_a", pages, max_workers=1)
+        again = ingest_once(str(tmp_path), [board])
+        # nothing new on page 1, so the newest-first crawl stops there
+        assert again["new"] == 0 and board.calls == [1]
+
+
+def test_vanished_posting_expires_after_a_complete_crawl(tmp_path, monkeypatch):
+    from matching import index as job_index
+
+    # keep the tombstone visible: no background refit swaps in a fresh index
+    monkeypatch.setattr(job_index, "INDEX_DRIFT", 1.0)
+    pages = [[_job(i) for i in range(1, 5)], [_job(i) for i in range(5, 9)]]
+    ingest_once(str(tmp_path), [FakeBoard("board_a", pages)], full=True)
+
+    gone = [[j for j in pages[0] if j["url"] != "https://a/2"], pages[1]]
+    # a failed page leaves the crawl incomplete, so nothing expires
+    partial = ingest_once(str(tmp_path), [FakeBoard("board_a", gone, fail={2})], full=True)
+    assert partial["published"] is None and "https://a/2" in set(load_published(str(tmp_path))["url"])
+
+    stats = ingest_once(str(tmp_path), [FakeBoard("board_a", gone)], full=True)
+    df = load_published(str(tmp_path))
+    assert stats["expired"] == 1 and len(df) == 7 and "https://a/2" not in set(df["url"])
+    assert job_index.get_index(df).deleted == 1
+
+
+def _age_last_seen(snapshot_dir, days):
+    from services.ingest import seen_path
+    from services.jobs import current_snapshot_path, load_snapshot, save_snapshot
+
+    path = seen_path(current_snapshot_path(snapshot_dir))
+    seen = load_snapshot(path).copy()
+    seen["last_seen"] = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=days)
+    save_snapshot(seen, path)
+
+
+def test_max_age_retires_postings_no_crawl_lists(tmp_path):
+    pages = [[_job(i) for i in range(1, 6)], [_job(i) for i in range(6, 9)]]
+    ingest_once(str(tmp_path), [FakeBoard("board_a", pages)], full=True)
+    _age_last_seen(str(tmp_path), 5)
+
+    # an incremental crawl stops after the known first page: its postings are
+    # still listed although unchanged, the second page's are not and age out
+    stats = ingest_once(str(tmp_path), [FakeBoard("board_a", pages, max_workers=1)], full=False, max_age_days=3)
+    df = load_published(str(tmp_path))
+    assert stats["expired"] == 3 and sorted(df["url"]) == [f"https://a/{i}" for i in range(1, 6)]
+
+    # the sighting was recorded: the next run keeps the unchanged postings
+    stats = ingest_once(str(tmp_path), [FakeBoard("board_a", [[]])], full=False, max_age_days=3)
+    assert stats["published"] is None and len(load_published(str(tmp_path))) == 5
+
+
+def test_empty_listing_never_expires_a_source(tmp_path):
+    pages = [[_job(i) for i in range(1, 5)]]
+    ingest_once(str(tmp_path), [FakeBoard("board_a", pages)], full=True)
+    board = FakeBoard("board_a", [[]])
+    stats = ingest_once(str(tmp_path), [board], full=True)
+    assert not board.stats["complete"] and stats["published"] is None
+    assert len(load_published(str(tmp_path))) == 4
+
+
+def test_gutted_snapshot_is_not_published(tmp_path):
+    pages = [[_job(i) for i in range(1, 5)]]
+    ingest_once(str(tmp_path), [FakeBoard("board_a", pages)], full=True)
+    before = load_published(str(tmp_path))
+    _age_last_seen(str(tmp_path), 5)
+
+    # a board outage leaves every posting unseen past max_age
+    stats = ingest_once(str(tmp_path), [FakeBoard("board_a", pages, fail={1})], full=True, max_age_days=3)
+    assert stats["published"] is None and stats["refused"] == 0
+    assert load_published(str(tmp_path))["url"].tolist() == before["url"].tolist()
+
+
+def test_near_dup_index_saves_without_pickles(tmp_path):
+    import numpy as np
+
+    from services.dedupe import NearDupIndex
+
+    nd = NearDupIndex()
+    nd.add(["https://a/1", "https://a/2", "https://b/1"], [_text(1), _text(2), _text(1) + " apply now"])
+    path = str(tmp_path / "neardup.npz")
+    nd.save(path, "v1")
+    with np.load(path, allow_pickle=False) as data:
+        assert data["ids"].dtype.kind == "U"
+    loaded = NearDupIndex.load(path, "v1")
+    assert loaded.ids == nd.ids and loaded.canonical == nd.canonical and loaded.aliases == nd.aliases
+
+    # a file holding an object array (written before ids were unicode) is rebuilt, never unpickled
+    np.savez(path, sigs=nd._sigs, ids=np.array(nd.ids, dtype=object), dead=np.zeros(0, dtype=np.int64), aliases=np.array("{}"), key=np.array("v1"))
+    assert NearDupIndex.load(path, "v1") is None
+
+
+def test_incomplete_connector_fails_at_instantiation():
+    import pytest
+
+    class NoMapping(Connector):
+        name = "partial"
+
+        def request(self, page):
+            return "", {}
+
+        def items(self, doc):
+            return doc["jobs"]
+
+    with pytest.raises(TypeError, match="map_item"):
+        NoMapping()
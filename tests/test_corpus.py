@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pandas as pd
+
+from services.corpus import MatchCache, SharedCorpus
+
+
+def test_concurrent_sessions_load_once():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return pd.DataFrame({"url": ["a"], "job_title": ["t"], "job_description": ["d"]})
+
+    corpus = SharedCorpus(loader, ttl=60)
+    threads = [threading.Thread(target=corpus.get) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    corpus.invalidate()
+    corpus.get()
+    assert len(calls) == 2
+
+
+def test_match_cache_lru_and_counters():
+    cache = MatchCache(maxsize=2)
+    k1, k2, k3 = (cache.key(t, "v1") for t in ["a", "b", "c"])
+    assert cache.get_or_compute(k1, lambda: 1) == 1
+    assert cache.get_or_compute(k1, lambda: 99) == 1
+    cache.get_or_compute(k2, lambda: 2)
+    cache.get_or_compute(k3, lambda: 3)
+    assert cache.get(k1) is None
+    assert cache.key("a", "v1") != cache.key("a", "v2")
+    assert cache.stats()["hits"] == 1
+
+
+def test_prime_seeds_from_persisted_snapshot():
+    calls = []
+    df = pd.DataFrame({"url": ["a"], "job_title": ["t"], "job_description": ["d"]})
+    corpus = SharedCorpus(lambda: calls.append(1) or df, ttl=60)
+    assert corpus.prime(df, age=10)
+    assert corpus.get()[0] is df and not calls
+    assert not corpus.prime(df)
+
+    stale = SharedCorpus(lambda: calls.append(1) or df, ttl=60)
+    stale.prime(df, age=120)
+    stale.get()
+    assert calls == [1]
+
+
+def test_skill_index_persists_next_to_tfidf(tmp_path):
+    from matching import scoring
+
+    jobs = pd.DataFrame({"job_title": ["Data Analyst"], "location": ["Berlin"], "job_description": ["SQL and Python"], "url": ["u"]})
+    built = scoring.get_skill_index(jobs, index_dir=str(tmp_path))
+    scoring._INDEXES.clear()
+    loaded = scoring.get_skill_index(jobs, index_dir=str(tmp_path))
+    assert loaded is not built and loaded.skills == built.skills
+    assert (loaded.matrix != built.matrix).nnz == 0
@@ -0,0 +1,65 @@
+import pytest
+
+from services.db import SupabaseManager
+
+
+class FakeClient:
+    def __init__(self, log, fail=None):
+        self.log = log
+        self.fail = fail
+
+    def table(self, name):
+        client = self
+
+        class Query:
+            def __init__(self, op):
+                self.op = op
+
+            def limit(self, n):
+                return self
+
+            def execute(self):
+                if client.fail is not None:
+                    raise client.fail
+                client.log.append((id(client), name, self.op))
+                return {"data": []}
+
+        class Table:
+            def insert(self, rows):
+                return Query("insert")
+
+            def select(self, cols):
+                return Query("select")
+
+        return Table()
+
+
+def test_reuses_pooled_clients_and_times_operations():
+    log, made = [], []
+    mgr = SupabaseManager(lambda: made.append(FakeClient(log)) or made[-1], pool_size=2)
+    for _ in range(6):
+        mgr.table("interests").insert([{}]).execute()
+    assert len(made) == 2 and mgr.stats["created"] == 2
+    assert {c for c, _, _ in log} == {id(c) for c in made}
+    assert mgr.health_check()
+    lat = mgr.latency()
+    assert lat["interests.insert"]["count"] == 6 and lat["candidates.select"]["count"] == 1
+    assert lat["interests.insert"]["max_ms"] >= lat["interests.insert"]["p50_ms"] >= 0
+
+
+def test_reconnects_after_connection_error():
+    log, made = [], []
+    mgr = SupabaseManager(lambda: made.append(FakeClient(log)) or made[-1], pool_size=1)
+    made_first = mgr.client()
+    made_first.fail = ConnectionError("reset by peer")
+    with pytest.raises(ConnectionError):
+        mgr.table("interests").insert([{}]).execute()
+    mgr.table("interests").insert([{}]).execute()
+    assert len(made) == 2 and mgr.stats["reconnects"] == 1
+    assert mgr.latency()["interests.insert"]["errors"] == 1
+
+
+def test_unconfigured_factory():
+    mgr = SupabaseManager(lambda: None)
+    assert not mgr.available()
+    assert not mgr.health_check()
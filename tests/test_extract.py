@@ -0,0 +1,68 @@
+import io
+
+from pypdf import PdfWriter
+from pypdf.generic import DictionaryObject, NameObject, StreamObject
+
+from parsing.extract import extract_pdf_text
+
+
+def make_pdf(pages):
+    w = PdfWriter()
+    font = w._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    }))
+    for text in pages:
+        page = w.add_blank_page(612, 792)
+        page[NameObject("/Resources")] = DictionaryObject({NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})})
+        content = StreamObject()
+        content._data = ("BT /F1 12 Tf 72 720 Td 14 TL " + " ".join(f"({l}) Tj T*" for l in text.split("\n")) + " ET").encode()
+        page[NameObject("/Contents")] = w._add_object(content)
+    buf = io.BytesIO()
+    w.write(buf)
+    return buf.getvalue()
+
+
+def test_extract_pages_budget_and_cache():
+    data = make_pdf(["JANE DOE\nEXPERIENCE\nAnalyst - Acme - Berlin", "EDUCATION\nTechnical University - BSc", "SKILLS\nSQL"])
+    res = extract_pdf_text(data)
+    assert res.pages == 3 and not res.truncated
+    assert "Analyst - Acme - Berlin" in res.text and "Technical University" in res.text
+    assert extract_pdf_text(data) is res
+
+    capped = extract_pdf_text(data, max_pages=2)
+    assert capped.pages == 2 and capped.truncated and "SKILLS" not in capped.text
+
+
+def test_extract_failure_is_reported():
+    res = extract_pdf_text(b"not a pdf")
+    assert res.method == "failed" and res.text == ""
+
+
+def test_sparse_pages_share_one_pdfminer_pass(monkeypatch):
+    import pdfminer.high_level
+
+    calls = []
+    real = pdfminer.high_level.extract_pages
+
+    def spy(fp, *args, page_numbers=None, **kw):
+        calls.append(list(page_numbers))
+        return real(fp, *args, page_numbers=page_numbers, **kw)
+
+    monkeypatch.setattr(pdfminer.high_level, "extract_pages", spy)
+    data = make_pdf(["SKILLS\nSQL", "Analyst - Acme - Berlin - 2019 to 2023, reporting and dashboards", "EDUCATION\nBSc"])
+    res = extract_pdf_text(data, time_budget=60)
+    assert calls == [[0, 2]]
+    assert "SQL" in res.text and "Analyst - Acme" in res.text and "BSc" in res.text
+
+
+def test_upload_text_is_normalized_page_by_page():
+    from parsing.extract import iter_pdf_pages
+    from parsing.normalizers import normalize_text
+
+    data = make_pdf(["JANE DOE\n\"Data\" engineer", "lines for 3 teams - Berlin", "SKILLS\nSQL    Python"])
+    res = extract_pdf_text(data)
+    pages = [text for _, text, _ in iter_pdf_pages(data)]
+    assert res.text == normalize_text("\n".join(pages))
+    assert "SQL Python" in res.text
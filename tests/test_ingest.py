@@ -0,0 +1,39 @@
+import copy
+import os
+
+from benchmarks.recorded import RecordedSession, recorded_pages
+from matching import index as job_index
+from matching.index import snapshot_key
+from services.connectors import ArbeitnowConnector
+from services.ingest import ingest_once
+from services.jobs import current_snapshot_path, load_published
+
+
+def _arbeitnow(pages):
+    return [ArbeitnowConnector(max_pages=10, rate=0, session=RecordedSession(pages))]
+
+
+def test_publishes_clean_deduped_indexed_versions(tmp_path):
+    pages = recorded_pages()
+    repost = copy.deepcopy(pages[0]["data"][0])
+    repost["url"] += "-repost"
+    pages[-1]["data"].append(repost)
+    n_items = sum(len(p["data"]) for p in pages)
+
+    stats = ingest_once(str(tmp_path), _arbeitnow(pages))
+    path = current_snapshot_path(str(tmp_path))
+    assert os.path.basename(path) == stats["published"]
+    df = load_published(str(tmp_path))
+    assert len(df) == n_items - 1 and stats["duplicates"] == 1
+    assert not df["job_description"].str.contains("<p>", regex=False).any()
+    # the index was built for exactly what the app will map
+    assert snapshot_key(df) in job_index._INDEXES
+
+    again = ingest_once(str(tmp_path), _arbeitnow(pages))
+    assert again["published"] is None
+    assert current_snapshot_path(str(tmp_path)) == path
+
+    pages[0]["data"][0]["description"] = "<p>Updated ad</p>"
+    third = ingest_once(str(tmp_path), _arbeitnow(pages))
+    assert third["published"] and third["published"] != os.path.basename(path)
+    assert "Updated ad" in load_published(str(tmp_path))["job_description"].tolist()
@@ -0,0 +1,238 @@
+import numpy as np
+import pandas as pd
+
+from matching.index import JobIndex
+from matching.matcher import compute_matches
+
+JOBS = pd.DataFrame([
+    {"job_title": "Sales Development Representative", "company_name": "Acme", "location": "Paris", "url": "https://x/1", "job_description": "B2B sales, lead generation, Salesforce, cold emailing", "source": "arbeitnow"},
+    {"job_title": "Backend Engineer", "company_name": "Globex", "location": "Berlin", "url": "https://x/2", "job_description": "Python, SQL, Kubernetes, backend development", "source": "arbeitnow"},
+    {"job_title": "Data Analyst", "company_name": "Initech", "location": "Remote", "url": "https://x/3", "job_description": "SQL, Excel, statistics, dashboards", "source": "arbeitnow"},
+])
+
+CANDIDATE = {"summary": "Sales intern with B2B lead generation experience", "skills": {"tools": ["Salesforce"]}}
+
+
+def test_index_roundtrip(tmp_path):
+    idx = JobIndex.build(JOBS)
+    idx.save(str(tmp_path))
+    loaded = JobIndex.load(str(tmp_path))
+    assert loaded.key == idx.key
+    q = "python backend sql"
+    assert np.allclose(idx.query(q), loaded.query(q))
+
+
+def test_compute_matches_uses_index():
+    idx = JobIndex.build(JOBS)
+    out = compute_matches(CANDIDATE, JOBS, top_n=2, index=idx)
+    assert len(out) == 2
+    assert out.iloc[0]["company_name"] == "Acme"
+
+
+def test_batch_matches_agree_with_single():
+    from matching.matcher import compute_matches_batch
+
+    idx = JobIndex.build(JOBS)
+    other = {"id": "c2", "summary": "Python backend engineer, SQL"}
+    located = {"id": "c3", "summary": "Analyst", "skills": {"hard": ["SQL", "Python"]}, "personal_info": {"location": "Berlin"}}
+    candidates = [dict(CANDIDATE, id="c1"), other, located]
+    out = compute_matches_batch(candidates, JOBS, top_n=2, index=idx, ram_budget_mb=0.0001)
+    assert len(out) == 6
+    assert out.attrs["stats"]["candidates"] == 3
+    # the batch applies the same text/skill/location blend as the single path
+    for cand in candidates:
+        single = compute_matches(cand, JOBS, top_n=2, index=idx)
+        batch = out[out["candidate_id"] == cand["id"]]
+        assert batch["url"].tolist() == single["url"].tolist()
+        assert np.allclose(batch["match_score"].values, single["match_score"].values, atol=1e-6)
+
+
+def test_ann_path_reranks_with_the_blend():
+    from matching.ann import IVFIndex
+    from matching.matcher import rank_matches
+
+    idx = JobIndex.build(JOBS)
+    ann = IVFIndex.build(idx, n_components=2, n_lists=1)
+    located = {"summary": "SQL analyst", "skills": {"hard": ["SQL", "Python"]}, "personal_info": {"location": "Berlin"}}
+    exact = rank_matches(located, JOBS, top_n=2, index=idx)
+    approx = rank_matches(located, JOBS, top_n=2, index=idx, ann=ann)
+    assert approx.rows.tolist() == exact.rows.tolist()
+    assert np.allclose(approx.columns["match_score"], exact.columns["match_score"])
+    assert approx.matched_skills == exact.matched_skills
+
+
+def test_location_scores_per_category():
+    from matching.scoring import JobSkillIndex
+
+    jobs = JOBS.assign(location=["Paris", "Berlin, Germany", None])
+    jobs.loc[len(jobs)] = dict(jobs.iloc[0], location="Remote (EU)", url="https://x/4")
+    scores = JobSkillIndex.build(jobs).location_scores("berlin")
+    assert scores.tolist() == [0.0, 1.0, 0.0, 0.5]
+    assert JobSkillIndex.build(jobs).location_scores("Berlin", np.array([3, 1])).tolist() == [0.5, 1.0]
+
+
+def test_batch_peak_memory_stays_within_budget():
+    import tracemalloc
+
+    from matching.matcher import compute_matches_batch
+    from matching.scoring import get_skill_index
+
+    rng = np.random.default_rng(0)
+    words = np.array([f"w{i}" for i in range(2000)])
+    jobs = pd.DataFrame({
+        "job_title": [" ".join(rng.choice(words, 3)) for _ in range(3000)],
+        "job_description": [" ".join(rng.choice(words, 60)) for _ in range(3000)],
+        "url": [f"https://x/{i}" for i in range(3000)],
+    })
+    candidates = [{"id": i, "summary": " ".join(rng.choice(words, 60))} for i in range(300)]
+    idx = JobIndex.build(jobs)
+    get_skill_index(jobs, index_dir="")
+    budget = 6.0
+    tracemalloc.start()
+    try:
+        out = compute_matches_batch(candidates, jobs, top_n=5, index=idx, ram_budget_mb=budget)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak <= budget * 1024 * 1024
+    whole = compute_matches_batch(candidates, jobs, top_n=5, index=idx, ram_budget_mb=1024)
+    assert out["url"].tolist() == whole["url"].tolist()
+
+
+def test_fallback_jaccard_matches_set_scan():
+    from matching.inverted import InvertedIndex, tokens
+
+    text = "b2b sales salesforce python"
+    sims = InvertedIndex.build(JOBS).jaccard(text)
+    a = tokens(text)
+    for i, row in JOBS.iterrows():
+        b = tokens(row["job_title"] + " " + row["job_description"])
+        assert abs(sims[i] - len(a & b) / len(a | b)) < 1e-12
+
+
+def test_structured_scores_and_explanations():
+    cand = {"summary": "Engineer", "skills": {"tools": ["Python", "SQL"]}, "personal_info": {"location": "Berlin, Germany"}}
+    out = compute_matches(cand, JOBS, top_n=3, index=JobIndex.build(JOBS))
+    top = out.iloc[0]
+    assert top["company_name"] == "Globex"
+    assert top["location_score"] == 1.0
+    assert set(top["matched_skills"]) == {"Python", "SQL"}
+    assert 0 < top["skill_score"] < 1
+    assert (out["match_score"].diff().dropna() <= 0).all()
+
+
+def test_rank_matches_filters_before_materializing():
+    from matching.matcher import rank_matches
+    from matching.results import top_rows
+
+    assert top_rows(np.array([0.1, 0.9, 0.5, 0.9]), 3).tolist() == [1, 3, 2]
+    res = rank_matches({"summary": "sql dashboards python"}, JOBS, top_n=3, index=JobIndex.build(JOBS))
+    assert len(res) == 3 and list(res.scores) == sorted(res.scores, reverse=True)
+    assert set(res.filter(keyword="SQL").rows) == {1, 2}
+    assert res.filter(keyword="analyst").rows.tolist() == [2]
+    assert res.filter(location="berl", keyword="kubernetes").rows.tolist() == [1]
+    assert len(res.filter(min_score=1.01)) == 0
+    frame = res.filter(location="remote").to_frame()
+    assert frame["company_name"].tolist() == ["Initech"] and "match_score" in frame
+
+
+def test_warm_rank_and_filter_never_rehash_the_corpus(monkeypatch):
+    from matching.index import snapshot_key
+    from matching.matcher import rank_matches
+
+    jobs = JOBS.copy()
+    key = snapshot_key(jobs)
+    rank_matches({"summary": "python sql"}, jobs, top_n=3).filter(location="berlin", keyword="python")
+
+    calls = []
+    hash_object = pd.util.hash_pandas_object
+    monkeypatch.setattr(pd.util, "hash_pandas_object", lambda *a, **k: calls.append(1) or hash_object(*a, **k))
+    res = rank_matches({"summary": "python sql"}, jobs, top_n=3, key=key)
+    assert res.filter(location="berlin", keyword="python").rows.tolist() == [1]
+    assert calls == []
+
+
+def test_frames_edited_in_place_are_keyed_afresh():
+    jobs = JOBS.copy()
+    assert compute_matches(CANDIDATE, jobs, top_n=3).iloc[0]["company_name"] == "Acme"
+
+    jobs.drop(index=0, inplace=True)
+    jobs.reset_index(drop=True, inplace=True)
+    assert set(compute_matches(CANDIDATE, jobs, top_n=3)["company_name"]) == {"Globex", "Initech"}
+
+    jobs.loc[1, "job_description"] = "B2B sales, lead generation, Salesforce"
+    out = compute_matches(CANDIDATE, jobs, top_n=2)
+    assert out.iloc[0]["company_name"] == "Initech" and out.iloc[0]["match_score"] > 0
+
+
+def test_update_applies_delta_and_compacts_on_drift(tmp_path):
+    from matching import index as job_index
+    from matching.scoring import JobSkillIndex
+
+    new_job = {"job_title": "Kotlin Developer", "company_name": "Hooli", "location": "Munich", "url": "https://x/4", "job_description": "Kotlin, Android, SQL", "source": "arbeitnow"}
+    later = pd.concat([pd.DataFrame([new_job]), JOBS.iloc[1:]], ignore_index=True)
+
+    idx = JobIndex.build(JOBS)
+    up = idx.update(later)
+    assert (up.appended, up.deleted, up.fitted) == (1, 1, 3)
+    assert up.vectorizer is idx.vectorizer
+    assert (up.matrix[1:] != idx.matrix[1:]).nnz == 0
+    assert np.argmax(up.query("sql android")) == 0
+
+    skills = JobSkillIndex.build(JOBS).update(later)
+    fresh = JobSkillIndex.build(later)
+    assert np.allclose(skills.skill_scores(["SQL", "Kotlin"]), fresh.skill_scores(["SQL", "Kotlin"]))
+
+    # drift 2/3 > JOB_INDEX_DRIFT: the delta serves now, a refit replaces it
+    job_index._INDEXES.clear()
+    job_index.get_index(JOBS, index_dir=str(tmp_path))
+    served = job_index.get_index(later, index_dir=str(tmp_path))
+    assert served.appended == 1
+    job_index.wait_for_compactions()
+    refit = job_index.get_index(later, index_dir=str(tmp_path))
+    assert refit.drift == 0 and refit.key == served.key
+    assert JobIndex.load(str(tmp_path / served.key)).drift == 0
+
+
+def test_match_cache_key_covers_location_and_weights():
+    from matching.matcher import match_cache_parts
+    from services.corpus import MatchCache
+
+    berlin = {"summary": "Engineer", "personal_info": {"location": "Berlin"}}
+    paris = {"summary": "Engineer", "personal_info": {"location": "Paris"}}
+    def key(cand, weights=None):
+        text, location, blend = match_cache_parts(cand, weights)
+        return MatchCache.key(text, "v1", 100, location, blend)
+
+    assert key(berlin) != key(paris)
+    assert key(berlin) != key(berlin, {"text": 1.0})
+    assert key(berlin) == key({"summary": "Engineer", "personal_info": {"location": " berlin "}})
+
+
+
+def test_saves_swap_in_whole_generations(tmp_path):
+    import os
+
+    from matching.index import manifest_files
+    from matching.scoring import JobSkillIndex
+
+    path = str(tmp_path / "key")
+    JobIndex.build(JOBS).save(path)
+    JobSkillIndex.build(JOBS).save(path)
+    old = manifest_files(path, "vocabulary.json")
+    JobIndex.build(JOBS.iloc[1:]).save(path)
+    # a reader that opened the old manifest can still load its files
+    assert all(os.path.exists(os.path.join(path, f)) for f in old.values())
+    assert JobIndex.load(path).n_jobs == 2 and JobSkillIndex.load(path, JOBS) is not None
+
+    JobIndex.build(JOBS).save(path)
+    assert not any(os.path.exists(os.path.join(path, f)) for f in old.values())
+    assert len([f for f in os.listdir(path) if f.startswith("matrix-")]) == 2
+    assert JobIndex.load(path).n_jobs == 3 and not [f for f in os.listdir(path) if f.startswith(".tmp-")]
+
+
+def test_failed_compaction_is_logged(caplog):
+    from matching.index import compact
+
+    compact(JOBS.iloc[:0], key="empty", index_dir="").join()
+    assert "compaction of job index empty failed" in caplog.text
@@ -0,0 +1,87 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from services.jobs import ArbeitnowFetcher
+
+FIXTURES = Path(__file__).parent / "fixtures" / "arbeitnow"
+PAGES = {int(p.stem.split("_")[1]): json.loads(p.read_text(encoding="utf-8")) for p in FIXTURES.glob("page_*.json")}
+
+
+@pytest.fixture
+def stub():
+    state = {"pages": dict(PAGES), "hits": [], "fail_once": set()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            page = int(parse_qs(urlparse(self.path).query).get("page", ["1"])[0])
+            state["hits"].append(page)
+            if page in state["fail_once"]:
+                state["fail_once"].discard(page)
+                self.send_response(503)
+                self.end_headers()
+                return
+            doc = state["pages"].get(page, {"data": [], "links": {"next": None}})
+            body = json.dumps(doc).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state["url"] = f"http://127.0.0.1:{server.server_port}/api/job-board-api"
+    yield state
+    server.shutdown()
+
+
+def _fetcher(stub, tmp_path, **kw):
+    return ArbeitnowFetcher(api_url=stub["url"], snapshot_path=str(tmp_path / "jobs.parquet"), backoff=0.01, **kw)
+
+
+def test_full_fetch_with_retry(stub, tmp_path):
+    stub["fail_once"].add(2)
+    df = _fetcher(stub, tmp_path, max_workers=3).refresh()
+    assert len(df) == 8
+    assert df["url"].is_unique
+    assert stub["hits"].count(2) == 2
+    assert (tmp_path / "jobs.parquet").exists()
+
+
+def test_refresh_fetches_only_delta(stub, tmp_path):
+    _fetcher(stub, tmp_path, max_workers=1).refresh()
+    stub["hits"].clear()
+
+    page1 = json.loads(json.dumps(PAGES[1]))
+    page1["data"][0]["description"] = "<p>Updated description</p>"
+    stub["pages"][1] = page1
+    f = _fetcher(stub, tmp_path, max_workers=1)
+    df = f.refresh()
+
+    assert f.stats["changed"] == 1 and f.stats["new"] == 0
+    assert stub["hits"] == [1, 2]
+    assert len(df) == 8
+    assert "Updated description" in df.loc[df["url"] == page1["data"][0]["url"], "job_description"].iloc[0]
+
+
+def test_arrow_snapshot_is_compact_and_mapped(stub, tmp_path):
+    import pandas as pd
+
+    from services.jobs import load_snapshot
+
+    path = str(tmp_path / "jobs.arrow")
+    df = ArbeitnowFetcher(api_url=stub["url"], snapshot_path=path, backoff=0.01).refresh()
+    assert len(df) == 8
+    assert isinstance(df["location"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["job_description"].dtype, pd.ArrowDtype)
+    again = load_snapshot(path)
+    assert again["url"].tolist() == df["url"].tolist()
+    assert not again[["job_title", "company_name", "location", "job_description"]].isna().any().any()
@@ -0,0 +1,47 @@
+import json
+import urllib.request
+
+import pytest
+
+from services import metrics
+
+
+@pytest.fixture
+def registry():
+    metrics.REGISTRY.reset()
+    metrics.enable(True)
+    yield metrics.REGISTRY
+    metrics.enable(False)
+    metrics.REGISTRY.reset()
+
+
+def test_disabled_spans_record_nothing():
+    metrics.enable(False)
+    with metrics.span("x.stage"):
+        pass
+    assert metrics.span("x.stage") is metrics.span("y.stage")
+    assert metrics.timed("x.fn")(lambda: 3)() == 3
+    assert "x.stage" not in metrics.REGISTRY.snapshot()
+
+
+def test_parser_stages_and_exports(registry):
+    from parsing.cv_parser import extract_cv_structured
+
+    extract_cv_structured("Jane Doe\nBerlin, Germany\n\nEXPERIENCE\nAnalyst – Acme – Berlin\nJan 2020 – Present\n- Python\n")
+    snap = registry.snapshot()
+    for stage in ("cv_parser.extract", "cv_parser.normalize", "cv_parser.experience"):
+        assert snap[stage]["count"] == 1
+    prom = registry.to_prometheus()
+    assert 'stage_duration_seconds_count{stage="cv_parser.extract"} 1' in prom
+    assert 'stage_duration_seconds_bucket{stage="cv_parser.extract",le="+Inf"} 1' in prom
+
+    server = metrics.serve(port=0)
+    url = f"http://127.0.0.1:{server.server_port}/metrics.json"
+    assert json.loads(urllib.request.urlopen(url).read())["cv_parser.extract"]["count"] == 1
+
+
+def test_profiled_keeps_capture(registry):
+    with metrics.profiled("req", enabled=True):
+        sum(range(1000))
+    label, text = registry.profiles[-1]
+    assert label == "req" and "cumulative" in text
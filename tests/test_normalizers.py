@@ -0,0 +1,30 @@
+from parsing.normalizers import normalize_pages, normalize_text
+
+PAGES = [
+    "  JOHN DOE\n“Senior” engineer —  Berlin\t\tGermany\nBuilt data pipe-",
+    "lines for 3 teams\n•   Led migration\n\n\n\n",
+    "*\tMentored juniors\n-\n  last page ends with a dash -",
+]
+
+
+def test_normalize_text():
+    assert normalize_text("“Hi”  there\t—\n\n\n\nco-\nop\n•  item") == '"Hi" there -\n\ncoop\n- item'
+
+
+def test_normalize_pages_matches_whole_document():
+    assert "".join(normalize_pages(PAGES)) == normalize_text("\n".join(PAGES))
+    for i in range(len(PAGES)):
+        assert "".join(normalize_pages(PAGES[i:])) == normalize_text("\n".join(PAGES[i:]))
+    assert "".join(normalize_pages([])) == ""
+
+
+def test_parse_ym_fast_path_skips_dateparser(monkeypatch):
+    from parsing import normalizers
+
+    normalizers._parse_ym_cached.cache_clear()
+    monkeypatch.setattr(normalizers, "_dateparser_ym", lambda s: (_ for _ in ()).throw(AssertionError(s)))
+    assert normalizers.parse_ym("APR 2025") == "2025-04"
+    assert normalizers.parse_ym("septembre 2021") == "2021-09"
+    assert normalizers.parse_ym(" 2019") == "2019-01"
+    assert normalizers.normalize_date_range("FEB 2024 – present") == ("2024-02", None)
+    assert normalizers.parse_ym_stats()["fast"] >= 4
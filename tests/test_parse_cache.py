@@ -0,0 +1,46 @@
+from parsing.cache import ParseCache
+
+CV = "JANE DOE\nEXPERIENCE\nAnalyst - Acme - Berlin\nJAN 2020 - MAR 2021"
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    db = str(tmp_path / "parses.sqlite")
+    cache = ParseCache(db_path=db)
+    first = cache.parse(CV)
+    first["summary"] = "edited in the UI"
+    assert cache.parse(CV + "   \n\n\n")["summary"] != "edited in the UI"  # same normalized text, fresh copy
+    assert cache.stats["misses"] == 1 and cache.stats["memory_hits"] == 1
+
+    restarted = ParseCache(db_path=db)
+    assert restarted.parse(CV)["experience"][0]["company"] == "Acme"
+    assert restarted.stats["disk_hits"] == 1
+
+
+def test_parser_version_change_invalidates(tmp_path):
+    db = str(tmp_path / "parses.sqlite")
+    ParseCache(db_path=db, version="old").parse(CV)
+    cache = ParseCache(db_path=db)
+    assert cache.stats["invalidated"] == 1
+    cache.parse(CV)
+    assert cache.stats["misses"] == 1
+
+
+def test_text_is_normalized_once(monkeypatch):
+    from parsing import cache as parse_cache
+    from parsing import cv_parser
+
+    calls = []
+    real = cv_parser.normalize_text
+
+    def counting(text):
+        calls.append(text)
+        return real(text)
+
+    monkeypatch.setattr(parse_cache, "normalize_text", counting)
+    monkeypatch.setattr(cv_parser, "normalize_text", counting)
+    cache = ParseCache()
+    miss = cache.parse(CV + "   \n\n\n")
+    assert len(calls) == 1 and miss["experience"][0]["company"] == "Acme"
+    # PDF text arrives normalized: nothing to redo, and it shares the entry
+    assert cache.parse(real(CV), normalized=True) == miss
+    assert len(calls) == 1 and cache.stats["memory_hits"] == 1
@@ -0,0 +1,33 @@
+from parsing.cv_parser import extract_cv_structured, section_spans, split_sections
+
+CV = """JANE DOE
+Berlin, Germany
+
+Summary
+Data analyst.
+
+EXPERIENCE
+Analyst - Acme - Berlin
+JAN 2021 - present
+- Built dashboards
+
+Intern - Globex - Paris
+2019 - 2020
+
+Skills
+SQL, Python
+"""
+
+
+def test_section_spans_are_offsets_into_text():
+    spans = section_spans(CV)
+    assert set(spans) == {"summary", "experience", "skills"}
+    (a, b), = spans["experience"]
+    assert CV[a:b].strip().startswith("Analyst - Acme") and CV[a:b].rstrip().endswith("2019 - 2020")
+    assert split_sections(CV)["skills"] == "SQL, Python"
+
+
+def test_blank_lines_separate_roles():
+    roles = extract_cv_structured(CV)["experience"]
+    assert [r["company"] for r in roles] == ["Acme", "Globex"]
+    assert roles[0]["current"] and roles[0]["bullets"][-1] == "Built dashboards"
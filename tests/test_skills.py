@@ -0,0 +1,20 @@
+from parsing.skills import SkillMatcher, find_skills
+from matching.matcher import candidate_skills
+
+
+def test_automaton_finds_whole_word_mentions_with_positions():
+    m = SkillMatcher({"tools": ["Python", "LinkedIn Sales Navigator"], "hard": ["sales"]}, {"py": "Python"})
+    text = "Python, PY and pythonic; linkedin  sales\nnavigator, Sales"
+    found = m.find(text)
+    assert [(x.skill, text[x.start:x.end]) for x in found] == [
+        ("Python", "Python"),
+        ("Python", "PY"),
+        ("LinkedIn Sales Navigator", "linkedin  sales\nnavigator"),
+        ("sales", "Sales"),
+    ]
+
+
+def test_taxonomy_aliases_and_candidate_skills():
+    assert [x.skill for x in find_skills("sklearn, MS Excel")] == ["scikit-learn", "Excel"]
+    cand = {"skills": {"tools": ["sklearn"], "soft": ["Team player"]}, "skill_mentions": [{"skill": "Python"}]}
+    assert candidate_skills(cand) == ["Python", "scikit-learn", "teamwork"]
@@ -0,0 +1,95 @@
+from services.writer import WriteBehind
+
+
+class FakeSupabase:
+    def __init__(self, fail_times=0, down=()):
+        self.calls = []
+        self.fail_times = fail_times
+        self.down = set(down)  # tables that keep failing
+
+    def table(self, name):
+        client = self
+
+        class Query:
+            def __init__(self, op, rows):
+                self.op, self.rows = op, rows
+
+            def execute(self):
+                if name in client.down:
+                    raise ConnectionError(f"{name} down")
+                if client.fail_times:
+                    client.fail_times -= 1
+                    raise ConnectionError("supabase down")
+                client.calls.append((name, self.op, list(self.rows)))
+
+        class Table:
+            def insert(self, rows):
+                return Query("insert", rows)
+
+            def upsert(self, rows):
+                return Query("upsert", rows)
+
+        return Table()
+
+
+JOB = {"job_title": "Analyst", "company_name": "Acme", "url": "https://x/1", "location": "Berlin", "source": "arbeitnow", "match_score": 0.5}
+
+
+def test_batches_coalesces_and_skips_unchanged():
+    sb = FakeSupabase()
+    w = WriteBehind(sb, max_batch=10, flush_interval=60)
+    w.ensure_candidate("c1", "cv v1")
+    w.ensure_candidate("c1", "cv v2")
+    for _ in range(3):
+        w.log_interest("c1", JOB)
+    w.flush()
+    assert sb.calls[0] == ("candidates", "upsert", [{"id": "c1", "cv_text": "cv v2"}])
+    assert sb.calls[1][:2] == ("interests", "insert") and len(sb.calls[1][2]) == 3
+
+    w.ensure_candidate("c1", "cv v2")
+    w.flush()
+    assert len(sb.calls) == 2 and w.stats["candidates_skipped"] == 2
+    w.close()
+
+
+def test_retries_then_background_flush_on_batch_size():
+    sb = FakeSupabase(fail_times=2)
+    w = WriteBehind(sb, max_batch=2, flush_interval=60, backoff=0, sleep=lambda s: None)
+    w.log_interest("c1", JOB)
+    w.log_interest("c2", JOB)
+    w.close()
+    assert w.stats["retries"] == 2 and w.stats["interests_written"] == 2 and w.pending() == 0
+
+
+def test_interests_wait_for_a_failed_candidate_upsert():
+    sb = FakeSupabase(down={"candidates"})
+    w = WriteBehind(sb, max_batch=10, flush_interval=60, max_retries=0, sleep=lambda s: None)
+    w.ensure_candidate("c1", "cv")
+    w.log_interest("c1", JOB)
+    w.log_interest("c2", JOB)
+    w.flush()
+    # c2's interest goes out; c1's is held back with the requeued upsert
+    assert [(t, [r["candidate_id"] for r in rows]) for t, _, rows in sb.calls] == [("interests", ["c2"])]
+    assert w.stats["failed"] == 1 and w.pending() == 2
+
+    sb.down.clear()
+    w.flush()
+    assert sb.calls[1] == ("candidates", "upsert", [{"id": "c1", "cv_text": "cv"}])
+    assert sb.calls[2][0] == "interests" and sb.calls[2][2][0]["candidate_id"] == "c1"
+    assert w.pending() == 0 and not w.dead_letters
+    w.close()
+
+
+def test_batches_that_keep_failing_are_dead_lettered():
+    sb = FakeSupabase(down={"candidates", "interests"})
+    w = WriteBehind(sb, max_batch=10, flush_interval=60, max_retries=0, max_requeues=2, sleep=lambda s: None)
+    w.ensure_candidate("c1", "cv")
+    w.log_interest("c1", JOB)
+    w.log_interest("c2", JOB)
+    for _ in range(3):
+        w.flush()
+    assert w.pending() == 0 and sb.calls == []
+    tables = sorted((t, len(rows)) for t, rows in w.dead_letters)
+    assert tables == [("candidates", 1), ("interests", 1), ("interests", 1)]
+    assert w.stats["dead_lettered"] == 3 and w.stats["requeued"] > 0
+    w.close()